@@ -0,0 +1,115 @@
+"""
+/ask uç noktasının N eşzamanlı istemci altında p50/p99 gecikmesini ölçer.
+
+Ollama gerektirmez: vektör araması bloklayan bir sahte (time.sleep ile sorgu embedding'i
+taklit edilir), LLM ise asyncio.sleep ile cevap veren sahte bir istemcidir. İki mod karşılaştırılır:
+- inline: arama eski davranıştaki gibi doğrudan event loop üzerinde çalışır
+- threadpool: arama src.main.retrieve ile retrieval thread havuzunda çalışır
+
+Kullanım:
+    python -m benchmarks.bench_ask_concurrency --clients 16 --requests 8
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from langchain_core.documents import Document
+from src import main
+from benchmarks.common import summarize_ms, environment, print_json
+
+
+class BlockingSearchManager:
+    """Sorgu embedding'ini (Ollama'ya giden bloklayan HTTP çağrısı) time.sleep ile taklit eder."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def embed_query(self, query):
+        time.sleep(self.latency)
+        return [float(len(query))]
+
+    def search_by_vector(self, vector, k=3, where=None):
+        return [Document(id=str(i), page_content=f"parça {i}") for i in range(k)]
+
+    def needs_embedding(self, query, mode="hybrid"):
+        return True
+
+    def search(self, query, k=3, mode="hybrid", query_vector=None, where=None):
+        return self.search_by_vector(query_vector, k=k)
+
+
+class SleepingLLM:
+    """Üretimi asyncio.sleep ile taklit eden, event loop'u bloklamayan sahte LLM."""
+
+    model_name = "sahte"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def ask(self, prompt):
+        await asyncio.sleep(self.latency)
+        return "cevap"
+
+    async def generate(self, prompt):
+        return {"response": await self.ask(prompt), "metrics": {}}
+
+
+async def run_load(clients: int, requests_per_client: int):
+    # Modlar aynı soruları sorar; önceki turun önbellekleri sonucu çarpıtmasın
+    main.invalidate_caches()
+    transport = httpx.ASGITransport(app=main.app)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(worker_id):
+            for i in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.post("/ask", json={"question": f"soru {worker_id}-{i}"})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(w) for w in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    summary = summarize_ms(latencies)
+    summary["requests_per_second"] = round(len(latencies) / elapsed, 2)
+    return summary
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=8, help="istemci başına istek sayısı")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="saniye, bloklayan arama süresi")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="saniye, LLM üretim süresi")
+    parser.add_argument("--workers", type=int, default=8, help="retrieval thread havuzu boyutu")
+    args = parser.parse_args()
+
+    main.vector_manager = BlockingSearchManager(args.search_latency)
+    main.llm = SleepingLLM(args.llm_latency)
+    original_retrieve = main.retrieve
+
+    async def inline_retrieve(question, k=3, manager=None, where=None):
+        manager = manager or main.vector_manager
+        vector = manager.embed_query(question)
+        return manager.search_by_vector(vector, k=k, where=where)
+
+    results = {"environment": environment(), "parameters": vars(args)}
+
+    main.retrieve = inline_retrieve
+    results["inline"] = asyncio.run(run_load(args.clients, args.requests))
+
+    main.retrieve = original_retrieve
+    main.retrieval_executor = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="retrieval")
+    try:
+        results["threadpool"] = asyncio.run(run_load(args.clients, args.requests))
+    finally:
+        main.retrieval_executor.shutdown()
+
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
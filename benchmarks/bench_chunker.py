@@ -0,0 +1,169 @@
+"""
+Yerel chunker'ı (src.chunker, DocumentProcessor.iter_chunks) eski sabit
+RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100) ile karşılaştırır:
+
+- throughput: --mb MB'lık TXT ve MD korpusunda bölme süresi, MB/s ve chunk/s.
+  native: dosya okuma + bölme + Document üretimi dahil uçtan uca; native_split ve recursive: bellekteki
+  metni sadece bölme
+- quality: başlıklı bölümlere ve paragraflara ayrılmış Markdown dökümanlarına tek cümlelik "olgular"
+  yerleştirilir, her olgu için kodu ve birkaç kelimesiyle BM25 (LexicalIndex) araması yapılır.
+  intact: olgunun bölünmeden tek bir chunk'ta kaldığı oran; recall_at_k / mrr: olgunun tamamını içeren
+  chunk'ın ilk k sonuçta bulunma oranı ve ortalama ters sırası; mid_sentence_ends: cümle ortasında biten
+  chunk oranı
+
+Ollama gerekmez.
+
+Kullanım:
+    python -m benchmarks.bench_chunker --mb 100
+    python -m benchmarks.bench_chunker --mb 20 --docs 500 --k 3
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from benchmarks.common import environment, print_json, peak_rss_mb
+from benchmarks.corpus import WORDS, sample_text
+from src.chunker import TextChunker, split_markdown
+from src.document_processor import DocumentProcessor
+from src.lexical_index import LexicalIndex
+
+FACT_CODE_RE = re.compile(r"kx\d{5}")
+
+
+def write_text_corpus(path: str, megabytes: float, markdown: bool, seed: int = 0):
+    """Boş satırla ayrılmış paragraflardan (MD'de başlıklı bölümlerden) oluşan yaklaşık megabytes MB'lık dosya."""
+    rng = random.Random(seed)
+    paragraphs = [sample_text(rng.randint(20, 160), seed=seed * 1000 + i) for i in range(500)]
+    target, written, section = megabytes * (1 << 20), 0, 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            if markdown and section % 4 == 0:
+                level = "#" if section % 16 == 0 else "##"
+                written += f.write(f"{level} {' '.join(rng.sample(WORDS, 3)).capitalize()}\n\n")
+            written += f.write(rng.choice(paragraphs) + "\n\n")
+            section += 1
+
+
+def recursive_splitter():
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+
+
+def timed(function):
+    started = time.perf_counter()
+    count = function()
+    return count, time.perf_counter() - started
+
+
+def throughput(path: str, markdown: bool):
+    megabytes = os.path.getsize(path) / (1 << 20)
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    chunker = TextChunker(1000, 100)
+    methods = {
+        "native": lambda: sum(1 for _ in DocumentProcessor(path, 1000, 100).iter_chunks()),
+        "native_split": (lambda: sum(1 for _ in split_markdown(text, chunker))) if markdown
+        else (lambda: len(chunker.spans(text)[0])),
+        "recursive": lambda: len(recursive_splitter().split_text(text)),
+    }
+    result = {"megabytes": round(megabytes, 1)}
+    for name, method in methods.items():
+        chunks, seconds = timed(method)
+        result[name] = {
+            "seconds": round(seconds, 3),
+            "mb_per_second": round(megabytes / seconds, 1),
+            "chunks": chunks,
+            "chunks_per_second": round(chunks / seconds),
+        }
+    return result
+
+
+def make_documents(count: int, facts_per_doc: int, fact_words: int = 30, seed: int = 0):
+    """
+    (markdown metni, [olgu, ...]) listesi. Olgular "Kayıt kxNNNNN için ... geçerlidir" biçiminde,
+    paragrafların içine cümle sınırında yerleştirilmiş tek cümlelerdir.
+    """
+    rng = random.Random(seed)
+    documents, number = [], 0
+    for d in range(count):
+        parts, facts = [f"# {' '.join(rng.sample(WORDS, 3)).capitalize()}\n\n"], []
+        for s in range(rng.randint(3, 6)):
+            heading = " ".join(rng.sample(WORDS, 2)).capitalize()
+            parts.append(f"## {heading}\n\n")
+            for p in range(rng.randint(1, 4)):
+                sentences = sample_text(rng.randint(40, 220), seed=seed * 100_000 + d * 100 + s * 10 + p).split(". ")
+                if len(facts) < facts_per_doc and rng.random() < 0.5:
+                    fact = f"Kayıt kx{number:05d} için {' '.join(rng.choice(WORDS) for _ in range(fact_words))} geçerlidir"
+                    sentences.insert(rng.randint(0, len(sentences)), fact)
+                    facts.append(fact)
+                    number += 1
+                parts.append(". ".join(sentences) + "\n\n")
+        documents.append(("".join(parts), facts))
+    return documents
+
+
+def quality(documents, split, k: int):
+    index, chunks = LexicalIndex(), []
+    for d, (text, _) in enumerate(documents):
+        pieces = split(text)
+        index.add([str(len(chunks) + i) for i in range(len(pieces))], pieces)
+        chunks.extend(pieces)
+    # Olgu kodu -> kodu içeren chunk numaraları (olgu bölünmüşse parçaları farklı chunk'larda olabilir)
+    containing = {}
+    for number, chunk in enumerate(chunks):
+        for code in FACT_CODE_RE.findall(chunk):
+            containing.setdefault(code, []).append(number)
+
+    facts = [fact for _, doc_facts in documents for fact in doc_facts]
+    intact = recall = reciprocal = 0
+    for fact in facts:
+        words = fact.split()
+        intact += any(fact in chunks[number] for number in containing.get(words[1], []))
+        ranks = [rank for rank, (doc_id, _) in enumerate(index.search(" ".join(words[1:2] + words[3:6]), k=k))
+                 if fact in chunks[int(doc_id)]]
+        recall += bool(ranks)
+        reciprocal += 1 / (ranks[0] + 1) if ranks else 0
+    total = max(1, len(facts))
+    return {
+        "facts": len(facts),
+        "chunks": len(chunks),
+        "mean_chunk_chars": round(sum(map(len, chunks)) / max(1, len(chunks))),
+        "mid_sentence_ends": round(sum(not c.endswith((".", "?", "!")) for c in chunks) / max(1, len(chunks)), 4),
+        "intact": round(intact / total, 4),
+        "recall_at_k": round(recall / total, 4),
+        "mrr": round(reciprocal / total, 4),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=100, help="throughput korpusunun boyutu (format başına)")
+    parser.add_argument("--docs", type=int, default=300, help="kalite ölçümündeki döküman sayısı")
+    parser.add_argument("--facts-per-doc", type=int, default=4)
+    parser.add_argument("--fact-words", type=int, default=30, help="olgu cümlesinin kelime sayısı")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "parameters": vars(args), "throughput": {}, "quality": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("txt", "md"):
+            path = os.path.join(tmp, f"korpus.{fmt}")
+            write_text_corpus(path, args.mb, markdown=fmt == "md", seed=args.seed)
+            results["throughput"][fmt] = throughput(path, markdown=fmt == "md")
+            os.remove(path)
+
+    documents = make_documents(args.docs, args.facts_per_doc, args.fact_words, seed=args.seed)
+    chunker, splitter = TextChunker(1000, 100), recursive_splitter()
+    results["quality"] = {
+        "native": quality(documents, lambda text: [text[s:e] for s, e, _ in split_markdown(text, chunker)], args.k),
+        "recursive": quality(documents, splitter.split_text, args.k),
+    }
+    results["peak_rss_mb"] = peak_rss_mb()
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,79 @@
+"""
+Servisin soğuk açılış süresini ölçer: uvicorn ayrı bir süreçte başlatılır ve /db/stats ilk kez
+200 dönene kadar geçen süre kaydedilir. Servisin kendi raporladığı import / veritabanı açılış
+süreleri (startup alanı) ve src.main'in temiz bir yorumlayıcıda import süresi de eklenir.
+
+Projenin kendi data/ ve chroma_db/ dizinleri kullanılır; data/ uzlaştırması arka planda
+çalıştığı için (Ollama kapalı olsa bile) hazır olma süresini etkilemez.
+
+Kullanım:
+    python -m benchmarks.bench_cold_start --runs 3
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.common import summarize_ms, environment, print_json
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import src.main; print(time.perf_counter() - t)"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def start_once(timeout: float):
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/db/stats", timeout=1.0)
+                if response.status_code == 200:
+                    return time.perf_counter() - started, response.json().get("startup", {})
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+        raise TimeoutError(f"Servis {timeout} sn içinde hazır olmadı")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    ready, reported = [], []
+    for _ in range(args.runs):
+        seconds, startup = start_once(args.timeout)
+        ready.append(seconds)
+        reported.append(startup)
+
+    print_json({
+        "environment": environment(),
+        "parameters": vars(args),
+        "import_src_main_seconds": round(import_seconds(), 3),
+        "time_to_first_response": summarize_ms(ready),
+        "reported_startup": reported,
+    })
+
+
+if __name__ == "__main__":
+    main_cli()
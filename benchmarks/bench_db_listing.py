@@ -0,0 +1,78 @@
+"""
+/db/stats ve /db/documents arkasındaki VectorStoreManager çağrılarının koleksiyon boyutuna göre
+yanıt süresini ölçer: eski yöntem (tüm koleksiyonu get() ile çekip len/dilimleme) ile
+koleksiyonun kendi count() sayacı ve offset/limit ile sayfalı okuma karşılaştırılır.
+
+Rastgele vektörler doğrudan koleksiyona yazılır, Ollama gerekmez.
+
+Kullanım:
+    python -m benchmarks.bench_db_listing --sizes 10000,100000,1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.vector_store import VectorStoreManager
+from benchmarks.common import summarize_ms, environment, print_json
+
+
+def fill(manager: VectorStoreManager, size: int, dim: int, text_len: int):
+    """Koleksiyonu size adet rastgele vektör + metin + metadata ile doldurur."""
+    rng = random.Random(42)
+    batch = 5000
+    text = "x" * text_len
+    for start in range(0, size, batch):
+        ids = [f"chunk-{i:08d}" for i in range(start, min(size, start + batch))]
+        manager.backend.upsert(
+            ids,
+            [[rng.random() for _ in range(dim)] for _ in ids],
+            [text] * len(ids),
+            [{"source": f"dosya_{i % 100}.pdf", "page": i % 50} for i in range(len(ids))],
+        )
+
+
+def measure(fn, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return summarize_ms(latencies)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=16)
+    parser.add_argument("--text-len", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "parameters": vars(args), "sizes": {}}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = VectorStoreManager(persist_directory=tmp, embeddings=DeterministicFakeEmbedding(size=args.dim))
+            fill_start = time.perf_counter()
+            fill(manager, size, args.dim, args.text_len)
+            fill_seconds = time.perf_counter() - fill_start
+
+            results["sizes"][size] = {
+                "fill_seconds": round(fill_seconds, 2),
+                "count_full_get": measure(lambda: len(manager.backend.get()["documents"]), args.repeat),
+                "count_native": measure(manager.get_document_count, args.repeat),
+                "page_first": measure(lambda: manager.get_documents_page(0, args.page_size), args.repeat),
+                "page_last": measure(
+                    lambda: manager.get_documents_page(size - args.page_size, args.page_size), args.repeat
+                ),
+                "page_metadata_only": measure(
+                    lambda: manager.get_documents_page(0, args.page_size, fields=("metadata",)), args.repeat
+                ),
+            }
+
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,135 @@
+"""
+Embedding modellerini aynı sentetik korpus üzerinde karşılaştırır (her model ayrı bir süreçte):
+
+- build: boş bir depoya sync_directory ile indeksleme süresi ve chunk/s
+- dimension / store_mb: vektör boyutu ve deponun diskte kapladığı alan
+- query: sorgu embedding'i + dense arama gecikmesi (p50/p99)
+- peak_rss_mb: worker sürecinin tepe bellek kullanımı
+
+Model tanımları "sağlayıcı:model" biçimindedir:
+- local: süreç içinde CPU'da all-MiniLM-L6-v2 (ilk çalıştırmada model dosyaları indirilir)
+- ollama:nomic-embed-text, ollama:llama3.2: çalışan bir Ollama sunucusu (--ollama-url) gerekir
+- stub:4096: Ollama yerine verilen boyutta vektör döndüren stub (sadece boyutun disk/arama
+  maliyetini görmek için; --stub-latency ile istek başına gecikme eklenebilir)
+
+Çalıştırılamayan bir model (ör. Ollama kapalı) sonuçta "error" alanıyla görünür.
+
+Kullanım:
+    python -m benchmarks.bench_embedding_models --models local,ollama:nomic-embed-text,ollama:llama3.2
+    python -m benchmarks.bench_embedding_models --models stub:384,stub:768,stub:3072 --files 100
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.common import summarize_ms, environment, print_json, peak_rss_mb
+from benchmarks.corpus import write_corpus, sample_text
+
+
+def directory_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return round(total / (1 << 20), 2)
+
+
+def run_model(args):
+    """Tek bir modeli bu süreçte ölçer ve sonucu son satırda JSON olarak yazar."""
+    from src.embedding_pipeline import create_embeddings
+    from src.ingestion import sync_directory
+    from src.vector_store import VectorStoreManager
+    from benchmarks.stub_ollama import StubOllamaServer
+
+    provider, _, model = args.model.partition(":")
+    stub = None
+    if provider == "stub":
+        stub = StubOllamaServer(embed_delay=args.stub_latency, vector_size=int(model or 384))
+        embeddings = create_embeddings("ollama", "stub", base_url=stub.url, batch_size=args.batch_size)
+    else:
+        embeddings = create_embeddings(provider, model or None, base_url=args.ollama_url,
+                                       batch_size=args.batch_size)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, "data")
+            write_corpus(data_dir, args.files, words_per_file=args.words_per_file, formats=["txt"], seed=args.seed)
+            # Model ilk kullanımda yüklenir/indirilir; kurma süresine girmesin diye önceden ısıtılır
+            embeddings.embed_query("ısınma")
+
+            persist = os.path.join(tmp, "db")
+            start = time.perf_counter()
+            store = VectorStoreManager(persist_directory=persist, embeddings=embeddings, backend=args.backend)
+            report = sync_directory(data_dir, store, dedup="off")
+            seconds = time.perf_counter() - start
+            chunks = store.get_document_count()
+
+            latencies = []
+            for i in range(args.queries):
+                query = sample_text(8, seed=50_000 + i)
+                query_start = time.perf_counter()
+                store.search(query, k=args.k, mode="dense")
+                latencies.append(time.perf_counter() - query_start)
+            result = {
+                "dimension": store.store_info["dimension"] if store.store_info else None,
+                "chunks": chunks,
+                "errors": len(report["errors"]),
+                "build_seconds": round(seconds, 3),
+                "chunks_per_second": round(chunks / seconds, 1),
+                "store_mb": directory_size_mb(persist),
+                "query": summarize_ms(latencies),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+            store.close()
+    finally:
+        if hasattr(embeddings, "close"):
+            embeddings.close()
+        if stub is not None:
+            stub.close()
+    print(json.dumps(result))
+
+
+def run_worker(model: str, argv):
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_embedding_models", "--worker", "--model", model, *argv],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"çıkış kodu {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", default="local,ollama:nomic-embed-text,ollama:llama3.2")
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--words-per-file", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="chroma")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--ollama-url", default="http://localhost:11434")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="saniye, stub'a giden istek başına")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--model", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_model(args)
+        return
+
+    argv = []
+    for key, value in vars(args).items():
+        if key not in ("models", "worker", "model"):
+            argv += [f"--{key.replace('_', '-')}", str(value)]
+    results = {"environment": environment(), "parameters": vars(args), "models": {}}
+    for model in args.models.split(","):
+        results["models"][model] = run_worker(model, argv)
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,178 @@
+"""
+Metadata filtreli aramanın (/ask'teki "filters") gecikmesini ve doğruluğunu ölçer. Her filtre için:
+
+- pushdown: filtre vektör sorgusuna where olarak verilir (VectorStoreManager.search_by_vector)
+- post_filter: filtresiz olarak k * --oversample sonuç getirilip sonradan süzülür (karşılaştırma için)
+- recall_at_k: filtreye uyan kayıtlar arasındaki tam (brute-force) en yakın k'ya göre
+- lexical: aynı filtreyle BM25 araması (izinli chunk kümesinin depodan okunması dahil)
+- selectivity: filtreye uyan kayıtların oranı
+
+Kayıtlar --files dosyaya dağıtılır (üçte biri PDF, sayfalı), ingest zamanları son 30 güne yayılır.
+--shared > 0 ise her arka uç bir de "<arka uç>+dedup" olarak ölçülür: kayıtların bu oranı tekrar
+indeksinde başka bir dosyanın da kaynağı olarak kaydedilir (tekrarı ayıklanmış chunk'lar), filtreler
+bu kaynaklara göre de uyar. Ollama gerekmez.
+
+Kullanım:
+    python -m benchmarks.bench_filtered_search --size 50000 --backends chroma,numpy
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_vector_backends import make_data, open_manager
+from benchmarks.common import summarize_ms, environment, print_json, peak_rss_mb
+from benchmarks.corpus import sample_text
+from src.ingestion import chunk_metadata
+from src.vector_store import search_filter
+
+DAY = 24 * 3600
+NOW = 1_700_000_000
+
+
+def file_name(number: int) -> str:
+    return f"dosya_{number:04d}.{'pdf' if number % 3 == 0 else 'txt'}"
+
+
+def file_metadata(number: int, ingested_at: int, rng) -> dict:
+    name = file_name(number)
+    metadata = chunk_metadata(name, ingested_at)
+    if name.endswith(".pdf"):
+        metadata["page"] = int(rng.integers(0, 40))
+    return metadata
+
+
+def make_metadata(size: int, files: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [file_metadata(i % files, NOW - int(rng.integers(0, 30 * DAY)), rng) for i in range(size)]
+
+
+def make_shared(size: int, files: int, fraction: float, seed: int = 1):
+    """
+    Kayıt sırası -> aynı chunk'ı içeren başka bir dosyanın kaynağı (filtre metadata'sı + sayfa).
+    Tekrar indeksi filtre alanlarını dosya başına tuttuğundan ingest zamanı dosya başına sabittir.
+    """
+    rng = np.random.default_rng(seed)
+    ingested_at = NOW - rng.integers(0, 30 * DAY, files)
+    shared = {}
+    for row in rng.choice(size, size=int(size * fraction), replace=False):
+        number = (int(row) + int(rng.integers(1, files))) % files
+        shared[int(row)] = file_metadata(number, int(ingested_at[number]), rng)
+    return shared
+
+
+def add_shared_references(manager, ids, metadatas, shared):
+    """Tekrar indeksine chunk'ların sahiplerini ve paylaşılan ikinci kaynaklarını kaydeder."""
+    index = manager.dedup_index
+    for row, other in shared.items():
+        owner = metadatas[row]
+        index.add_reference(ids[row], owner["source_name"], "v1", owner.get("page"), owner=True)
+        index.add_reference(ids[row], other["source_name"], "v1", other.get("page"),
+                            metadata={key: other[key] for key in ("source_name", "file_type", "ingested_at")})
+
+
+def filters():
+    """Ad -> (search_filter argümanları, aynı koşulun Python hali)."""
+    source = "dosya_0001.txt"
+    return {
+        "none": ({}, lambda m: True),
+        "source": ({"source": source}, lambda m: m["source_name"] == source),
+        "file_type": ({"file_type": "pdf"}, lambda m: m["file_type"] == "pdf"),
+        "pdf_pages": ({"file_type": "pdf", "page_from": 0, "page_to": 1},
+                      lambda m: m["file_type"] == "pdf" and m.get("page", -1) <= 1),
+        "last_day": ({"ingested_after": NOW - DAY}, lambda m: m["ingested_at"] >= NOW - DAY),
+    }
+
+
+def filtered_truth(vectors, queries, mask, k: int):
+    rows = np.flatnonzero(mask)
+    candidates = vectors[rows].astype(np.float64)
+    norms = np.einsum("ij,ij->i", candidates, candidates)
+    return [set(rows[np.argsort(norms - 2 * candidates @ q)[:k]].tolist()) for q in queries.astype(np.float64)]
+
+
+def row_of(doc) -> int:
+    return int(doc.id.split("-")[1])
+
+
+def run_backend(spec: str, path: str, vectors, queries, metadatas, texts, args, shared=None):
+    manager = open_manager(spec, path, vectors.shape[1])
+    ids = [f"chunk-{i:08d}" for i in range(len(vectors))]
+    shared = shared or {}
+    start = time.perf_counter()
+    for offset in range(0, len(ids), 5000):
+        end = offset + 5000
+        manager.backend.upsert(ids[offset:end], vectors[offset:end].tolist(), texts[offset:end], metadatas[offset:end])
+        manager.lexical_index.add(ids[offset:end], texts[offset:end])
+    add_shared_references(manager, ids, metadatas, shared)
+    manager.backend.wait_for_index()
+    manager.backend.persist()
+    result = {"build_seconds": round(time.perf_counter() - start, 2), "filters": {}}
+    if shared:
+        result["shared_chunks"] = len(shared)
+
+    for name, (conditions, predicate) in filters().items():
+        where = search_filter(**conditions)
+        mask = np.array([predicate(m) or (i in shared and predicate(shared[i])) for i, m in enumerate(metadatas)])
+        truth = filtered_truth(vectors, queries, mask, args.k)
+        measured = {"selectivity": round(float(mask.mean()), 4)}
+
+        for method in ("pushdown", "post_filter"):
+            latencies, hits = [], 0
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                if method == "pushdown":
+                    docs = manager.search_by_vector(query.tolist(), k=args.k, where=where)
+                else:
+                    docs = manager.search_by_vector(query.tolist(), k=args.k * args.oversample)
+                    docs = [d for d in docs if predicate(d.metadata)][:args.k]
+                latencies.append(time.perf_counter() - started)
+                hits += len(expected & {row_of(d) for d in docs})
+            measured[method] = {
+                **summarize_ms(latencies),
+                "recall_at_k": round(hits / max(1, sum(len(t) for t in truth)), 4),
+            }
+
+        latencies = []
+        for i in range(len(queries)):
+            started = time.perf_counter()
+            docs = manager.search_lexical(sample_text(4, seed=90_000 + i), k=args.k, where=where)
+            latencies.append(time.perf_counter() - started)
+            assert all(mask[row_of(d)] for d in docs)
+        measured["lexical"] = summarize_ms(latencies)
+        result["filters"][name] = measured
+    manager.close()
+    return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--oversample", type=int, default=10, help="post_filter'da getirilen aday katsayısı")
+    parser.add_argument("--backends", default="chroma,numpy")
+    parser.add_argument("--shared", type=float, default=0.05,
+                        help="+dedup ölçümünde başka bir dosyayla paylaşılan kayıt oranı (0: ölçme)")
+    args = parser.parse_args()
+
+    vectors, queries = make_data(args.size, args.dim, args.queries)
+    metadatas = make_metadata(args.size, args.files)
+    texts = [sample_text(40, seed=i) for i in range(args.size)]
+    results = {"environment": environment(), "parameters": vars(args), "backends": {}}
+    shared = make_shared(args.size, args.files, args.shared) if args.shared > 0 else None
+    for spec in args.backends.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            results["backends"][spec] = run_backend(spec, tmp, vectors, queries, metadatas, texts, args)
+        if shared:
+            with tempfile.TemporaryDirectory() as tmp:
+                results["backends"][f"{spec}+dedup"] = run_backend(
+                    spec, tmp, vectors, queries, metadatas, texts, args, shared=shared
+                )
+    results["peak_rss_mb"] = peak_rss_mb()
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,109 @@
+"""
+Büyük PDF'lerin işlenmesinde tepe bellek kullanımını ölçer. Farklı sayfa sayılarında sentetik
+PDF'ler üretilir ve üç yol karşılaştırılır:
+
+- eager: eski yol; loader.load() tüm sayfaları, split_documents tüm chunk'ları bellekte tutar
+- streaming: DocumentProcessor.iter_chunks ile sayfa sayfa okuma ve artımlı bölme
+- sync: sync_directory'nin tamamı (prefetch kuyruğu + ADD_BATCH_CHUNKS'lık batch'ler), embedding
+  ve depo yerine chunk'ları sayıp atan bir hedefle
+
+Bellek tracemalloc ile ölçülür (Python nesneleri); streaming ve sync için tepe değerin sayfa
+sayısından bağımsız, eager için doğrusal büyümesi beklenir. Ollama gerekmez.
+
+Kullanım:
+    python -m benchmarks.bench_ingest_memory --pages 100,500,2000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from src.document_processor import DocumentProcessor
+from src.ingestion import IngestionManifest, sync_directory
+from benchmarks.common import environment, print_json
+from benchmarks.corpus import write_pdf, sample_text
+
+
+class CountingSink:
+    """sync_directory için vektör deposu yerine geçen, chunk'ları sayıp atan hedef."""
+
+    def __init__(self, persist_directory: str):
+        self.persist_directory = persist_directory
+        self.chunks = 0
+
+    def get_document_count(self):
+        return self.chunks
+
+    def add_documents(self, chunks, ids=None, stats=None):
+        self.chunks += len(chunks)
+        return True
+
+    def delete_documents(self, ids):
+        self.chunks -= len(ids)
+
+    def clear(self):
+        self.chunks = 0
+
+    def save(self):
+        pass
+
+
+def run_eager(path: str):
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    documents = PyPDFLoader(path).load()
+    return len(RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(documents))
+
+
+def run_streaming(path: str):
+    return sum(1 for _ in DocumentProcessor(path).iter_chunks())
+
+
+def run_sync(path: str):
+    data_dir = os.path.dirname(path)
+    with tempfile.TemporaryDirectory() as store_dir:
+        sink = CountingSink(store_dir)
+        sync_directory(data_dir, sink, manifest=IngestionManifest(os.path.join(store_dir, "manifest.json")))
+        return sink.chunks
+
+
+MODES = {"eager": run_eager, "streaming": run_streaming, "sync": run_sync}
+
+
+def measure(fn, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = fn(path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"chunks": chunks, "seconds": round(seconds, 2), "peak_mb": round(peak / (1 << 20), 2)}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="100,500,2000")
+    parser.add_argument("--words-per-page", type=int, default=450)
+    parser.add_argument("--modes", default="eager,streaming,sync")
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "parameters": vars(args), "pages": {}}
+    # Modül import'ları ölçülen ilk yolun tepe değerine yazılmasın diye her yol önce küçük bir PDF'te çalıştırılır
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "isinma.pdf")
+        write_pdf(path, [sample_text(50)])
+        for mode in args.modes.split(","):
+            MODES[mode](path)
+
+    for pages in [int(p) for p in args.pages.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "buyuk.pdf")
+            write_pdf(path, (sample_text(args.words_per_page, seed=i) for i in range(pages)))
+            results["pages"][pages] = {"file_mb": round(os.path.getsize(path) / (1 << 20), 2)}
+            for mode in args.modes.split(","):
+                results["pages"][pages][mode] = measure(MODES[mode], path)
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,213 @@
+"""
+Ingestion ve sorgu yollarının uçtan uca benchmark'ı. Ollama yerine gecikmesi ayarlanabilen
+deterministik bir stub (benchmarks.stub_ollama) kullanılır, böylece sonuçlar çevrimdışı ve
+makineden makineye tekrarlanabilir şekilde alınır. Her korpus boyutu için sentetik PDF/TXT/MD
+dökümanlar üretilir ve ayrı bir süreçte ölçülür (tepe RSS boyutlar arasında karışmasın diye):
+
+- load: load_all_documents ile parse + bölme (dosya/s, chunk/s, MB/s)
+- build: boş bir VectorStoreManager'a sync_directory ile indeksleme (embedding stub'a gider)
+- search: VectorStoreManager.search p50/p99 (mod başına; "with_vector" sorgu embedding'i hariç)
+- ask: /ask'in eşzamanlı istemciler altındaki uçtan uca gecikmesi ve istek/s
+- peak_rss_mb: sürecin ölçüm sonundaki tepe bellek kullanımı
+
+Sonuçlar JSON olarak yazdırılır ve --output dosyasına (varsayılan benchmarks/results/<commit>.json)
+kaydedilir; iki commit'in sonuçları benchmarks.compare ile karşılaştırılabilir.
+
+Kullanım:
+    python -m benchmarks.bench_suite --sizes 30,300
+    python -m benchmarks.bench_suite --sizes 30 --embed-latency 0 --token-latency 0 --output /tmp/sonuc.json
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from benchmarks.common import summarize_ms, environment, print_json, peak_rss_mb, git_commit
+from benchmarks.corpus import write_corpus, sample_text
+from benchmarks.stub_ollama import StubOllamaServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure_load(data_dir: str, workers: int):
+    from src.main import load_all_documents
+    size = sum(entry.stat().st_size for entry in os.scandir(data_dir))
+    files = len(os.listdir(data_dir))
+    errors = []
+    start = time.perf_counter()
+    chunks = load_all_documents(data_dir, workers=workers, errors=errors)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "files": files,
+        "chunks": len(chunks),
+        "errors": len(errors),
+        "files_per_second": round(files / seconds, 1),
+        "chunks_per_second": round(len(chunks) / seconds, 1),
+        "mb_per_second": round(size / (1 << 20) / seconds, 2),
+    }
+
+
+def measure_build(data_dir: str, persist_directory: str, stub: StubOllamaServer, args):
+    from src.embedding_pipeline import OllamaBatchEmbeddings
+    from src.ingestion import sync_directory
+    from src.vector_store import VectorStoreManager
+    embeddings = OllamaBatchEmbeddings(
+        model="stub", base_url=stub.url, batch_size=args.embedding_batch_size,
+        max_concurrency=args.embedding_concurrency,
+    )
+    start = time.perf_counter()
+    store = VectorStoreManager(persist_directory=persist_directory, embeddings=embeddings, backend=args.backend)
+    report = sync_directory(data_dir, store, workers=args.workers)
+    seconds = time.perf_counter() - start
+    return store, {
+        "seconds": round(seconds, 3),
+        "chunks": store.get_document_count(),
+        "chunks_per_second": round(store.get_document_count() / seconds, 1),
+        "embed_requests": len(stub.batch_sizes),
+        "errors": len(report["errors"]),
+    }
+
+
+def measure_search(store, queries, k: int):
+    results = {}
+    for mode in ("hybrid", "dense", "lexical"):
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            store.search(query, k=k, mode=mode)
+            latencies.append(time.perf_counter() - start)
+        results[mode] = summarize_ms(latencies)
+
+    vectors = store.embed_queries(queries)
+    for mode in ("hybrid", "dense"):
+        latencies = []
+        for query, vector in zip(queries, vectors):
+            start = time.perf_counter()
+            store.search(query, k=k, mode=mode, query_vector=vector)
+            latencies.append(time.perf_counter() - start)
+        results[f"{mode}_with_vector"] = summarize_ms(latencies)
+    return results
+
+
+async def run_ask_load(clients: int, requests_per_client: int):
+    from src import main
+    transport = httpx.ASGITransport(app=main.app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        async def worker(worker_id):
+            for i in range(requests_per_client):
+                # Her soru farklı; sorgu ve cevap önbellekleri ölçümü etkilemez
+                question = sample_text(10, seed=100_000 + worker_id * requests_per_client + i)
+                start = time.perf_counter()
+                response = await client.post("/ask", json={"question": question})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(w) for w in range(clients)))
+        elapsed = time.perf_counter() - start
+    summary = summarize_ms(latencies)
+    summary["requests_per_second"] = round(len(latencies) / elapsed, 2)
+    return summary
+
+
+def measure_ask(store, stub: StubOllamaServer, args):
+    from src import main
+    from src.config import RETRIEVAL_WORKERS
+    from src.llm_client import LLMClient
+    main.vector_manager = store
+    main.llm = LLMClient(host=stub.url, max_concurrency=args.llm_concurrency)
+    main.retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+    main.invalidate_caches()
+    try:
+        return asyncio.run(run_ask_load(args.clients, args.requests))
+    finally:
+        main.retrieval_executor.shutdown()
+
+
+def run_size(args):
+    """Tek bir korpus boyutunu bu süreçte ölçer ve sonucu son satırda JSON olarak yazar."""
+    stub = StubOllamaServer(
+        delay=args.token_latency, embed_delay=args.embed_latency,
+        prefill_delay_per_token=args.prefill_latency, vector_size=args.dim,
+    )
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, "data")
+            paths = write_corpus(data_dir, args.size, words_per_file=args.words_per_file,
+                                 formats=args.formats.split(","), seed=args.seed)
+            result = {"corpus_mb": round(sum(os.path.getsize(p) for p in paths) / (1 << 20), 2)}
+            result["load"] = measure_load(data_dir, args.workers)
+            store, result["build"] = measure_build(data_dir, os.path.join(tmp, "db"), stub, args)
+            queries = [sample_text(8, seed=50_000 + i) for i in range(args.queries)]
+            result["search"] = measure_search(store, queries, args.k)
+            result["ask"] = measure_ask(store, stub, args)
+            result["peak_rss_mb"] = peak_rss_mb()
+            store.close()
+    finally:
+        stub.close()
+    print(json.dumps(result))
+
+
+def run_worker(size: int, argv):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_suite", "--worker", "--size", str(size), *argv],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="30,300", help="korpus boyutları (dosya sayısı)")
+    parser.add_argument("--formats", default="pdf,txt,md")
+    parser.add_argument("--words-per-file", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="INGEST_WORKERS karşılığı")
+    parser.add_argument("--backend", default="chroma")
+    parser.add_argument("--dim", type=int, default=64, help="stub embedding boyutu")
+    parser.add_argument("--embedding-batch-size", type=int, default=32)
+    parser.add_argument("--embedding-concurrency", type=int, default=4)
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="saniye, /api/embed isteği başına")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="saniye, üretilen token başına")
+    parser.add_argument("--prefill-latency", type=float, default=0.0001, help="saniye, prompt kelimesi başına")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=10, help="istemci başına /ask isteği")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--output", help="sonuç dosyası (varsayılan benchmarks/results/<commit>.json)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_size(args)
+        return
+
+    # Worker'a parametreler aynen geçirilir (--sizes ve --output hariç)
+    argv = []
+    for key, value in vars(args).items():
+        if key not in ("sizes", "output", "worker", "size"):
+            argv += [f"--{key.replace('_', '-')}", str(value)]
+    results = {"environment": environment(), "parameters": vars(args), "sizes": {}}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        results["sizes"][size] = run_worker(size, argv)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{git_commit() or 'sonuc'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print_json(results)
+    print(f"Sonuçlar {output} dosyasına yazıldı", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main_cli()
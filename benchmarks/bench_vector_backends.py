@@ -0,0 +1,157 @@
+"""
+Chroma ile yerel numpy vektör motorunu (float32 / float16 / int8 nicemleme, flat / IVF indeks)
+aynı rastgele kümelenmiş veri üzerinde karşılaştırır:
+
+- build_seconds: vektörlerin depoya yazılma süresi
+- startup_ms: mevcut deponun yeni bir süreçte açılma süresi
+- query: tek sorgu gecikmesi (p50/p99)
+- recall_at_k: tam (float64 brute-force) sonuca göre recall@k
+- rss_mb / peak_rss_mb: sorgulardan sonra worker sürecinin bellek kullanımı
+
+Açılış süresi ve bellek her arka uç için ayrı bir süreçte ölçülür, böylece sonuçlar birbirini etkilemez.
+Ollama gerekmez.
+
+Kullanım:
+    python -m benchmarks.bench_vector_backends --sizes 10000,100000 --dim 384
+    python -m benchmarks.bench_vector_backends --backends chroma,numpy,numpy:int8,numpy:float32:ivf
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import psutil
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.vector_store import VectorStoreManager
+from benchmarks.common import summarize_ms, environment, print_json, peak_rss_mb
+
+
+def parse_backend(spec: str):
+    """"numpy:int8:ivf" -> ("numpy", {"quantization": "int8", "index": "ivf"})"""
+    name, *rest = spec.split(":")
+    if name != "numpy":
+        return name, {}
+    options = {"index": "flat"}
+    if rest:
+        options["quantization"] = rest[0]
+    if len(rest) > 1:
+        options["index"] = rest[1]
+    return name, options
+
+
+def open_manager(spec: str, path: str, dim: int) -> VectorStoreManager:
+    name, options = parse_backend(spec)
+    return VectorStoreManager(
+        persist_directory=path, embeddings=DeterministicFakeEmbedding(size=dim),
+        backend=name, backend_options=options
+    )
+
+
+def make_data(size: int, dim: int, queries: int, seed: int = 42):
+    """Gerçek embedding'lere benzer şekilde kümelenmiş vektörler ve aynı dağılımdan sorgular üretir."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, size // 500), dim)).astype(np.float32) * 4
+    vectors = centers[rng.integers(0, len(centers), size)] + rng.normal(size=(size, dim)).astype(np.float32)
+    query_vectors = centers[rng.integers(0, len(centers), queries)] + rng.normal(size=(queries, dim)).astype(np.float32)
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def ground_truth(vectors, queries, k: int):
+    norms = np.einsum("ij,ij->i", vectors.astype(np.float64), vectors.astype(np.float64))
+    truth = []
+    for query in queries.astype(np.float64):
+        distances = norms - 2 * vectors.astype(np.float64) @ query
+        truth.append(np.argsort(distances)[:k])
+    return truth
+
+
+def build(spec: str, path: str, vectors, batch: int = 5000):
+    manager = open_manager(spec, path, vectors.shape[1])
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), batch):
+        chunk = vectors[offset:offset + batch]
+        ids = [f"chunk-{i:08d}" for i in range(offset, offset + len(chunk))]
+        manager.backend.upsert(ids, chunk.tolist(), ["x" * 200] * len(ids),
+                               [{"source": f"dosya_{i % 100}.pdf"} for i in range(len(ids))])
+    # IVF merkezleri arka planda eğitilir; ölçülen süre eğitimi de kapsasın
+    manager.backend.wait_for_index()
+    manager.backend.persist()
+    seconds = time.perf_counter() - start
+    manager.close()
+    return seconds
+
+
+def worker(args):
+    """Ayrı süreçte: depoyu açar, sorguları tek tek çalıştırır, sonuçları JSON olarak yazar."""
+    queries = np.load(args.queries)
+    start = time.perf_counter()
+    manager = open_manager(args.backend, args.path, queries.shape[1])
+    startup = time.perf_counter() - start
+
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        docs = manager.search_by_vector(query.tolist(), k=args.k)
+        latencies.append(time.perf_counter() - start)
+        results.append([int(d.id.split("-")[1]) for d in docs])
+
+    print(json.dumps({
+        "startup_ms": round(startup * 1000, 2),
+        "query": summarize_ms(latencies),
+        "results": results,
+        "rss_mb": round(psutil.Process().memory_info().rss / (1 << 20), 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "backend_stats": manager.backend.stats(),
+    }))
+
+
+def run_worker(spec: str, path: str, queries_path: str, k: int):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_vector_backends", "--worker",
+         "--backend", spec, "--path", path, "--queries", queries_path, "--k", str(k)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", default="100", help="sorgu sayısı (worker modunda .npy yolu)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backends", default="chroma,numpy,numpy:float16,numpy:int8,numpy:float32:ivf")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    results = {"environment": environment(), "parameters": vars(args), "sizes": {}}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        vectors, queries = make_data(size, args.dim, int(args.queries))
+        truth = ground_truth(vectors, queries, args.k)
+        size_results = results["sizes"][size] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            queries_path = os.path.join(tmp, "queries.npy")
+            np.save(queries_path, queries)
+            for spec in args.backends.split(","):
+                path = os.path.join(tmp, spec.replace(":", "_"))
+                build_seconds = build(spec, path, vectors)
+                measured = run_worker(spec, path, queries_path, args.k)
+                found = measured.pop("results")
+                hits = sum(len(set(t.tolist()) & set(f)) for t, f in zip(truth, found))
+                size_results[spec] = {
+                    "build_seconds": round(build_seconds, 2),
+                    "recall_at_k": round(hits / (len(truth) * args.k), 4),
+                    **measured,
+                }
+    print_json(results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,62 @@
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+
+def percentile(values, p: float) -> float:
+    """Sıralı olmayan bir listeden en yakın sıra yöntemiyle p. yüzdeliği hesaplar."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize_ms(latencies_s):
+    """Saniye cinsinden gecikme listesinden ms cinsinden p50/p99/ortalama özeti üretir."""
+    values = [v * 1000 for v in latencies_s]
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "max_ms": round(max(values), 2) if values else 0.0,
+    }
+
+
+def git_commit():
+    """Çalışma dizinindeki commit'in kısa özeti (git yoksa None); değişiklik varsa sonuna "-dirty" eklenir."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], check=True,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Sonuçların hangi ortamda (ve hangi commit'te) alındığını kaydetmek için temel bilgiler."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Bu sürecin şimdiye kadarki en yüksek RSS'i (MB); ru_maxrss Linux'ta KB, macOS'ta byte cinsindendir."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
@@ -0,0 +1,67 @@
+"""
+İki benchmark sonuç dosyasını (ör. bench_suite'in iki commit'teki çıktısı) karşılaştırır.
+Her iki dosyada da bulunan sayısal ölçümler için değişim yüzdesi yazdırılır; süre ve bellek
+ölçümlerinde artış, hız ölçümlerinde (*_per_second) düşüş --threshold'u aşarsa gerileme sayılır ve
+çıkış kodu 1 olur (CI'da kullanılabilsin diye).
+
+Kullanım:
+    python -m benchmarks.compare eski.json yeni.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# Sadece bu son eklerle biten alanlar performans ölçümüdür (count, chunks gibi alanlar değil)
+LOWER_IS_BETTER = ("_ms", "seconds", "rss_mb")
+HIGHER_IS_BETTER = ("_per_second",)
+
+
+def flatten(data, prefix=""):
+    """İç içe sözlüğü "a.b.c" -> sayı çiftlerine açar."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, data
+
+
+def compare(old: dict, new: dict, threshold: float):
+    """(satırlar, gerileme sayısı) döndürür; satır: (anahtar, eski, yeni, yüzde değişim, gerileme mi)."""
+    old_values = dict(flatten({k: v for k, v in old.items() if k not in ("environment", "parameters")}))
+    rows, regressions = [], 0
+    for key, new_value in flatten({k: v for k, v in new.items() if k not in ("environment", "parameters")}):
+        name = key.rsplit(".", 1)[-1]
+        higher_better = name.endswith(HIGHER_IS_BETTER)
+        if key not in old_values or not (higher_better or name.endswith(LOWER_IS_BETTER)):
+            continue
+        old_value = old_values[key]
+        change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+        regressed = (-change if higher_better else change) > threshold
+        regressions += regressed
+        rows.append((key, old_value, new_value, round(change, 1), regressed))
+    return rows, regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="yüzde")
+    args = parser.parse_args()
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows, regressions = compare(old, new, args.threshold)
+    print(f"{old.get('environment', {}).get('commit')} -> {new.get('environment', {}).get('commit')}")
+    width = max((len(row[0]) for row in rows), default=10)
+    for key, old_value, new_value, change, regressed in rows:
+        mark = "  GERİLEME" if regressed else ""
+        print(f"{key:<{width}}  {old_value:>12}  {new_value:>12}  {change:>+7.1f}%{mark}")
+    print(f"{regressions} gerileme (eşik %{args.threshold})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
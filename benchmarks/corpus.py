@@ -0,0 +1,127 @@
+"""
+Benchmark ve testler için sentetik döküman üretimi. PDF'ler harici kütüphane olmadan, pypdf'in
+metin çıkarabildiği en basit yapıda (Helvetica, tek içerik akışı) elle yazılır.
+"""
+import os
+import random
+
+WORDS = (
+    "sistem kullanıcı rapor sunucu veri belge ayar hata kayıt işlem güncelleme yedek ağ bağlantı "
+    "yetki parola fatura müşteri sipariş ürün depo teslimat kampanya bütçe toplantı proje ekip"
+).split()
+
+
+def sample_text(words: int, seed: int = 0) -> str:
+    """Cümlelere ayrılmış, tekrar eden kelimelerden oluşan rastgele metin üretir."""
+    rng = random.Random(seed)
+    sentences, current = [], []
+    for _ in range(words):
+        current.append(rng.choice(WORDS))
+        if len(current) >= rng.randint(6, 14):
+            sentences.append(" ".join(current).capitalize() + ".")
+            current = []
+    if current:
+        sentences.append(" ".join(current).capitalize() + ".")
+    return " ".join(sentences)
+
+
+# Standart Helvetica fontu sadece Latin-1 karakterleri gösterebilir; Latin-1'de olmayan Türkçe harfler sadeleştirilir
+_LATIN1 = str.maketrans("şŞğĞıİ", "sSgGiI")
+
+
+def _pdf_escape(text: str) -> str:
+    text = text.translate(_LATIN1).encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 90):
+    line = ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            yield line
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        yield line
+
+
+def write_pdf(path: str, pages):
+    """
+    pages içindeki her metni ayrı bir sayfaya yazan bir PDF oluşturur. pages bir generator da
+    olabilir; sayfalar diske yazıldıkça tüketilir, böylece büyük PDF'ler de bellek şişirmeden üretilir.
+    """
+    offsets, page_ids = [], []
+    with open(path, "wb") as f:
+        def add_object(number, body: bytes):
+            while len(offsets) < number:
+                offsets.append(0)
+            offsets[number - 1] = f.tell()
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        # 1: katalog, 2: sayfa ağacı (en sonda yazılır), 3: font; sayfalar 4'ten başlar
+        add_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        add_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        number = 4
+        for text in pages:
+            lines = "".join(f"({_pdf_escape(line)}) Tj T* " for line in _wrap(text))
+            stream = f"BT /F1 9 Tf 11 TL 40 800 Td {lines}ET".encode("latin-1")
+            add_object(number, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            add_object(number + 1, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {number} 0 R >>"
+            ).encode())
+            page_ids.append(number + 1)
+            number += 2
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        add_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+
+        xref = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+CORPUS_FORMATS = ("pdf", "txt", "md")
+
+
+def write_markdown(path: str, text: str, seed: int = 0, section_words: int = 150):
+    """Metni başlıklı (# / ##) bölümlere ayırıp Markdown dosyası olarak yazar."""
+    rng = random.Random(seed)
+    words = text.split()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# {' '.join(rng.sample(WORDS, 3)).capitalize()}\n\n")
+        for section, start in enumerate(range(0, len(words), section_words)):
+            if section:
+                f.write(f"## {' '.join(rng.sample(WORDS, 2)).capitalize()}\n\n")
+            f.write(" ".join(words[start:start + section_words]) + "\n\n")
+
+
+def write_corpus(directory: str, files: int, words_per_file: int = 2000, formats=CORPUS_FORMATS,
+                 words_per_page: int = 450, seed: int = 0):
+    """
+    directory'ye formatlar arasında sırayla dağıtılmış files adet sentetik döküman yazar
+    (PDF'ler words_per_page kelimelik sayfalara bölünür). Aynı parametreler her zaman aynı
+    dosyaları üretir. Yazılan dosyaların yollarını döndürür.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(files):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(directory, f"dokuman_{i:05d}.{fmt}")
+        file_seed = seed * 1_000_003 + i
+        if fmt == "pdf":
+            pages = -(-words_per_file // words_per_page)
+            write_pdf(path, (sample_text(words_per_page, seed=file_seed * 10_007 + p) for p in range(pages)))
+        elif fmt == "md":
+            write_markdown(path, sample_text(words_per_file, seed=file_seed), seed=file_seed)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                text = sample_text(words_per_file, seed=file_seed)
+                # Paragraflar boş satırla ayrılır (splitter önce paragraf sınırlarından böler)
+                sentences = text.split(". ")
+                f.write("\n\n".join(". ".join(sentences[j:j + 6]) for j in range(0, len(sentences), 6)))
+        paths.append(path)
+    return paths
@@ -0,0 +1,151 @@
+"""
+Ollama'nın /api/embed ve /api/generate uç noktalarını taklit eden deterministik yerel sunucu.
+Testler ve benchmark'lar Ollama olmadan çalışabilsin diye kullanılır; gecikmeler ayarlanabilir.
+
+Servisi stub'a karşı çalıştırmak için:
+    python -m benchmarks.stub_ollama --port 11500 --embed-latency 0.02 --token-latency 0.01
+    OLLAMA_BASE_URL=http://127.0.0.1:11500 uvicorn src.main:app
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stub_vector(text: str, size: int = 8):
+    """Metinden deterministik olarak türetilen sahte embedding vektörü."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    while len(digest) < size:
+        digest += hashlib.sha256(digest).digest()
+    return [b / 255 for b in digest[:size]]
+
+
+class StubOllamaServer:
+    """
+    Ollama'nın /api/embed ve /api/generate uç noktalarını taklit eden yerel test sunucusu.
+    Gelen istekleri, batch boyutlarını ve eşzamanlı istek sayısını kaydeder.
+    """
+
+    def __init__(self, delay: float = 0.05, tokens=("Merhaba", " dünya", "!"), embed_delay: float = None,
+                 prefill_delay_per_token: float = 0.0, vector_size: int = 8, port: int = 0):
+        # delay: token başına üretim gecikmesi (stream=False'ta cevabın tamamı için bir kez);
+        # embed_delay: /api/embed isteği başına gecikme (verilmezse delay);
+        # prefill_delay_per_token: prompt'un kelime başına işlenme süresi (uzun prompt = geç ilk token)
+        self.delay = delay
+        self.embed_delay = delay if embed_delay is None else embed_delay
+        self.prefill_delay_per_token = prefill_delay_per_token
+        self.vector_size = vector_size
+        self.tokens = list(tokens)
+        self.batch_sizes = []
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_next = 0  # sonraki bu kadar /api/generate isteğine 503 döner
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Başlık ve gövde ayrı yazılır; Nagle + gecikmeli ACK her cevaba ~40 ms eklemesin
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if self.path == "/api/embed":
+                        self._embed(body)
+                    elif self.path == "/api/generate":
+                        self._generate(body)
+                    else:
+                        self.send_error(404)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _embed(self, body):
+                with stub._lock:
+                    stub.batch_sizes.append(len(body["input"]))
+                time.sleep(stub.embed_delay)
+                vectors = [stub_vector(text, stub.vector_size) for text in body["input"]]
+                self._send_json({"model": body["model"], "embeddings": vectors})
+
+            def _generate(self, body):
+                with stub._lock:
+                    if stub.fail_next > 0:
+                        stub.fail_next -= 1
+                        self._send_json({"error": "model yükleniyor"}, status=503)
+                        return
+                    stub.prompts.append(body["prompt"])
+                prompt_tokens = len(body["prompt"].split())
+                prefill = prompt_tokens * stub.prefill_delay_per_token
+                final = {"done": True, "prompt_eval_count": prompt_tokens,
+                         "prompt_eval_duration": int(prefill * 1e9) or prompt_tokens * 100_000,
+                         "eval_count": len(stub.tokens),
+                         "eval_duration": int(stub.delay * len(stub.tokens) * 1e9)}
+                time.sleep(prefill)
+                if not body.get("stream", True):
+                    time.sleep(stub.delay)
+                    self._send_json({"response": "".join(stub.tokens), **final})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for token in stub.tokens:
+                    time.sleep(stub.delay)
+                    self._write_chunk({"response": token, "done": False})
+                self._write_chunk({"response": "", **final})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, data):
+                line = (json.dumps(data) + "\n").encode()
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, data, status=200):
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="saniye, /api/embed isteği başına")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="saniye, üretilen token başına")
+    parser.add_argument("--prefill-latency", type=float, default=0.0, help="saniye, prompt kelimesi başına")
+    parser.add_argument("--vector-size", type=int, default=64)
+    args = parser.parse_args()
+    server = StubOllamaServer(
+        delay=args.token_latency, embed_delay=args.embed_latency,
+        prefill_delay_per_token=args.prefill_latency, vector_size=args.vector_size, port=args.port,
+    )
+    print(f"Sahte Ollama {server.url} adresinde çalışıyor (Ctrl+C ile durdurun)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,228 @@
+import bisect
+import re
+
+# Chunk sınırları değiştiğinde (algoritma veya varsayılanlar) artırılır; manifestteki imzası farklı
+# olan dosyalar bir sonraki senkronizasyonda yeniden bölünür
+CHUNKER_VERSION = 1
+
+# Aynı önceliğe sahip bölme noktaları. Sınır, sıradaki ilk grupta bulunan en sondaki noktaya konur
+PARAGRAPH = ("\n\n",)
+LINE = ("\n",)
+SENTENCE = (". ", "? ", "! ", ".\n", "?\n", "!\n")
+WORD = (" ", "\t")
+TEXT_SEPARATORS = (PARAGRAPH, LINE, SENTENCE, WORD)
+# pypdf çıkardığı metinde her görsel satırı "\n" ile bitirir; satır sonu yerine önce cümle sonu aranır
+PDF_SEPARATORS = (PARAGRAPH, SENTENCE, LINE, WORD)
+
+# ATX başlığı ("## Başlık ##"); kod blokları (``` veya ~~~) içindeki satırlar başlık sayılmaz.
+# Satır başı, "#" ile başlayan desenin ardından geriye bakılarak kontrol edilir: regex motoru aday
+# konumları sabit önekle (#) hızlıca bulur, MULTILINE "^" ise her karakterde denenirdi
+_HEADING_RE = re.compile(r"#(?<![^\n]#)(#{0,5})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$", re.MULTILINE)
+_FENCES = ("```", "~~~")
+_NON_SPACE_RE = re.compile(r"\S")
+_SPACE_RE = re.compile(r"\s")
+HEADING_SEPARATOR = " > "
+
+
+class TextChunker:
+    """
+    Metni en fazla chunk_size karakterlik, ardışık olanları yaklaşık chunk_overlap karakter örtüşen
+    parçalara böler. separators'ın ilk grubu (paragraf) bloktur: pencereye sığan bloklar bir arada tutulur,
+    sınır penceredeki son blok sonuna konur ve örtüşme blok sınırının gerisine geçmez; böylece bir blok,
+    önündeki metin ne olursa olsun hep aynı chunk'larla temsil edilir. Pencerede blok sonu yoksa sınır
+    pencerenin ikinci yarısındaki en güçlü bölme noktasına (satır, cümle, kelime) konur, hiçbiri yoksa
+    pencere sonunda kesilir; örtüşme kelime ortasından başlamaz.
+
+    Parçalar (başlangıç, bitiş) karakter konumları olarak üretilir, aramalar str.rfind ile yapılır;
+    böylece süre metin boyutuyla doğrusaldır ve metin bölünürken kopyalanmaz.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100, separators=TEXT_SEPARATORS):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size pozitif olmalı")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap 0 ile chunk_size arasında olmalı")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators
+        # Sınır en erken bu kadar karakter sonra aranır: çok kısa chunk oluşmaz, örtüşmeye rağmen ilerlenir
+        self._min_cut = max(chunk_size // 2, chunk_overlap)
+
+    @property
+    def signature(self) -> str:
+        return f"{CHUNKER_VERSION}:{self.chunk_size}:{self.chunk_overlap}"
+
+    def spans(self, text: str, start: int = 0, end: int = None, final: bool = True):
+        """
+        text[start:end] aralığını böler; ((başlangıç, bitiş) listesi, devam konumu) döndürür.
+        final=False ise metnin devamı henüz okunmamıştır: aralığın sonuna dayanan son parça üretilmez
+        ve devam konumu o parçanın başlangıcıdır (bkz. stream).
+        """
+        end = len(text) if end is None else end
+        spans = []
+        pos = _skip_space(text, start, end)
+        while pos < end:
+            if end - pos <= self.chunk_size:
+                if not final:
+                    break
+                spans.append((pos, _rstrip(text, pos, end)))
+                pos = end
+                break
+            cut = self._cut(text, pos, pos + self.chunk_size)
+            spans.append((pos, _rstrip(text, pos, cut)))
+            pos = _skip_space(text, self._next_start(text, pos, cut), end)
+        return spans, pos
+
+    def _cut(self, text: str, pos: int, limit: int) -> int:
+        blocks, *others = self.separators
+        best = _rfind_any(text, blocks, pos + 1, limit)
+        if best != -1:
+            return best
+        for group in others:
+            best = _rfind_any(text, group, pos + self._min_cut, limit)
+            if best != -1:
+                return best
+        return limit
+
+    def _next_start(self, text: str, pos: int, cut: int) -> int:
+        if not self.chunk_overlap:
+            return cut
+        start = max(cut - self.chunk_overlap, pos + 1)
+        block = _rfind_any(text, self.separators[0], start, cut)
+        if block != -1:
+            return block
+        if text[start - 1].isspace():
+            return start
+        space = _SPACE_RE.search(text, start, cut)
+        return space.end() if space else start
+
+    def stream(self, segments, joiner: str = ""):
+        """
+        Parça parça okunan metni (segments: (metin, metadata) çiftleri, ör. PDF sayfaları) akış halinde
+        böler; (metin, başlangıç, bitiş, metadata) üretir. Konumlar segment'lerin joiner ile birleşmiş
+        halindedir, metadata chunk'ın başladığı segment'inkidir. Segment sonunda yarım kalan parça bir
+        sonraki segment'le birlikte bölünür; bellekte yaklaşık bir segment + bir chunk tutulur.
+        """
+        buffer, base, offset = "", 0, 0   # base: buffer[0]'ın birleşik metindeki konumu
+        starts, metadatas = [], []        # buffer'a giren segment'lerin başlangıç konumları ve metadata'ları
+
+        def emit(spans):
+            for start, end in spans:
+                index = bisect.bisect_right(starts, base + start) - 1
+                yield buffer[start:end], base + start, base + end, metadatas[index]
+
+        for text, metadata in segments:
+            if starts:
+                buffer += joiner
+                offset += len(joiner)
+            starts.append(offset)
+            metadatas.append(metadata)
+            buffer += text
+            offset += len(text)
+            spans, resume = self.spans(buffer, final=False)
+            yield from emit(spans)
+            buffer, base = buffer[resume:], base + resume
+            # Artık hiçbir chunk'ın başlayamayacağı segment'ler unutulur
+            drop = bisect.bisect_right(starts, base) - 1
+            if drop > 0:
+                del starts[:drop], metadatas[:drop]
+
+        spans, _ = self.spans(buffer)
+        yield from emit(spans)
+
+
+def _rfind_any(text: str, separators, start: int, end: int) -> int:
+    """text[start:end] içinde separators'dan herhangi birinin en son geçtiği yerin bitiş konumu, yoksa -1."""
+    best = -1
+    for separator in separators:
+        found = text.rfind(separator, start, end)
+        if found != -1 and found + len(separator) > best:
+            best = found + len(separator)
+    return best
+
+
+def _skip_space(text: str, pos: int, end: int) -> int:
+    found = _NON_SPACE_RE.search(text, pos, end)
+    return found.start() if found else end
+
+
+def _rstrip(text: str, start: int, end: int) -> int:
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end
+
+
+def markdown_sections(text: str):
+    """
+    Markdown metni başlıklarına göre bölümlere ayırır: (başlangıç, bitiş, başlık yolu) listesi.
+    Başlık yolu kök başlıktan bölümün kendi başlığına kadar olan başlıklardır (ör. ("Kurulum", "Linux"));
+    ilk başlıktan önceki metnin yolu boştur. Bölüm kendi başlık satırıyla başlar.
+    """
+    fences = _fence_lines(text)
+    # (açılış, kapanış) çiftleri; kapanmamış kod bloğu metnin sonuna kadar sürer
+    blocks = [(fences[i], fences[i + 1] if i + 1 < len(fences) else len(text)) for i in range(0, len(fences), 2)]
+    block_starts = [start for start, _ in blocks]
+
+    sections, path, levels = [], (), ()
+    start = 0
+    for match in _HEADING_RE.finditer(text):
+        block = bisect.bisect_right(block_starts, match.start()) - 1
+        if block >= 0 and match.start() < blocks[block][1]:
+            continue
+        if match.start() > start or path:
+            sections.append((start, match.start(), path))
+        level = 1 + len(match.group(1))
+        keep = sum(1 for parent in levels if parent < level)
+        path = path[:keep] + (match.group(2).strip(),)
+        levels = levels[:keep] + (level,)
+        start = match.start()
+    sections.append((start, len(text), path))
+    return sections
+
+
+def _fence_lines(text: str):
+    """Kod bloğu çiti (``` / ~~~, en fazla 3 boşluk girintili) olan satırların başlangıç konumları, sıralı."""
+    lines = set()
+    for fence in _FENCES:
+        found = text.find(fence)
+        while found != -1:
+            line = text.rfind("\n", 0, found) + 1
+            if found - line <= 3 and not text[line:found].strip(" \t"):
+                lines.add(line)
+            found = text.find(fence, found + len(fence))
+    return sorted(lines)
+
+
+def split_markdown(text: str, chunker: TextChunker):
+    """
+    Markdown metni başlık hiyerarşisine göre böler; (başlangıç, bitiş, başlık yolu) üretir. Bir bölüm
+    chunk_size'a sığmıyorsa kendi içinde bölünür; art arda gelen kısa bölümler ortak bir üst başlıkları
+    varsa ve birlikte chunk_size'a sığıyorsa tek chunk'ta birleşir (yolları ortak başlıklar olur).
+    Bölümler arasında örtüşme yoktur; farklı başlıkların metni aynı chunk'a ancak birleşince girer.
+    """
+    pending = None  # (başlangıç, bitiş, yol): henüz bölünmemiş, birleştirilmekte olan bölümler
+
+    def flush():
+        start, end, path = pending
+        for span_start, span_end in chunker.spans(text, start, end)[0]:
+            yield span_start, span_end, path
+
+    for start, end, path in markdown_sections(text):
+        if pending is not None:
+            common = _common_prefix(pending[2], path)
+            if common and end - pending[0] <= chunker.chunk_size:
+                pending = (pending[0], end, common)
+                continue
+            yield from flush()
+        pending = (start, end, path)
+    if pending is not None:
+        yield from flush()
+
+
+def _common_prefix(left, right):
+    size = 0
+    for a, b in zip(left, right):
+        if a != b:
+            break
+        size += 1
+    return left[:size]
@@ -0,0 +1,194 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from src.store_generations import GenerationStore
+from src.reload_jobs import ReloadJobManager
+
+# Koleksiyon adı aynı zamanda dizin adıdır; yol ayırıcı veya ".." içeremez
+COLLECTION_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+# İstekte koleksiyon verilmezse kullanılan, data/ + chroma_db/ ile açılan koleksiyonun adı
+DEFAULT_COLLECTION = "default"
+DATA_SUBDIR = "data"
+STORE_SUBDIR = "chroma_db"
+
+
+class Collection:
+    """
+    Bir ekibin/müşterinin ayrı korpusu: kendi data/ dizini, kendi sürümlü veritabanı (chroma_db/gen-*)
+    ve kendi reload iş kuyruğu. Deposu (manager) ilk kullanımda açılır, boşta kalınca kapatılabilir.
+    """
+
+    def __init__(self, name: str, root: str):
+        self.name = name
+        self.data_dir = os.path.join(root, DATA_SUBDIR)
+        self.generations = GenerationStore(os.path.join(root, STORE_SUBDIR))
+        self.reload_jobs = ReloadJobManager()
+        self.users = 0              # depoyu şu an kullanan istek/iş sayısı; 0 değilse kapatılmaz
+        self.last_used = 0.0
+        self.memory_bytes = 0
+        self._manager = None
+        self._open_lock = threading.Lock()
+
+    @property
+    def manager(self):
+        return self._manager
+
+    @manager.setter
+    def manager(self, value):
+        # Reload yeni sürüme geçtiğinde de bellek tahmini güncellenir
+        self._manager = value
+        self.memory_bytes = value.memory_estimate() if value is not None else 0
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "open": self._manager is not None,
+            "memory_bytes": self.memory_bytes,
+            "users": self.users,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1) if self.last_used else None,
+        }
+
+
+class CollectionRegistry:
+    """
+    root/<ad>/data dizini bulunan her alt dizin bir koleksiyondur. Depolar ilk kullanımda
+    open_store(yol) ile açılır ve LRU sırasıyla tutulur: açık depo sayısı max_open'ı veya tahmini
+    bellek kullanımları (BM25/tekrar indeksleri ve vektör indeksi) toplamı max_memory_bytes'ı aşınca
+    en uzun süredir kullanılmayan, o an kullanımda olmayan ve reload'u sürmeyen depolar kapatılır.
+    Kapatılan koleksiyon bir sonraki istekte diskten tekrar açılır (embedding yapılmaz).
+
+    on_open(collection) bir depo her açıldığında çağrılır (ör. data/ ile uzlaştırma işi başlatmak için).
+    """
+
+    def __init__(self, root: str, open_store, on_open=None, max_open: int = 16,
+                 max_memory_bytes: int = 1 << 30):
+        self.root = root
+        self.open_store = open_store
+        self.on_open = on_open
+        self.max_open = max(1, max_open)
+        self.max_memory_bytes = max_memory_bytes
+        self.evictions = 0
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        """Diskteki koleksiyon adları (sıralı)."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if COLLECTION_NAME_RE.match(name) and os.path.isdir(os.path.join(self.root, name, DATA_SUBDIR))
+        )
+
+    def get(self, name: str) -> Collection:
+        """Koleksiyonu döndürür (depoyu açmaz); ad geçersizse veya dizini yoksa KeyError."""
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is not None:
+                return collection
+            if not COLLECTION_NAME_RE.match(name or ""):
+                raise KeyError(name)
+            root = os.path.join(self.root, name)
+            if not os.path.isdir(os.path.join(root, DATA_SUBDIR)):
+                raise KeyError(name)
+            collection = self._collections[name] = Collection(name, root)
+            return collection
+
+    def acquire(self, name: str):
+        """
+        Koleksiyonun deposunu (gerekirse açarak) döndürür; release(name) çağrılana kadar depo LRU
+        tarafından kapatılmaz.
+        """
+        collection = self.get(name)
+        with self._lock:
+            collection.users += 1
+        try:
+            return self._ensure_open(collection)
+        except Exception:
+            self.release(name)
+            raise
+
+    def release(self, name: str):
+        """Kullanımı bitirir; sınırlar aşılmışsa artık boşta kalan depolar kapatılır."""
+        collection = self.get(name)
+        with self._lock:
+            collection.users -= 1
+            collection.last_used = time.monotonic()
+        self.evict()
+
+    @contextmanager
+    def lease(self, name: str):
+        """acquire/release çifti: blok süresince koleksiyonun deposunu verir."""
+        manager = self.acquire(name)
+        try:
+            yield manager
+        finally:
+            self.release(name)
+
+    def _ensure_open(self, collection: Collection):
+        opened = False
+        with collection._open_lock:
+            if collection.manager is None:
+                manager = self.open_store(collection.generations.current())
+                collection.generations.gc()
+                collection.manager = manager
+                opened = True
+            manager = collection.manager
+        collection.last_used = time.monotonic()
+        if opened:
+            if self.on_open is not None:
+                self.on_open(collection)
+            self.evict(keep=collection)
+        return manager
+
+    def open_collections(self):
+        with self._lock:
+            return [c for c in self._collections.values() if c.manager is not None]
+
+    def evict(self, keep: Collection = None):
+        """Sınırlar aşılıyorsa boştaki depoları en uzun süredir kullanılmayandan başlayarak kapatır."""
+        open_collections = self.open_collections()
+        count = len(open_collections)
+        total = sum(c.memory_bytes for c in open_collections)
+        candidates = sorted(
+            (c for c in open_collections if c is not keep and c.users == 0 and c.reload_jobs.active is None),
+            key=lambda c: c.last_used,
+        )
+        for collection in candidates:
+            if count <= self.max_open and total <= self.max_memory_bytes:
+                break
+            memory = collection.memory_bytes
+            if self._close(collection):
+                count -= 1
+                total -= memory
+                self.evictions += 1
+
+    def _close(self, collection: Collection, force: bool = False) -> bool:
+        # Açma kilidi tutulduğu için kapatılırken aynı dizin için ikinci bir depo açılamaz
+        with collection._open_lock:
+            with self._lock:
+                if collection.manager is None or (not force and (collection.users or collection.reload_jobs.active)):
+                    return False
+                manager = collection.manager
+                collection.manager = None
+            manager.save()
+            manager.close()
+            return True
+
+    def close_all(self):
+        """Kapanışta bütün açık depoları kaydedip kapatır."""
+        for collection in self.open_collections():
+            self._close(collection, force=True)
+
+    def stats(self):
+        open_collections = self.open_collections()
+        return {
+            "known": len(self.names()),
+            "open": len(open_collections),
+            "max_open": self.max_open,
+            "memory_bytes": sum(c.memory_bytes for c in open_collections),
+            "max_memory_bytes": self.max_memory_bytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,102 @@
+import os
+
+# Proje dizinleri
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, "data")
+CHROMA_DB_DIR = os.path.join(PROJECT_DIR, "chroma_db")
+
+# Embedding önbelleği: chroma_db silinse/yeniden kurulsa bile korunması için deponun dışında tutulur
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(PROJECT_DIR, "embedding_cache.sqlite"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# Ollama ve embedding hattı
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# Embedding modeli, üretim modelinden (LLMClient) bağımsızdır. EMBEDDING_PROVIDER "ollama" (OLLAMA_BASE_URL
+# üzerinden, EMBEDDING_MODEL varsayılanı llama3.2; nomic-embed-text gibi küçük bir embedding modeli
+# önerilir) veya "local" (Ollama gerektirmeyen, süreç içinde CPU'da çalışan all-MiniLM-L6-v2).
+# Model değiştirildiğinde depo bir sonraki senkronizasyonda yeni modelle baştan indekslenir
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "ollama")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+
+# Dosya parse/bölme işleminde kullanılacak süreç sayısı (1 = sıralı)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+# Chunk boyutu ve ardışık chunk'lar arası örtüşme (karakter). CHUNK_SIZE / CHUNK_OVERLAP bütün formatların
+# varsayılanıdır; CHUNK_SIZE_PDF, CHUNK_OVERLAP_MD gibi değişkenlerle format bazında değiştirilebilir.
+# Değiştirildiğinde ilgili dosyalar bir sonraki senkronizasyonda yeniden bölünüp embed edilir
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "100"))
+CHUNK_SETTINGS = {
+    fmt: (int(os.getenv(f"CHUNK_SIZE_{fmt.upper()}", str(CHUNK_SIZE))),
+          int(os.getenv(f"CHUNK_OVERLAP_{fmt.upper()}", str(CHUNK_OVERLAP))))
+    for fmt in ("pdf", "txt", "md")
+}
+
+# LLM (Ollama /api/generate) istemcisi
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "10"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# /ask sırasında vektör aramasını event loop dışında çalıştıran thread havuzunun boyutu
+RETRIEVAL_WORKERS = int(os.getenv("RETRIEVAL_WORKERS", "4"))
+
+# Tekrarlanan sorular için önbellekler: normalize soru -> sorgu vektörü (LRU) ve
+# (soru, getirilen chunk ID'leri, model, prompt şablonu) -> cevap (TTL'li)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+
+# Blue/green reload: yeni sürüme geçildikten sonra eski sürüm dizini, üzerinde süren
+# okumaların bitmesi için bu kadar saniye bekletilip silinir. Süre dolduğunda eski depoyu hâlâ
+# tutan istekler (ör. uzun bir /ask/batch) varsa silme onlar bitene kadar ertelenir
+RELOAD_GC_GRACE_SECONDS = float(os.getenv("RELOAD_GC_GRACE_SECONDS", "10"))
+
+# Arama modu: "hybrid" (BM25 + vektör, RRF ile birleştirilir; anahtar kelime tarzı sorgularda
+# embedding'siz hızlı yol), "dense" (sadece vektör) veya "lexical" (sadece BM25)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+
+# Vektör deposu arka ucu: "chroma" (varsayılan) veya "numpy" (yerel memmap motoru).
+# numpy için nicemleme (float32 / float16 / int8) ve indeks tipi (auto / flat / ivf) seçilebilir;
+# auto, koleksiyon VECTOR_IVF_MIN_VECTORS'e ulaşınca IVF'e geçer.
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "float32")
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "auto")
+VECTOR_IVF_MIN_VECTORS = int(os.getenv("VECTOR_IVF_MIN_VECTORS", "50000"))
+VECTOR_IVF_NPROBE = int(os.getenv("VECTOR_IVF_NPROBE", "8"))
+
+# Ingestion'da tekrar eden chunk'ların ayıklanması: "near" (birebir aynı + MinHash ile neredeyse aynı),
+# "exact" (sadece birebir aynı, büyük/küçük harf ve boşluk farkı yok sayılır) veya "off"
+DEDUP_MODE = os.getenv("DEDUP_MODE", "near")
+
+# /ask bağlamı: aramadan CONTEXT_CANDIDATES aday parça getirilir, örtüşmeler ayıklanır ve en alakalı
+# parçalar CONTEXT_TOKEN_BUDGET token'a sığacak kadar prompt'a konur. Token'lar yerelde sayılır;
+# CONTEXT_TOKENIZER_PATH modelin tokenizer.json dosyasını gösterirse birebir, yoksa tahmini sayım yapılır
+CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "8"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_TOKENIZER_PATH = os.getenv("CONTEXT_TOKENIZER_PATH", "")
+
+# /ask/batch: sorular ASK_BATCH_RETRIEVAL_SIZE'lık gruplar halinde tek batch'li embedding + çok sorgulu
+# aramayla getirilir; cevaplar en fazla ASK_BATCH_CONCURRENCY işçiyle üretilir (Ollama'ya giden istekler
+# ayrıca LLM_MAX_CONCURRENCY ile sınırlıdır). Tek istekte en fazla ASK_BATCH_MAX_QUESTIONS soru kabul edilir
+ASK_BATCH_CONCURRENCY = int(os.getenv("ASK_BATCH_CONCURRENCY", str(LLM_MAX_CONCURRENCY)))
+ASK_BATCH_RETRIEVAL_SIZE = int(os.getenv("ASK_BATCH_RETRIEVAL_SIZE", "64"))
+ASK_BATCH_MAX_QUESTIONS = int(os.getenv("ASK_BATCH_MAX_QUESTIONS", "10000"))
+
+# data/ izleyicisi: WATCH_DATA_DIR=1 ile açılır. Klasör WATCH_POLL_SECONDS aralıklarla stat ile taranır;
+# değişen dosyalar WATCH_DEBOUNCE_SECONDS boyunca sabit kalınca sadece onlar canlı depoya işlenir
+WATCH_DATA_DIR = os.getenv("WATCH_DATA_DIR", "0").lower() in ("1", "true", "yes")
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "2"))
+WATCH_DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "1"))
+
+# Koleksiyonlar (ekip/müşteri başına ayrı korpus): COLLECTIONS_DIR/<ad>/data klasörü bulunan her alt
+# dizin bir koleksiyondur, veritabanı COLLECTIONS_DIR/<ad>/chroma_db altında tutulur. Depolar ilk
+# istekte açılır; açık depo sayısı COLLECTION_MAX_OPEN'ı veya tahmini bellek kullanımları
+# COLLECTION_MAX_MEMORY_MB'ı aşınca en uzun süredir kullanılmayanlar kapatılır
+COLLECTIONS_DIR = os.getenv("COLLECTIONS_DIR", os.path.join(PROJECT_DIR, "collections"))
+COLLECTION_MAX_OPEN = int(os.getenv("COLLECTION_MAX_OPEN", "16"))
+COLLECTION_MAX_MEMORY_MB = int(os.getenv("COLLECTION_MAX_MEMORY_MB", "1024"))
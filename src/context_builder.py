@@ -0,0 +1,161 @@
+import math
+import re
+from dataclasses import dataclass, field
+
+# Bundan kısa ortak başlangıç/bitişler örtüşme sayılmaz (tesadüfi eşleşmeler)
+MIN_OVERLAP_CHARS = 20
+# Bütçenin sonuna sığmayan parça, kalan yer en az bu kadar token'sa cümle sınırından kısaltılarak eklenir
+MIN_PASSAGE_TOKENS = 48
+# Tokenizer dosyası verilmediğinde kelime parçası başına tahmin: Llama'nın tokenizer'ı Türkçe metinde
+# ortalama ~3 karakterde bir token üretir; bütçe aşılmasın diye yukarı yuvarlanır
+CHARS_PER_TOKEN = 3
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END_RE = re.compile(r"[.!?…:;]\s|\n")
+
+
+class TokenCounter:
+    """
+    Prompt'un token sayısını yerelde (Ollama'ya gitmeden) hesaplar.
+    tokenizer_path verilirse modelin tokenizer.json dosyası HuggingFace `tokenizers` ile yüklenir
+    ve sayım birebir olur; verilmezse kelime parçası başına karakter sayısından tahmin edilir.
+    """
+
+    def __init__(self, tokenizer_path: str = None):
+        self.tokenizer = None
+        if tokenizer_path:
+            from tokenizers import Tokenizer
+            self.tokenizer = Tokenizer.from_file(tokenizer_path)
+
+    @property
+    def name(self) -> str:
+        return "tokenizer" if self.tokenizer is not None else "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        return sum(math.ceil(len(piece) / CHARS_PER_TOKEN) for piece in _PIECE_RE.findall(text))
+
+
+def overlap_length(left: str, right: str, min_chars: int = MIN_OVERLAP_CHARS) -> int:
+    """left'in sonu ile right'ın başının ortak olduğu en uzun parçanın uzunluğu (yoksa 0)."""
+    if len(left) < min_chars or len(right) < min_chars:
+        return 0
+    probe = right[:min_chars]
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+@dataclass
+class Passage:
+    doc: object
+    text: str
+    rank: int
+    tokens: int = 0
+
+
+@dataclass
+class BuiltContext:
+    """build() sonucu: prompt'a girecek metin, kullanılan chunk ID'leri ve istatistikler."""
+    text: str
+    doc_ids: tuple
+    stats: dict = field(default_factory=dict)
+
+
+class ContextBuilder:
+    """
+    Aday parçalardan token bütçesine sığan bağlamı kurar:
+
+    1. Adaylar alaka sırasıyla gezilir; daha önce seçilmiş bir parçanın içinde kalan aday atılır,
+       aynı kaynaktan seçilmiş bir parçayla baştan/sondan örtüşen kısmı (splitter'ın chunk_overlap'i)
+       kırpılır.
+    2. Kalan metin token_budget dolana kadar eklenir; sığmayan son parça cümle sınırından kısaltılır.
+    3. Seçilen parçalar alaka sırasına göre değil (kaynak, sayfa, ID) sırasına göre dizilir. Böylece
+       aynı parçaları getiren sorular birebir aynı prompt önekini üretir ve Ollama, sabit sistem
+       talimatından sonra bağlamın ortak kısmı için de KV-cache'i yeniden kullanabilir.
+    """
+
+    def __init__(self, token_budget: int = 1500, counter: TokenCounter = None, separator: str = "\n\n"):
+        self.token_budget = token_budget
+        self.counter = counter or TokenCounter()
+        self.separator = separator
+
+    def _dedupe(self, docs):
+        """İçerilen adayları atar, örtüşmeleri kırpar; (parçalar, atılan aday sayısı) döndürür."""
+        selected, dropped = [], 0
+        for rank, doc in enumerate(docs):
+            original = text = doc.page_content.strip()
+            source = doc.metadata.get("source")
+            for passage in selected:
+                if text in passage.doc.page_content:
+                    text = ""
+                    break
+                if passage.doc.metadata.get("source") != source:
+                    continue
+                head = overlap_length(passage.text, text)
+                if head:
+                    text = text[head:].lstrip()
+                tail = overlap_length(text, passage.text)
+                if tail:
+                    text = text[:len(text) - tail].rstrip()
+            # Kırpıldıktan sonra geriye sadece birkaç karakter kalan aday da tekrar sayılır
+            if not text or (text != original and len(text) < MIN_OVERLAP_CHARS):
+                dropped += 1
+                continue
+            selected.append(Passage(doc=doc, text=text, rank=rank))
+        return selected, dropped
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """Metni budget token'a sığacak şekilde son cümle sınırından keser; sığmazsa boş döner."""
+        tokens = self.counter.count(text)
+        while text and tokens > budget:
+            limit = int(len(text) * budget / tokens)
+            ends = [m.end() for m in _SENTENCE_END_RE.finditer(text, 0, limit)]
+            text = text[:ends[-1]].rstrip() if ends else ""
+            tokens = self.counter.count(text)
+        return text
+
+    def build(self, docs) -> BuiltContext:
+        docs = list(docs)
+        passages, dropped = self._dedupe(docs)
+        separator_tokens = self.counter.count(self.separator)
+        packed, used, truncated = [], 0, 0
+        for passage in passages:
+            remaining = self.token_budget - used - (separator_tokens if packed else 0)
+            if remaining <= 0:
+                break
+            passage.tokens = self.counter.count(passage.text)
+            if passage.tokens > remaining:
+                if remaining < MIN_PASSAGE_TOKENS:
+                    continue
+                passage.text = self._truncate(passage.text, remaining)
+                if not passage.text:
+                    continue
+                passage.tokens = self.counter.count(passage.text)
+                truncated += 1
+            packed.append(passage)
+            used += passage.tokens + (separator_tokens if len(packed) > 1 else 0)
+
+        packed.sort(key=lambda p: (
+            str(p.doc.metadata.get("source", "")), p.doc.metadata.get("page") or -1, p.doc.id or "",
+        ))
+        text = self.separator.join(p.text for p in packed)
+        return BuiltContext(
+            text=text,
+            doc_ids=tuple(p.doc.id for p in packed),
+            stats={
+                "candidates": len(docs),
+                "passages": len(packed),
+                "dropped_overlap": dropped,
+                "truncated": truncated,
+                "context_tokens": self.counter.count(text),
+                "token_budget": self.token_budget,
+                "tokenizer": self.counter.name,
+            },
+        )
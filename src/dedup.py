@@ -0,0 +1,338 @@
+import hashlib
+import os
+import pickle
+import threading
+import numpy as np
+from src.lexical_index import tokenize, turkish_lower
+
+DEDUP_MODES = ("near", "exact", "off")
+# MinHash imzasından tahmin edilen Jaccard benzerliği (kelime 3-gram'ları) bunun üstündeyse
+# chunk'lar neredeyse aynı kabul edilir (tekrarlanan şablon paragraflar, aynı PDF'in revizyonları)
+NEAR_DUPLICATE_JACCARD = 0.8
+SHINGLE_SIZE = 3
+# İmza MINHASH_BANDS x MINHASH_ROWS değerden oluşur; bir bandı birebir aynı olan chunk'lar aday olur.
+# 8 x 4 ile Jaccard'ı 0.8 olan iki chunk %98 olasılıkla aday olur, ilgisiz chunk'lar neredeyse hiç
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+# Bundan az shingle'ı olan kısa metinlerde benzerlik tahmini güvenilir değil, sadece birebir eşleşme aranır
+MIN_SHINGLES = 8
+
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 1 << 31, MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def content_hash(text: str) -> int:
+    """Büyük/küçük harf ve boşluk farklarını yok sayan 64 bitlik içerik özeti."""
+    return _hash64(" ".join(turkish_lower(text).split()))
+
+
+def minhash(text: str):
+    """
+    Kelime (kök) 3-gram'larının MinHash imzasını bytes olarak döndürür; metin çok kısaysa None.
+    İki imzada aynı olan değerlerin oranı, shingle kümelerinin Jaccard benzerliğinin tahminidir.
+    """
+    tokens = tokenize(text)
+    shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(0, len(tokens) - SHINGLE_SIZE + 1))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter((_hash64(s) & 0xFFFFFFFF for s in shingles), dtype=np.uint64, count=len(shingles))
+    signature = ((hashes[:, None] * _PERM_A + _PERM_B) % _PRIME).min(axis=0)
+    return signature.astype(np.uint32).tobytes()
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """İki MinHash imzasından tahmini Jaccard benzerliği."""
+    return float(np.mean(np.frombuffer(a, dtype=np.uint32) == np.frombuffer(b, dtype=np.uint32)))
+
+
+def fingerprint(text: str):
+    """(içerik özeti, MinHash imzası veya None) çifti; match() ve add() bunu kullanır."""
+    return content_hash(text), minhash(text)
+
+
+class DedupIndex:
+    """
+    Depodaki chunk'ların içerik özetleri, MinHash imzaları ve kaynakları (provenance).
+    Ingestion sırasında yeni bir chunk embed edilmeden önce burada aranır: birebir veya neredeyse aynı
+    bir chunk zaten varsa yeni chunk depoya yazılmaz, sadece mevcut chunk'a kaynak olarak eklenir.
+    Her chunk'ın kaynakları {(dosya yolu, dosya sha256): [sayfalar]} olarak tutulur; son kaynağı
+    bırakılan chunk depodan silinmelidir (bkz. release). Depodaki metin ve metadata, chunk'ı depoya
+    yazan kaynağındır (sahibi); sahibi bırakılıp başka kaynakları kalan chunk'lar settle() ile çözülür.
+    Her dosya sürümünün filtre metadata'sı da (source_name, file_type, ingested_at) tutulur; böylece
+    aramadaki dosya filtreleri chunk'ı sadece yazan dosyaya değil bütün kaynaklarına göre uygulanır
+    (bkz. matching_references). save() ile persist dizinine atomik yazılır.
+    """
+
+    VERSION = 3
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._exact = {}                       # içerik özeti -> chunk ID
+        self._hashes = {}                      # chunk ID -> (içerik özeti, MinHash imzası veya None)
+        self._bands = [{} for _ in range(MINHASH_BANDS)]  # bant değeri -> [chunk ID]
+        self._refs = {}                        # chunk ID -> {(kaynak, sürüm): [sayfa]}
+        self._owners = {}                      # chunk ID -> chunk'ı depoya yazan (kaynak, sürüm)
+        self._near = {}                        # chunk ID -> {neredeyse aynı olarak eşleşen (kaynak, sürüm)}
+        self._files = {}                       # (kaynak, sürüm) -> filtre metadata'sı
+        # _refs'in dosya sürümüne göre tersi: (kaynak, sürüm) -> {sayfa: {chunk ID}} (diske yazılmaz)
+        self._by_file = {}
+        self._reference_total = 0              # bütün kaynak kayıtlarının (sayfa dahil) sayısı
+        self.dirty = False
+        # Her değişiklikte artar; aramada hesaplanan filtre sonuçlarının önbelleği buna bağlıdır
+        self.revision = getattr(self, "revision", 0) + 1
+
+    @classmethod
+    def load(cls, path: str):
+        """Diskteki indeksi açar; dosya yoksa veya okunamıyorsa boş indeks döner."""
+        index = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    data = pickle.load(f)
+                if data.get("version") == cls.VERSION:
+                    for doc_id, fp in data["hashes"].items():
+                        index._register(doc_id, fp)
+                    index._refs = data["refs"]
+                    index._owners = data["owners"]
+                    index._near = data["near"]
+                    index._files = data["files"]
+                    for doc_id, refs in index._refs.items():
+                        for key, pages in refs.items():
+                            index._index_pages(doc_id, key, pages)
+            except Exception as e:
+                print(f"--- Tekrar indeksi okunamadı, yeniden oluşturulacak: {e} ---")
+                index._reset()
+        return index
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _index_pages(self, doc_id, key, pages):
+        by_page = self._by_file.setdefault(key, {})
+        for page in pages:
+            by_page.setdefault(page, set()).add(doc_id)
+        self._reference_total += len(pages)
+
+    def _unindex_pages(self, doc_id, key, pages):
+        by_page = self._by_file.get(key, {})
+        for page in set(pages):
+            bucket = by_page.get(page)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del by_page[page]
+        if not by_page:
+            self._by_file.pop(key, None)
+        self._reference_total -= len(pages)
+
+    def _register(self, doc_id, fp):
+        exact, signature = fp
+        self._hashes[doc_id] = fp
+        self._exact.setdefault(exact, doc_id)
+        if signature is not None:
+            for band, value in enumerate(self._band_values(signature)):
+                self._bands[band].setdefault(value, []).append(doc_id)
+
+    @staticmethod
+    def _band_values(signature: bytes):
+        width = MINHASH_ROWS * 4
+        return [signature[band * width:(band + 1) * width] for band in range(MINHASH_BANDS)]
+
+    def match(self, fp, mode: str = "near"):
+        """
+        Parmak izi verilen metnin depoda birebir ("exact") veya neredeyse ("near") aynısı var mı?
+        (tür, chunk ID) döndürür; yoksa (None, None).
+        """
+        if mode == "off":
+            return None, None
+        exact, signature = fp
+        with self._lock:
+            doc_id = self._exact.get(exact)
+            if doc_id is not None:
+                return "exact", doc_id
+            if mode != "near" or signature is None:
+                return None, None
+            candidates = set()
+            for band, value in enumerate(self._band_values(signature)):
+                candidates.update(self._bands[band].get(value, ()))
+            best, best_score = None, NEAR_DUPLICATE_JACCARD
+            for candidate in sorted(candidates):
+                score = similarity(signature, self._hashes[candidate][1])
+                if score >= best_score:
+                    best, best_score = candidate, score
+            return ("near", best) if best is not None else (None, None)
+
+    def _changed(self):
+        self.dirty = True
+        self.revision += 1
+
+    def register(self, doc_id: str, fp):
+        """Chunk'ın parmak izini kaynak eklemeden kaydeder (indeksi depodan yeniden kurarken)."""
+        with self._lock:
+            if doc_id not in self._hashes:
+                self._register(doc_id, fp)
+                self._changed()
+
+    def add(self, doc_id: str, fp, source: str, version: str, page=None, metadata: dict = None):
+        """Depoya yazılacak yeni bir chunk'ı ve onu yazan (sahibi olan) ilk kaynağını kaydeder."""
+        self.register(doc_id, fp)
+        self.add_reference(doc_id, source, version, page, owner=True, metadata=metadata)
+
+    def add_reference(self, doc_id: str, source: str, version: str, page=None, near: bool = False,
+                      owner: bool = False, metadata: dict = None):
+        """
+        Mevcut bir chunk'a (aynı içeriği taşıyan) yeni bir kaynak ekler. near=True ise kaynağın metni
+        chunk'ınkiyle birebir değil neredeyse aynıdır; owner=True ise depodaki kayıt bu kaynağa aittir.
+        metadata, dosya sürümünün filtre alanlarıdır (bkz. ingestion.chunk_metadata).
+        """
+        with self._lock:
+            key = (source, version)
+            self._refs.setdefault(doc_id, {}).setdefault(key, []).append(page)
+            self._index_pages(doc_id, key, [page])
+            if near:
+                self._near.setdefault(doc_id, set()).add(key)
+            if owner:
+                self._owners[doc_id] = key
+            if metadata is not None:
+                self._files[key] = metadata
+            self._changed()
+
+    def owner(self, doc_id: str):
+        """Chunk'ı depoya yazan (kaynak, sürüm); bilinmiyorsa None."""
+        return self._owners.get(doc_id)
+
+    def release(self, ids, source: str, version: str):
+        """
+        Bir dosya sürümünün verilen chunk'lar üzerindeki kaynak kayıtlarını bırakır.
+        Başka kaynağı kalmayan (depodan silinmesi gereken) chunk ID'lerini döndürür.
+        """
+        orphans = []
+        with self._lock:
+            for doc_id in dict.fromkeys(ids):
+                refs = self._refs.get(doc_id)
+                if refs is None:
+                    orphans.append(doc_id)
+                    continue
+                pages = refs.pop((source, version), None)
+                if pages is not None:
+                    self._unindex_pages(doc_id, (source, version), pages)
+                self._near.get(doc_id, set()).discard((source, version))
+                if not refs:
+                    orphans.append(doc_id)
+            # Bir dosya sürümü hep bütün chunk'larıyla birlikte bırakılır
+            self._files.pop((source, version), None)
+            self._changed()
+        return orphans
+
+    def settle(self, ids):
+        """
+        release() ve bırakılan chunk'ların silinmesinden sonra çağrılır. Sahibi bırakılıp başka kaynakları
+        kalan chunk'larda sahiplik birebir aynı içerikli bir kaynağa (tercihen aynı dosyanın yeni sürümüne)
+        geçer; metin aynı kalır, depodaki metadata yeni sahibine göre yeniden yazılmalıdır. Sadece
+        neredeyse aynı kaynakları kalan chunk'ın metni hiçbirinin gerçek içeriği değildir; o kaynaklar
+        yeniden işlenmelidir. ({chunk ID: (yeni sahip, sürüm, sayfa)}, {yeniden işlenecek kaynaklar}) döndürür.
+        """
+        moved, stale = {}, set()
+        with self._lock:
+            for doc_id in dict.fromkeys(ids):
+                refs, owner = self._refs.get(doc_id), self._owners.get(doc_id)
+                if not refs or owner is None or owner in refs:
+                    continue
+                near = self._near.get(doc_id, set())
+                exact = sorted((key for key in refs if key not in near), key=lambda key: (key[0] != owner[0], key))
+                if exact:
+                    self._owners[doc_id] = exact[0]
+                    moved[doc_id] = (*exact[0], refs[exact[0]][0])
+                    self._changed()
+                else:
+                    stale.update(source for source, _ in refs)
+        return moved, stale
+
+    def remove(self, ids):
+        """Depodan silinen chunk'ları indeksten tamamen çıkarır."""
+        with self._lock:
+            for doc_id in ids:
+                fp = self._hashes.pop(doc_id, None)
+                for key, pages in self._refs.pop(doc_id, {}).items():
+                    self._unindex_pages(doc_id, key, pages)
+                self._owners.pop(doc_id, None)
+                self._near.pop(doc_id, None)
+                if fp is None:
+                    continue
+                exact, signature = fp
+                if self._exact.get(exact) == doc_id:
+                    del self._exact[exact]
+                if signature is not None:
+                    for band, value in enumerate(self._band_values(signature)):
+                        bucket = self._bands[band].get(value)
+                        if bucket and doc_id in bucket:
+                            bucket.remove(doc_id)
+                            if not bucket:
+                                del self._bands[band][value]
+                self._changed()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._changed()
+
+    def matching_references(self, predicate):
+        """
+        Depoya yazan dosya dışındaki kaynaklarından (dosya sürümü + sayfa) en az biri predicate'e uyan
+        chunk ID'leri. predicate kaynağın metadata'sını alır: dosyanın filtre alanları, "source" ve
+        (varsa) "page". Bütün kayıtlar taranmaz; predicate her dosya sürümü ve sayfası için bir kez
+        çağrılır, sadece uyanların chunk'ları toplanır.
+        """
+        found = set()
+        with self._lock:
+            for key, metadata in self._files.items():
+                metadata = {**metadata, "source": key[0]}
+                for page, doc_ids in self._by_file.get(key, {}).items():
+                    if predicate(metadata if page is None else {**metadata, "page": page}):
+                        found.update(doc_id for doc_id in doc_ids if self._owners.get(doc_id) != key)
+        return found
+
+    def sources(self, doc_id: str):
+        """Chunk'ın bütün kaynakları: [{"source", "pages"}, ...] (dosya yoluna göre sıralı)."""
+        pages = {}
+        for (source, _), source_pages in self._refs.get(doc_id, {}).items():
+            pages.setdefault(source, set()).update(p for p in source_pages if p is not None)
+        return [{"source": source, "pages": sorted(pages[source])} for source in sorted(pages)]
+
+    def reference_count(self, doc_id: str) -> int:
+        return sum(len(pages) for pages in self._refs.get(doc_id, {}).values())
+
+    def save(self):
+        """İndeksi geçici dosyaya yazıp atomik olarak yerine koyar (değişiklik yoksa yazmaz)."""
+        if self.path is None or not self.dirty:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "version": self.VERSION, "hashes": self._hashes, "refs": self._refs,
+                    "owners": self._owners, "near": self._near, "files": self._files,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def stats(self):
+        # Sayaçlar add_reference/release/remove'da güncellenir; her /db/stats isteğinde kayıtlar taranmaz
+        references = self._reference_total
+        return {
+            "chunks": len(self._hashes),
+            "references": references,
+            "duplicates_avoided": max(0, references - len(self._refs)),
+            "size_bytes": os.path.getsize(self.path) if self.path and os.path.exists(self.path) else 0,
+        }
@@ -1,39 +1,164 @@
 import os
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, UnstructuredMarkdownLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import time
+from src.chunker import TextChunker, TEXT_SEPARATORS, PDF_SEPARATORS, HEADING_SEPARATOR, split_markdown
+
+# .txt dosyaları bu boyutta (karakter) bloklar halinde okunur, böylece dev dosyalar belleğe tek seferde alınmaz
+TEXT_BLOCK_SIZE = 64 * 1024
+# pypdf okunan her nesneyi önbellekte tutar; bu kadar sayfada bir önbellek boşaltılır
+PDF_CACHE_PAGES = 32
+
+# Sayfa ağacında üst düğümlerden sayfalara miras kalan alanlar (PDF 1.7, 7.7.3.4)
+_INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _walk_page_tree(reader, node, inherited):
+    """PDF sayfa ağacını sırayla dolaşıp sayfaları tek tek pypdf PageObject olarak üretir."""
+    from pypdf import PageObject
+    inherited = {**inherited, **{key: node[key] for key in _INHERITABLE_PAGE_KEYS if key in node}}
+    for ref in node.get("/Kids", []):
+        kid = ref.get_object()
+        if "/Kids" in kid:
+            yield from _walk_page_tree(reader, kid, inherited)
+            continue
+        page = PageObject(reader, ref)
+        page.update(inherited)
+        page.update(kid)
+        yield page
+
 
 class DocumentProcessor:
     """
     Farklı formatlardaki (PDF, TXT, MD) dökümanları otomatik olarak tanıyan,
     yükleyen ve küçük parçalara ayıran sınıf.
+
+    chunk_size / chunk_overlap verilmezse formatın ayarları (config.CHUNK_SETTINGS) kullanılır.
     """
-    
-    def __init__(self, file_path: str):
+
+    def __init__(self, file_path: str, chunk_size: int = None, chunk_overlap: int = None):
+        from src.config import CHUNK_SETTINGS
         self.file_path = file_path
+        self.extension = os.path.splitext(file_path)[-1].lower()
+        size, overlap = CHUNK_SETTINGS.get(self.extension.lstrip("."), (1000, 100))
+        self.chunk_size = size if chunk_size is None else chunk_size
+        self.chunk_overlap = overlap if chunk_overlap is None else chunk_overlap
+        # iter_chunks sırasında okumada (parse) ve bölmede (split) geçen toplam süre, saniye
+        self.timings = {"parse": 0.0, "split": 0.0}
+
+    def chunker(self) -> TextChunker:
+        separators = PDF_SEPARATORS if self.extension == ".pdf" else TEXT_SEPARATORS
+        return TextChunker(self.chunk_size, self.chunk_overlap, separators)
+
+    @property
+    def signature(self) -> str:
+        """Chunk sınırlarını belirleyen ayarların özeti; manifestte dosyanın kaydıyla birlikte tutulur."""
+        return self.chunker().signature
 
     def process(self):
+        """Dökümanın tüm parçalarını liste olarak döndürür (bkz. iter_chunks)."""
+        return list(self.iter_chunks())
+
+    def iter_pages(self):
+        """
+        Dökümanı sayfa sayfa (PDF) veya blok blok (TXT) okuyup Document olarak üreten generator.
+        Aynı anda bellekte sadece bir sayfa bulunur. Markdown dosyaları başlık yapısı için tek
+        Document olarak okunur.
+        """
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"Döküman bulunamadı: {self.file_path}")
 
-        ext = os.path.splitext(self.file_path)[-1].lower()
-        
+        ext = self.extension
+
         # (unit test de test_unsupported_file_extension() için fix)
         # Hata yakalamayı  önce yapalım. sadece desteklediğimiz türden dosyaları alacağız, else , throw "ValueError"
         if ext == ".pdf":
-            loader = PyPDFLoader(self.file_path)
+            pages = self._iter_pdf_pages()
         elif ext == ".txt":
-            loader = TextLoader(self.file_path, encoding='utf-8')
+            pages = self._iter_text_blocks()
         elif ext == ".md":
-            loader = UnstructuredMarkdownLoader(self.file_path)
+            pages = self._iter_markdown()
         else:
             # burası doğrudan fırlatılmalı
             raise ValueError(f"Desteklenmeyen dosya formatı: {ext}. Lütfen PDF, TXT veya MD kullanın.")
-        
+
         # sadece dosya okuma işlemini try-except içine alalım
         try:
-            documents = loader.load()
+            yield from pages
         except Exception as e:
             raise Exception(f"Döküman okunurken teknik bir hata oluştu: {str(e)}")
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        return text_splitter.split_documents(documents)
\ No newline at end of file
+    def _iter_pdf_pages(self):
+        # PyPDFLoader her sayfada tüm sayfa etiketlerini yeniden hesaplıyor, reader.pages de ilk
+        # erişimde tüm sayfa ağacını belleğe açıyor; bu yüzden sayfa ağacı tembel olarak dolaşılır ve
+        # pypdf'in nesne önbelleği düzenli olarak boşaltılır. pypdf ağır bir kütüphane; API sürecinin
+        # hızlı açılması için sadece bir PDF gerçekten işlenirken yüklenir
+        import pypdf
+        from langchain_core.documents import Document
+        with open(self.file_path, "rb") as f:
+            reader = pypdf.PdfReader(f)
+            root = reader.trailer["/Root"]["/Pages"].get_object()
+            total_pages = int(root.get("/Count", 0))
+            for number, page in enumerate(_walk_page_tree(reader, root, {})):
+                yield Document(page_content=page.extract_text().strip(), metadata={
+                    "source": self.file_path, "total_pages": total_pages, "page": number,
+                })
+                if (number + 1) % PDF_CACHE_PAGES == 0:
+                    reader.resolved_objects.clear()
+
+    def _iter_text_blocks(self):
+        from langchain_core.documents import Document
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for block in iter(lambda: f.read(TEXT_BLOCK_SIZE), ""):
+                yield Document(page_content=block, metadata={"source": self.file_path})
+
+    def _iter_markdown(self):
+        # Markdown düz metin olarak okunur (unstructured gerekmez); başlıklar bölme sırasında kullanılır
+        from langchain_core.documents import Document
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            yield Document(page_content=f.read(), metadata={"source": self.file_path})
+
+    def _timed_pages(self):
+        pages = self.iter_pages()
+        while True:
+            started = time.perf_counter()
+            page = next(pages, None)
+            self.timings["parse"] += time.perf_counter() - started
+            if page is None:
+                return
+            yield page
+
+    def iter_chunks(self):
+        """
+        Sayfaları okundukça parçalara ayırıp chunk'ları tek tek üreten generator (bkz. src.chunker).
+        Her sayfanın son (muhtemelen yarım) parçası bir sonraki sayfanın başına eklenerek yeniden
+        bölünür; böylece sayfa sınırında kesilen cümleler tek chunk'ta birleşir ve chunk'lar arası
+        örtüşme (overlap) sayfa geçişlerinde de korunur. Chunk'ın metadata'sı başladığı sayfanınkidir.
+        Bellek kullanımı dökümanın boyutundan bağımsız olarak yaklaşık bir sayfa + bir chunk kadardır.
+
+        Markdown başlık hiyerarşisine göre bölünür ve chunk'lar başlık yolunu (heading_path,
+        ör. "Kurulum > Linux") taşır. Her chunk'ın metindeki konumu char_start / char_end olarak
+        metadata'ya yazılır (PDF'lerde sayfaların satır sonuyla birleştirilmiş metnine göre).
+        """
+        from langchain_core.documents import Document
+        chunker = self.chunker()
+        if self.extension == ".md":
+            pieces = self._markdown_pieces(chunker)
+        else:
+            # .txt blokları metnin kesintisiz devamıdır; PDF sayfaları arasına satır sonu konur
+            joiner = "" if self.extension == ".txt" else "\n"
+            pages = ((page.page_content, page.metadata) for page in self._timed_pages())
+            pieces = chunker.stream(pages, joiner)
+
+        while True:
+            started, parse = time.perf_counter(), self.timings["parse"]
+            piece = next(pieces, None)
+            self.timings["split"] += time.perf_counter() - started - (self.timings["parse"] - parse)
+            if piece is None:
+                break
+            text, start, end, metadata = piece
+            yield Document(page_content=text, metadata={**metadata, "char_start": start, "char_end": end})
+
+    def _markdown_pieces(self, chunker: TextChunker):
+        for page in self._timed_pages():
+            text = page.page_content
+            for start, end, path in split_markdown(text, chunker):
+                yield text[start:end], start, end, {**page.metadata, "heading_path": HEADING_SEPARATOR.join(path)}
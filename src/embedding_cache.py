@@ -0,0 +1,152 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from langchain_core.embeddings import Embeddings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    (model, sha256(metin)) anahtarıyla float32 vektörleri SQLite'ta saklayan kalıcı önbellek.
+    Kayıt sayısı max_entries'i aşınca en uzun süredir kullanılmayan kayıtlar silinir.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, hashes):
+        """Verilen özetler için bulunan vektörleri {hash: vektör} olarak döndürür."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # SQLite parametre sınırına takılmamak için parça parça sorgula
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+            hit_count = sum(1 for h in hashes if h in found)
+            self.hits += hit_count
+            self.misses += len(hashes) - hit_count
+        return found
+
+    def put_many(self, model: str, items):
+        """(hash, vektör) çiftlerini önbelleğe yazar ve gerekirse eski kayıtları temizler."""
+        items = list(items)
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, h, array("f", vector).tobytes(), now) for h, vector in items],
+            )
+            self._entries += self._conn.total_changes - before
+            if self._entries > self.max_entries:
+                self._evict(self._entries - self.max_entries)
+            self._conn.commit()
+
+    def _evict(self, count: int):
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (count,),
+        )
+        self._entries -= count
+        self.evictions += count
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Herhangi bir langchain Embeddings nesnesini saran ve doküman embedding'lerini
+    EmbeddingCache üzerinden servis eden katman. Sadece önbellekte olmayan metinler modele gider.
+    model_key önbellekteki model anahtarıdır; vektörleri aynı olan embedding'leri tam olarak
+    tanımlamalıdır (VectorStoreManager "sağlayıcı:model" kullanır).
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_key: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_key = model_key
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+        vectors = self.cache.get_many(self.model_key, hashes)
+
+        # Aynı batch içindeki tekrar eden metinleri de tek sefer embed et
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in vectors and h not in missing:
+                missing[h] = t
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            # float32'ye yuvarla ki önbellekten gelen ve yeni hesaplanan vektörler birebir aynı olsun
+            computed = {h: array("f", v).tolist() for h, v in zip(missing.keys(), new_vectors)}
+            self.cache.put_many(self.model_key, computed.items())
+            vectors.update(computed)
+
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, text: str):
+        # Sorgular çok çeşitli olduğu için kalıcı önbelleğe yazılmaz
+        return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts):
+        """Sorgu batch'i; embed_query gibi kalıcı önbelleği atlar ama tek batch'li istekle gider."""
+        return self.embeddings.embed_documents(list(texts))
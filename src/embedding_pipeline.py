@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from langchain_core.embeddings import Embeddings
+
+
+EMBEDDING_PROVIDERS = ("ollama", "local")
+# Süreç içinde çalışan model: chromadb'nin ONNX ile paketlediği all-MiniLM-L6-v2 (384 boyut)
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class OllamaBatchEmbeddings(Embeddings):
+    """
+    Ollama /api/embed uç noktasına metinleri batch'ler halinde gönderen embedding istemcisi.
+    Tek bir havuzlanmış (keep-alive) HTTP istemcisi üzerinden en fazla max_concurrency
+    eşzamanlı istek çalıştırır; sonuçlar giriş sırasıyla döner.
+    """
+
+    provider = "ollama"
+
+    def __init__(self, model: str = "llama3.2", base_url: str = "http://localhost:11434",
+                 batch_size: int = 32, max_concurrency: int = 4, timeout: float = 120.0):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embed")
+
+    def _embed_batch(self, texts):
+        response = self._client.post("/api/embed", json={"model": self.model, "input": texts})
+        response.raise_for_status()
+        embeddings = response.json().get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Ollama {len(texts)} metin için {len(embeddings)} embedding döndürdü")
+        return embeddings
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        # map sırayı korur; eşzamanlılık executor'ın işçi sayısıyla sınırlıdır
+        vectors = []
+        for batch_vectors in self._executor.map(self._embed_batch, batches):
+            vectors.extend(batch_vectors)
+        return vectors
+
+    def embed_query(self, text: str):
+        return self._embed_batch([text])[0]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._client.close()
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    Ollama gerektirmeyen, süreç içinde CPU'da (onnxruntime) çalışan embedding modeli. Model dosyaları
+    ilk kullanımda bir kez indirilir ve ~/.cache/chroma altında saklanır. Küçük bir cümle modeli
+    olduğu için chunk başına üretken bir LLM'le embed etmekten çok daha hızlıdır ve vektörleri
+    daha dardır (daha az disk, bellek ve arama süresi).
+    """
+
+    provider = "local"
+
+    def __init__(self, model: str = LOCAL_EMBEDDING_MODEL, batch_size: int = 32):
+        if model != LOCAL_EMBEDDING_MODEL:
+            raise ValueError(f"Yerel embedding için sadece {LOCAL_EMBEDDING_MODEL} destekleniyor: {model}")
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self._function = ONNXMiniLM_L6_V2()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        vectors = []
+        # ONNX oturumu zaten bütün çekirdekleri kullanır; eşzamanlı çağrılar sadece birbirini yavaşlatır
+        with self._lock:
+            for start in range(0, len(texts), self.batch_size):
+                vectors.extend(v.tolist() for v in self._function(texts[start:start + self.batch_size]))
+        return vectors
+
+    def embed_query(self, text: str):
+        return self.embed_documents([text])[0]
+
+
+def create_embeddings(provider: str = "ollama", model: str = None, base_url: str = "http://localhost:11434",
+                      batch_size: int = 32, max_concurrency: int = 4) -> Embeddings:
+    """
+    Yapılandırmadaki sağlayıcıya göre embedding modelini oluşturur. model verilmezse sağlayıcının
+    varsayılanı kullanılır (ollama: llama3.2, local: all-MiniLM-L6-v2).
+    """
+    if provider == "ollama":
+        return OllamaBatchEmbeddings(model=model or "llama3.2", base_url=base_url,
+                                     batch_size=batch_size, max_concurrency=max_concurrency)
+    if provider == "local":
+        return LocalEmbeddings(model=model or LOCAL_EMBEDDING_MODEL, batch_size=batch_size)
+    raise ValueError(f"Bilinmeyen embedding sağlayıcısı: {provider} ({', '.join(EMBEDDING_PROVIDERS)})")
+
+
+class IngestionStats:
+    """Embedding ve yazma aşamalarının süre/hacim sayaçları (chunk/s, byte/s)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.bytes = 0
+        self.embed_seconds = 0.0
+        self.write_seconds = 0.0
+
+    def record(self, chunks: int, size: int, embed_seconds: float, write_seconds: float):
+        with self._lock:
+            self.chunks += chunks
+            self.bytes += size
+            self.embed_seconds += embed_seconds
+            self.write_seconds += write_seconds
+
+    def to_dict(self):
+        total = self.embed_seconds + self.write_seconds
+        return {
+            "chunks": self.chunks,
+            "bytes": self.bytes,
+            "embed_seconds": round(self.embed_seconds, 3),
+            "write_seconds": round(self.write_seconds, 3),
+            "chunks_per_second": round(self.chunks / total, 2) if total else 0.0,
+            "bytes_per_second": round(self.bytes / total, 2) if total else 0.0,
+        }
+
+
+def timed(fn, *args, **kwargs):
+    """fn'i çalıştırıp (sonuç, geçen süre) döndürür."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
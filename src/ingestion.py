@@ -0,0 +1,627 @@
+import hashlib
+import json
+import itertools
+import multiprocessing
+import os
+import glob
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.document_processor import DocumentProcessor
+from src.dedup import DEDUP_MODES, fingerprint
+from src.embedding_pipeline import IngestionStats
+from src.metrics import INGEST_FILES, INGEST_STAGE_SECONDS, file_type
+
+SUPPORTED_EXTENSIONS = ['.pdf', '.txt', '.md']
+MANIFEST_FILE = "manifest.json"
+# Bu kadar chunk birikince tek seferde embed edilip veritabanına yazılır
+ADD_BATCH_CHUNKS = 256
+# Parse eden thread embed aşamasının en fazla bu kadar chunk önüne geçebilir (backpressure)
+PREFETCH_CHUNKS = 2 * ADD_BATCH_CHUNKS
+# Metadata taşıma (backfill) sırasında tek seferde güncellenen chunk sayısı
+METADATA_BATCH_CHUNKS = 1000
+# Bu boyuttan büyük dosyalar süreç havuzuna gönderilmez; sayfa sayfa okunup chunk'ları üretildikçe
+# embed edilir, böylece dökümanın tamamı hiçbir zaman bellekte tutulmaz
+STREAM_MIN_BYTES = 4 * 1024 * 1024
+
+
+def find_supported_files(data_dir: str):
+    """data_dir içindeki desteklenen dosyaları sıralı (deterministik) şekilde döndürür."""
+    files_found = []
+    for ext in SUPPORTED_EXTENSIONS:
+        pattern = os.path.join(data_dir, f"*{ext}")
+        files_found.extend(glob.glob(pattern))
+    return sorted(files_found)
+
+
+def file_sha256(file_path: str) -> str:
+    """Dosya içeriğinin sha256 özetini parça parça okuyarak hesaplar."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_chunk_ids(rel_path: str, file_hash: str, count: int, chunker: str = ""):
+    """
+    Dosya yolu + içerik özeti + chunk ayarlarının imzası + sıra numarasından deterministik chunk ID'leri
+    üretir. Aynı dosya aynı içerik ve ayarlarla tekrar işlendiğinde aynı ID'ler çıkar, böylece upsert
+    idempotent olur; ayarlar değişince yeni chunk'lar eskilerinin ID'lerini almaz.
+    """
+    return [chunk_id(rel_path, file_hash, i, chunker) for i in range(count)]
+
+
+def chunk_id(rel_path: str, file_hash: str, index: int, chunker: str = "") -> str:
+    # İmzasız (chunk ayarları kaydedilmeden önceki) manifest kayıtlarının ID'leri değişmesin diye
+    # imza sadece varsa eklenir
+    key = f"{rel_path}\x00{file_hash}\x00{index}" + (f"\x00{chunker}" if chunker else "")
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def file_version(entry: dict) -> str:
+    """
+    Tekrar indeksindeki kaynak kayıtlarında dosyanın sürümü: içerik özeti + chunk ayarlarının imzası.
+    Aynı içerik farklı ayarlarla yeniden bölünürken eski ve yeni chunk'ların kaynakları karışmaz.
+    """
+    return entry["sha256"] + (f"@{entry['chunker']}" if entry.get("chunker") else "")
+
+
+def chunk_metadata(rel_path: str, ingested_at: int) -> dict:
+    """
+    Aramada filtre olarak kullanılabilsin diye her chunk'a ingest sırasında eklenen metadata:
+    data/'ya göre dosya yolu (source_name), uzantı (file_type) ve ingest zamanı (unix saniye).
+    """
+    return {
+        "source_name": rel_path.replace(os.sep, "/"),
+        "file_type": file_type(rel_path),
+        "ingested_at": int(ingested_at),
+    }
+
+
+def _process_file(file_path: str):
+    """
+    Tek bir dosyayı parse edip böler; süreç havuzunda çalışabilmesi için modül seviyesinde tanımlı.
+    (file_path, chunks, error, parse/split süreleri) döndürür.
+    """
+    processor = DocumentProcessor(file_path)
+    try:
+        return file_path, processor.process(), None, processor.timings
+    except Exception as e:
+        return file_path, [], {"type": type(e).__name__, "message": str(e)}, processor.timings
+
+
+def _process_one(file_path: str):
+    return _process_file(file_path)[:3]
+
+
+def process_files(file_paths, workers: int = 1):
+    """
+    Verilen dosyaları DocumentProcessor ile işler.
+    workers > 1 ise parse/bölme işi (CPU ağırlıklı, GIL'e takılan kısım) bir ProcessPoolExecutor'da
+    paralel çalışır. Sonuçlar her zaman giriş sırasıyla döner, böylece chunk ID'leri kararlı kalır.
+    Her dosya için (file_path, chunks, error) döndürür; hata yoksa error None,
+    varsa {"type", "message"} sözlüğü olur.
+    """
+    file_paths = list(file_paths)
+    workers = min(max(1, workers), len(file_paths))
+    if workers <= 1:
+        return [_process_one(file_path) for file_path in file_paths]
+
+    # Sunucu sürecinde çalışan thread'ler fork ile kopyalanmasın diye spawn kullanılır
+    context = multiprocessing.get_context("spawn")
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        return list(executor.map(_process_one, file_paths, chunksize=chunksize))
+
+
+def _iter_pool(file_paths, workers: int):
+    """
+    _process_file'ı süreç havuzunda çalıştırıp sonuçları giriş sırasıyla üretir.
+    executor.map'in aksine tüm dosyaları baştan kuyruğa atmaz; aynı anda en fazla workers * 2 dosyanın
+    sonucu bellekte bekler.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        remaining = iter(file_paths)
+        window = deque(executor.submit(_process_file, path) for path in itertools.islice(remaining, workers * 2))
+        while window:
+            result = window.popleft().result()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                window.append(executor.submit(_process_file, next_path))
+            yield result
+
+
+def iter_chunk_events(file_paths, workers: int = 1, stream_min_bytes: int = STREAM_MIN_BYTES):
+    """
+    Dosyaları giriş sırasıyla işleyip (tür, file_path, veri) olayları üretir:
+    her chunk için ("chunk", path, chunk), dosya bitince ("done", path, {"parse", "split"} süreleri),
+    okunamazsa ("error", path, {"type", "message"}). Hata bir dosyanın chunk'larının bir kısmı
+    üretildikten sonra da gelebilir.
+    workers > 1 ise küçük dosyalar süreç havuzunda paralel işlenir; stream_min_bytes'tan büyük
+    dosyalar her zaman bu süreçte DocumentProcessor.iter_chunks ile sayfa sayfa okunur.
+    """
+    file_paths = list(file_paths)
+    pooled = []
+    if workers > 1:
+        pooled = [path for path in file_paths
+                  if not (os.path.exists(path) and os.path.getsize(path) >= stream_min_bytes)]
+    pooled_set = set(pooled)
+    pool_results = _iter_pool(pooled, min(workers, len(pooled))) if pooled else iter(())
+
+    for file_path in file_paths:
+        if file_path in pooled_set:
+            _, chunks, error, timings = next(pool_results)
+            if error is not None:
+                yield "error", file_path, error
+                continue
+            for chunk in chunks:
+                yield "chunk", file_path, chunk
+            yield "done", file_path, timings
+            continue
+        processor = DocumentProcessor(file_path)
+        try:
+            for chunk in processor.iter_chunks():
+                yield "chunk", file_path, chunk
+        except Exception as e:
+            yield "error", file_path, {"type": type(e).__name__, "message": str(e)}
+            continue
+        yield "done", file_path, processor.timings
+
+
+def prefetch(iterable, max_items: int):
+    """
+    iterable'ı ayrı bir thread'de tüketip elemanlarını sırayla üretir. Arada en fazla max_items
+    eleman bekleyebilir; kuyruk doluysa üretici thread durur (backpressure). Böylece dosya okuma /
+    bölme işi embedding ile örtüşür ama bellek kullanımı sınırlı kalır.
+    Üreticide çıkan hata tüketici tarafında tekrar fırlatılır.
+    """
+    items = queue.Queue(maxsize=max(1, max_items))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except BaseException as e:
+            put((False, e))
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="ingest-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            has_item, item = items.get()
+            if not has_item:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class IngestionManifest:
+    """
+    Chroma deposunun yanında tutulan dosya yolu -> (sha256, mtime, boyut, ingest zamanı, chunk ayarlarının
+    imzası, chunk ID'leri) kaydı. Reload sırasında hangi dosyaların yeni, değişmiş veya silinmiş olduğunu bulmak için kullanılır.
+    Sürüm 2'den itibaren depodaki chunk'lar chunk_metadata alanlarını da taşır.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files = {}
+        self.version = self.VERSION
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.version = data.get("version", 1)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def chunk_count(self) -> int:
+        """
+        Manifestte kayıtlı farklı chunk sayısı (depodaki kayıt sayısıyla aynı olmalı). Tekrar eden
+        içerik birden fazla dosyada aynı chunk ID'siyle geçtiği için ID'ler tekilleştirilerek sayılır.
+        """
+        return len({chunk_id for entry in self.files.values() for chunk_id in entry.get("chunk_ids", [])})
+
+    def save(self):
+        """Manifesti önce geçici dosyaya yazıp atomik olarak yerine koyar."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "files": self.files}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self.version = self.VERSION
+
+
+def new_report(unchanged: int = 0):
+    """sync_directory'nin döndürdüğü değişiklik raporunun boş hali."""
+    return {
+        "added": [],
+        "updated": [],
+        "removed": [],
+        "unchanged": unchanged,
+        "chunks_added": 0,
+        "chunks_removed": 0,
+        # Kendisi değişmediği halde, paylaştığı chunk'ın sahibi silindiği/değiştiği için yeniden işlenen dosyalar
+        "reprocessed": [],
+        "errors": [],
+        "dedup": {"chunks": 0, "stored": 0, "exact_duplicates": 0, "near_duplicates": 0, "ratio": 0.0},
+    }
+
+
+def pending_changes(data_dir: str, manifest: IngestionManifest):
+    """
+    Dosyaları okumadan, sadece stat ile data_dir'de manifeste göre yeni / mtime-boyutu (veya chunk
+    ayarları) değişmiş / silinmiş dosyaları bulur. Hepsi boşsa senkronizasyona (ve depo kopyalamaya) gerek yoktur.
+    """
+    current = {os.path.relpath(path, data_dir): path for path in find_supported_files(data_dir)}
+    changes = {"new": [], "modified": [], "removed": sorted(set(manifest.files) - set(current))}
+    for rel_path, file_path in current.items():
+        entry = manifest.files.get(rel_path)
+        if entry is None:
+            changes["new"].append(rel_path)
+            continue
+        stat = os.stat(file_path)
+        if (entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size
+                or entry.get("chunker") != DocumentProcessor(file_path).signature):
+            changes["modified"].append(rel_path)
+    return changes
+
+
+def rebuild_dedup_index(data_dir: str, vector_manager, manifest: IngestionManifest):
+    """
+    Tekrar indeksini depodaki metinlerden ve manifestteki dosya -> chunk ID kayıtlarından baştan kurar
+    (indeks dosyası yoksa, ör. eski bir kurulumdan gelindiyse, veya depoyla uyuşmuyorsa).
+    """
+    index = vector_manager.dedup_index
+    index.clear()
+    pages = {}
+    for item in vector_manager.scan(fields=("full_content", "metadata")):
+        index.register(item["id"], fingerprint(item["full_content"]))
+        pages[item["id"]] = item["metadata"].get("page")
+    for rel_path, entry in manifest.files.items():
+        for i, doc_id in enumerate(entry.get("chunk_ids", [])):
+            # Sayfa bilgisi sadece chunk'ı depoya ilk yazan dosya için bilinir. Diğer kaynakların metni
+            # birebir mi neredeyse mi aynıydı bilinmediğinden neredeyse aynı sayılır (bkz. DedupIndex.settle)
+            own = doc_id == chunk_id(rel_path, entry["sha256"], i, entry.get("chunker", ""))
+            index.add_reference(doc_id, os.path.join(data_dir, rel_path), file_version(entry),
+                                pages.get(doc_id) if own else None, near=not own, owner=own,
+                                metadata=chunk_metadata(rel_path, entry.get("ingested_at", int(entry["mtime"]))))
+
+
+def backfill_chunk_metadata(vector_manager, manifest: IngestionManifest):
+    """
+    chunk_metadata alanları eklenmeden önce kurulmuş bir deponun chunk'larına bu alanları yazar;
+    metinler yeniden okunmaz veya embed edilmez. Ingest zamanı bilinmediği için dosyanın mtime'ı kullanılır.
+    Güncellenen chunk sayısını döndürür.
+    """
+    owners = {}
+    for rel_path, entry in manifest.files.items():
+        entry.setdefault("ingested_at", int(entry["mtime"]))
+        for i, doc_id in enumerate(entry.get("chunk_ids", [])):
+            # Tekrar eden chunk'lar onu depoya ilk yazan dosyanın metadata'sını taşır
+            if doc_id == chunk_id(rel_path, entry["sha256"], i, entry.get("chunker", "")):
+                owners[doc_id] = rel_path
+    # Sayfalı tarama sürerken kayıtlar değiştirilmesin diye önce bütün güncellemeler toplanır
+    updates = [
+        (item["id"], {**item["metadata"], **chunk_metadata(owners[item["id"]],
+                                                           manifest.files[owners[item["id"]]]["ingested_at"])})
+        for item in vector_manager.scan(fields=("metadata",)) if item["id"] in owners
+    ]
+    for start in range(0, len(updates), METADATA_BATCH_CHUNKS):
+        batch = updates[start:start + METADATA_BATCH_CHUNKS]
+        vector_manager.update_metadata([doc_id for doc_id, _ in batch], [metadata for _, metadata in batch])
+    return len(updates)
+
+
+def sync_directory(data_dir: str, vector_manager, manifest: IngestionManifest = None, workers: int = 1,
+                   progress=None, dedup: str = "near", paths=None):
+    """
+    data_dir ile vektör veritabanını artımlı olarak senkronize eder:
+    - mtime/boyut ve chunk ayarları değişmemiş dosyalar hiç okunmaz,
+    - içeriği değişen veya yeni dosyalar parse edilip embed edilir,
+    - silinen dosyaların chunk'ları veritabanından kaldırılır.
+    Dosyalar chunk chunk okunup sınırlı batch'ler halinde embed edildiğinden bellek kullanımı
+    dosya boyutundan bağımsızdır. progress verilirse her işlenen dosyadan sonra progress(işlenen, toplam) çağrılır.
+
+    Depo farklı bir embedding modeliyle kurulduysa (bkz. VectorStoreManager.embedding_mismatch) önce
+    sıfırlanır ve bütün dosyalar yapılandırılan modelle yeniden indekslenir.
+
+    dedup="exact" ile depoda (veya aynı senkronizasyonda) birebir aynısı olan chunk'lar, "near" ile
+    ek olarak MinHash benzerliği yüksek olanlar embed edilmez; dosyanın manifest kaydı mevcut chunk'ın
+    ID'sini gösterir ve chunk'a kaynak olarak eklenir. Bir chunk ancak onu kullanan son dosya
+    silindiğinde depodan kaldırılır; onu depoya yazan dosya silinir/değişirse birebir aynı kopyası olan
+    dosya sahibi olur, sadece neredeyse aynı kopyası kalan dosyalar yeniden işlenir (report["reprocessed"]).
+    "off" tekrar kontrolü yapmaz.
+
+    paths (data_dir'e göre göreli yollar) verilirse sadece bu dosyalara bakılır: dizin taranmaz,
+    listede olmayan dosyaların manifest kayıtlarına ve chunk'larına dokunulmaz (bkz. DataDirWatcher).
+    Listedeki bir dosya artık yoksa silinmiş sayılır. Manifest depoyla uyuşmadığı için depo
+    sıfırlanırsa tam senkronizasyon yapılır.
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Bilinmeyen tekrar ayıklama modu: {dedup}. Seçenekler: {', '.join(DEDUP_MODES)}")
+    if manifest is None:
+        manifest = IngestionManifest(os.path.join(vector_manager.persist_directory, MANIFEST_FILE))
+
+    report = new_report()
+    stats = IngestionStats()
+
+    mismatch = vector_manager.embedding_mismatch()
+    if mismatch is not None:
+        # Farklı modelin vektörleri karıştırılmaz: depo (koleksiyonun vektör boyutu dahil) sıfırlanıp
+        # bütün dosyalar yeni modelle embed edilir
+        print(f"--- Embedding modeli değişti ({mismatch}), veritabanı yeniden indeksleniyor ---")
+        vector_manager.reset()
+        manifest.files = {}
+        paths = None
+    # Manifest yoksa ama depo doluysa (eski, rastgele ID'li kurulum) tekrarları önlemek için depoyu boşalt
+    elif not manifest.exists() and vector_manager.get_document_count() > 0:
+        print("--- Manifest bulunamadı, mevcut veritabanı sıfırlanıyor ---")
+        vector_manager.clear()
+        paths = None
+    elif manifest.exists():
+        # Manifest ile depo uyuşmuyorsa (ör. vektör arka ucu değiştirildi) her şeyi baştan indeksle;
+        # embedding önbelleği sayesinde metinler modele tekrar gitmez
+        if manifest.chunk_count() != vector_manager.get_document_count():
+            print("--- Manifest ile veritabanı uyuşmuyor, yeniden indeksleniyor ---")
+            vector_manager.clear()
+            manifest.files = {}
+            paths = None
+    dedup_index = vector_manager.dedup_index
+    if len(dedup_index) != vector_manager.get_document_count():
+        rebuild_dedup_index(data_dir, vector_manager, manifest)
+    if manifest.exists() and manifest.version < 2 and manifest.files:
+        print(f"--- {backfill_chunk_metadata(vector_manager, manifest)} chunk'a filtre metadata'sı eklendi ---")
+
+    current_files = {}
+    if paths is None:
+        for file_path in find_supported_files(data_dir):
+            rel_path = os.path.relpath(file_path, data_dir)
+            current_files[rel_path] = file_path
+        known = set(manifest.files)
+    else:
+        for rel_path in paths:
+            file_path = os.path.join(data_dir, rel_path)
+            if os.path.splitext(rel_path)[1] in SUPPORTED_EXTENSIONS and os.path.isfile(file_path):
+                current_files[rel_path] = file_path
+        known = set(manifest.files) & set(paths)
+
+    # Sahibi değişen chunk'lar (metadata'ları sonda yeni sahibine göre yazılır) ve paylaştığı chunk'ın
+    # metni artık kendisinde olmayan, yeniden işlenecek dosyalar (bkz. DedupIndex.settle)
+    restamp, stale = {}, set()
+    reprocessing = set()
+
+    def release(ids, file_path, entry):
+        """Dosya sürümünün chunk'larını bırakır, son kaynağı giden chunk'ları siler; silinenleri döndürür."""
+        orphans = dedup_index.release(ids, file_path, file_version(entry))
+        vector_manager.delete_documents(orphans)
+        moved, referrers = dedup_index.settle(ids)
+        restamp.update(moved)
+        stale.update(referrers)
+        return orphans
+
+    # A. Silinen dosyalar
+    for rel_path in sorted(known - set(current_files)):
+        entry = manifest.files.pop(rel_path)
+        # Başka bir dosyada da geçen chunk'lar depoda kalır
+        orphans = release(entry.get("chunk_ids", []), os.path.join(data_dir, rel_path), entry)
+        report["removed"].append(rel_path)
+        report["chunks_removed"] += len(orphans)
+
+    # B. Yeni veya değişmiş dosyalar
+    to_process = []
+    for rel_path, file_path in current_files.items():
+        stat = os.stat(file_path)
+        entry = manifest.files.get(rel_path)
+        # Chunk ayarları (CHUNK_SIZE_* vb.) değiştiyse içerik aynı olsa da dosya yeniden bölünür
+        signature = DocumentProcessor(file_path).signature
+        if entry and entry.get("chunker") != signature:
+            entry = None
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            report["unchanged"] += 1
+            continue
+        file_hash = file_sha256(file_path)
+        if entry and entry["sha256"] == file_hash:
+            # Sadece mtime değişmiş (touch, kopyalama vb.), içerik aynı
+            entry["mtime"] = stat.st_mtime
+            entry["size"] = stat.st_size
+            report["unchanged"] += 1
+            continue
+        to_process.append((rel_path, file_path, file_hash, stat, signature))
+
+    def reprocess_stale(pending=()):
+        """
+        Yeniden işlenecek dosyaların (zaten işlenecek olan pending dosyaları hariç) manifest kayıtlarını ve bütün chunk'larını bırakır, işlenecek dosya
+        listesini döndürür. Bırakılan chunk'lar başka dosyaları da etkileyebildiği için liste, etkilenen
+        dosya kalmayana kadar genişletilir; diskte artık olmayan dosyalar silinmiş sayılır.
+        """
+        targets = []
+        while stale:
+            file_path = stale.pop()
+            rel_path = os.path.relpath(file_path, data_dir)
+            if rel_path in pending:
+                continue
+            entry = manifest.files.pop(rel_path, None)
+            if entry is None:
+                continue
+            report["chunks_removed"] += len(release(entry.get("chunk_ids", []), file_path, entry))
+            if not os.path.isfile(file_path):
+                report["removed"].append(rel_path)
+                continue
+            reprocessing.add(rel_path)
+            targets.append((rel_path, file_path, file_sha256(file_path), os.stat(file_path),
+                            DocumentProcessor(file_path).signature))
+        return targets
+
+    # Chunk'lar dosya sınırlarına bakılmadan ADD_BATCH_CHUNKS'lık batch'ler halinde embed edilip yazılır;
+    # büyük bir dosya birden fazla batch'e, küçük dosyalar tek batch'e düşebilir. Bir dosyanın
+    # manifest kaydı ancak tüm chunk'ları yazıldıktan sonra güncellenir.
+    files = {}
+    # Bir dosyanın chunk'ı bekleyen batch'teki bir chunk'ın tekrarıysa dosya da o batch'e bağlı sayılır:
+    # batch yazılamazsa ikisi birlikte geri alınır.
+    building = {}           # rel_path -> {"entry", "metadata", "stored", "error"}: chunk'ları üretilmekte olan dosyalar
+    batch_chunks, batch_ids, batch_files = [], [], set()
+    batch_id_set = set()
+    finished = []           # tüm chunk'ları üretilmiş, batch'i yazılınca sonuçlandırılacak dosyalar
+    dedup_report = report["dedup"]
+
+    def finalize(rel_path):
+        state = building.pop(rel_path)
+        new_ids = state["entry"]["chunk_ids"]
+        file_path = os.path.join(data_dir, rel_path)
+        if state["error"] is not None:
+            # Yarım kalan yeni sürümü geri al; dosyanın (varsa) eski sürümü ve manifest kaydı korunur,
+            # bir sonraki reload'da tekrar denenir
+            release(new_ids, file_path, state["entry"])
+            report["errors"].append({"file": rel_path, **state["error"]})
+            INGEST_FILES.labels(file_type(rel_path), "error").inc()
+            return
+        old_entry = manifest.files.get(rel_path)
+        if old_entry:
+            orphans = release(old_entry.get("chunk_ids", []), file_path, old_entry)
+            report["chunks_removed"] += len(orphans)
+        manifest.files[rel_path] = state["entry"]
+        if rel_path in reprocessing:
+            if rel_path not in report["added"] + report["updated"]:
+                report["reprocessed"].append(rel_path)
+        else:
+            report["updated" if old_entry else "added"].append(rel_path)
+        report["chunks_added"] += state["stored"]
+        INGEST_FILES.labels(file_type(rel_path), "updated" if old_entry or rel_path in reprocessing else "added").inc()
+
+    def flush():
+        ok = not batch_chunks or vector_manager.add_documents(batch_chunks, ids=batch_ids, stats=stats)
+        if not ok:
+            for rel_path in batch_files:
+                building[rel_path]["error"] = building[rel_path]["error"] or {
+                    "type": "IngestionError", "message": "Chunk'lar veritabanına eklenemedi"
+                }
+        batch_chunks.clear()
+        batch_ids.clear()
+        batch_files.clear()
+        batch_id_set.clear()
+        for rel_path in finished:
+            finalize(rel_path)
+        finished.clear()
+
+    ingested_at = int(time.time())
+    done, total = 0, len(to_process)
+    if progress is not None:
+        progress(0, total)
+    # Silinen dosyaların etkilediği dosyalar değişenlerle birlikte, değişenlerin eski sürümleri bırakılınca
+    # etkilenenler bir sonraki turda işlenir. Yeniden işlenen dosyaların kayıtları tur başlamadan
+    # bırakıldığından ikinci turda (yazma hatası olmadıkça) yeni bir dosya etkilenmez
+    to_process += reprocess_stale({rel_path for rel_path, *_ in to_process})
+    while to_process:
+        files.update({file_path: (rel_path, file_hash, stat, signature)
+                      for rel_path, file_path, file_hash, stat, signature in to_process})
+        events = iter_chunk_events([file_path for _, file_path, *_ in to_process], workers=workers)
+        # Parmak izleri de okuma thread'inde hesaplanır, embedding ile örtüşür
+        events = ((kind, path, payload, fingerprint(payload.page_content) if kind == "chunk" else None)
+                  for kind, path, payload in events)
+        for kind, file_path, payload, fp in prefetch(events, PREFETCH_CHUNKS):
+            rel_path, file_hash, stat, signature = files[file_path]
+            state = building.get(rel_path)
+            if state is None:
+                state = building[rel_path] = {"entry": {
+                    "sha256": file_hash,
+                    "mtime": stat.st_mtime,
+                    "size": stat.st_size,
+                    "ingested_at": ingested_at,
+                    "chunker": signature,
+                    "chunk_ids": [],
+                }, "metadata": chunk_metadata(rel_path, ingested_at), "stored": 0, "error": None}
+
+            if kind == "chunk":
+                chunk_ids = state["entry"]["chunk_ids"]
+                page = payload.metadata.get("page")
+                version = file_version(state["entry"])
+                duplicate, existing_id = dedup_index.match(fp, dedup)
+                owner = dedup_index.owner(existing_id) if duplicate == "near" else None
+                if owner and owner[0] == file_path and owner[1] != version:
+                    # Dosyanın eski sürümündeki hali: yeni metin saklanır, eskisi sürüm bırakılınca silinir
+                    duplicate = None
+                dedup_report["chunks"] += 1
+                if duplicate is not None:
+                    # Embed edilmez; mevcut chunk'a bu dosya/sayfa kaynak olarak eklenir
+                    dedup_report[f"{duplicate}_duplicates"] += 1
+                    chunk_ids.append(existing_id)
+                    dedup_index.add_reference(existing_id, file_path, version, page, near=duplicate == "near",
+                                              metadata=state["metadata"])
+                    if existing_id in batch_id_set:
+                        batch_files.add(rel_path)
+                    continue
+                chunk_ids.append(chunk_id(rel_path, file_hash, len(chunk_ids), signature))
+                dedup_index.add(chunk_ids[-1], fp, file_path, version, page, metadata=state["metadata"])
+                payload.metadata.update(state["metadata"])
+                state["stored"] += 1
+                batch_chunks.append(payload)
+                batch_ids.append(chunk_ids[-1])
+                batch_id_set.add(chunk_ids[-1])
+                batch_files.add(rel_path)
+                if len(batch_chunks) >= ADD_BATCH_CHUNKS:
+                    flush()
+                continue
+
+            if kind == "error":
+                state["error"] = payload
+            else:
+                for stage, seconds in payload.items():
+                    INGEST_STAGE_SECONDS.labels(stage, file_type(rel_path)).observe(seconds)
+            finished.append(rel_path)
+            done += 1
+            if progress is not None:
+                progress(done, total)
+            if rel_path not in batch_files:
+                # Bekleyen batch'te chunk'ı yoksa hemen sonuçlandırılabilir
+                finished.remove(rel_path)
+                finalize(rel_path)
+        flush()
+        to_process = reprocess_stale()
+        total += len(to_process)
+
+    # Sahibi değişen chunk'ların metadata'sı yeni sahibinin dosyasını gösterir
+    updates = {}
+    for doc_id, (file_path, version, page) in restamp.items():
+        rel_path = os.path.relpath(file_path, data_dir)
+        entry = manifest.files.get(rel_path)
+        owner_ingested_at = entry["ingested_at"] if entry and file_version(entry) == version else ingested_at
+        updates[doc_id] = {"source": file_path, **chunk_metadata(rel_path, owner_ingested_at),
+                           **({"page": page} if page is not None else {})}
+    updates = list(updates.items())
+    for start in range(0, len(updates), METADATA_BATCH_CHUNKS):
+        vector_manager.merge_metadata(dict(updates[start:start + METADATA_BATCH_CHUNKS]))
+
+    dedup_report["stored"] = dedup_report["chunks"] - dedup_report["exact_duplicates"] - dedup_report["near_duplicates"]
+    if dedup_report["chunks"]:
+        dedup_report["ratio"] = round(1 - dedup_report["stored"] / dedup_report["chunks"], 4)
+    manifest.save()
+    vector_manager.save()
+    report["throughput"] = stats.to_dict()
+    return report
@@ -0,0 +1,271 @@
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+
+_LETTERS = "0-9a-zçğıöşüâîû"
+_TOKEN_RE = re.compile(rf"[{_LETTERS}]+(?:[-_./][{_LETTERS}]+)*")
+# Özel isimlere kesme işaretiyle eklenen çekim ekleri: Ankara'da, ERR-42'nin -> ankara, err-42
+_APOSTROPHE_RE = re.compile(rf"([{_LETTERS}])['’][a-zçğıöşü]+")
+_SEPARATOR_RE = re.compile(r"[-_./]")
+_CIRCUMFLEX = str.maketrans("âîû", "aiu")
+
+# Prefix (F5) kökleme: Türkçe eklemeli bir dil olduğundan kelimenin ilk 5 harfi
+# çoğu çekimli biçimi aynı köke indirir (istanbul, istanbuldaki -> istan)
+STEM_LENGTH = 5
+
+STOPWORDS = frozenset("""
+acaba ama ancak bana bazı belki ben beni benim bir biri birkaç biz bu buna bunu bunun bunlar da daha de
+defa diye en gibi hem hep her hiç için ile ise ki kim kime kimi mi mı mu mü na ne neden nerede nereye
+nasıl niye o olan olarak ona onu onun onlar sen siz şey şu ve veya ya yani hangi kaç
+a an and are as at be by for from how in is it of on or the to was what when where which who why with
+""".split())
+
+_QUESTION_WORDS = frozenset("""
+ne neden niçin nasıl nerede nereden nereye kim kime kimin hangi kaç mi mı mu mü midir mıdır
+what why how where who which when does do is are can
+""".split())
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe kurallarıyla küçük harfe çevirir (I -> ı, İ -> i) ve şapkalı harfleri sadeleştirir."""
+    return text.replace("I", "ı").replace("İ", "i").lower().translate(_CIRCUMFLEX)
+
+
+def _stem(word: str) -> str:
+    if any(ch.isdigit() for ch in word):
+        return word
+    return word[:STEM_LENGTH]
+
+
+def tokenize(text: str):
+    """
+    Metni BM25 terimlerine ayırır. Kelimeler Türkçe küçük harfe çevrilip F5 ile köklenir,
+    durak kelimeler atılır. Rakam veya ayraç (- _ . /) içeren kodlar (ERR-404, SKU_12, v2.1)
+    bütün halde korunur; ayraçlı kodların parçaları da ayrıca eklenir.
+    """
+    text = _APOSTROPHE_RE.sub(r"\1", turkish_lower(text))
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if _SEPARATOR_RE.search(token):
+            tokens.append(token)
+            tokens.extend(_stem(part) for part in _SEPARATOR_RE.split(token) if part not in STOPWORDS)
+        elif any(ch.isdigit() for ch in token):
+            tokens.append(token)
+        elif token not in STOPWORDS:
+            tokens.append(_stem(token))
+    return tokens
+
+
+def is_keyword_query(query: str, max_terms: int = 4) -> bool:
+    """
+    Sorgunun anahtar kelime tarzında olup olmadığını tahmin eder: tırnak içinde ifade, hata kodu /
+    ürün kodu gibi rakamlı terimler veya soru kalıbı içermeyen en fazla max_terms kelimelik ifadeler.
+    Bu tür sorgular embedding'e gerek kalmadan sadece sözcük indeksinden cevaplanabilir.
+    """
+    if '"' in query:
+        return True
+    words = _TOKEN_RE.findall(_APOSTROPHE_RE.sub(r"\1", turkish_lower(query)))
+    if not words or query.strip().endswith("?") or any(w in _QUESTION_WORDS for w in words):
+        return False
+    has_code = any(_SEPARATOR_RE.search(w) or any(ch.isdigit() for ch in w) for w in words)
+    return has_code or len(words) <= max_terms
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60):
+    """
+    Birden fazla sıralamayı (ID listeleri) Reciprocal Rank Fusion ile birleştirir:
+    skor(d) = Σ 1 / (k + sıra). Skorların ölçeği farklı olan BM25 ve vektör sonuçlarını
+    normalizasyon gerekmeden birleştirir. (id, skor) listesini skora göre azalan döndürür.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class LexicalIndex:
+    """
+    Chunk'lar için süreç içi BM25 ters indeksi.
+    Her terimin posting listesi iki sıkı array'de (doküman numaraları, terim frekansları) tutulur.
+    Silinen chunk'lar önce işaretlenir (tombstone); ölü kayıtlar canlılardan fazlalaşınca
+    indeks sıkıştırılır. save() ile persist dizinine atomik olarak yazılır.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._doc_ids = []
+        self._doc_nums = {}
+        self._doc_len = array("I")
+        self._alive = bytearray()
+        self._postings = {}
+        self._total_len = 0
+        self._dead = 0
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, **kwargs):
+        """Diskteki indeksi açar; dosya yoksa veya okunamıyorsa boş indeks döner."""
+        index = cls(path, **kwargs)
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    data = pickle.load(f)
+                if data.get("version") == cls.VERSION:
+                    index._doc_ids = data["doc_ids"]
+                    index._doc_len = data["doc_len"]
+                    index._alive = data["alive"]
+                    index._postings = data["postings"]
+                    index._doc_nums = {doc_id: i for i, doc_id in enumerate(index._doc_ids) if index._alive[i]}
+                    index._total_len = sum(n for n, alive in zip(index._doc_len, index._alive) if alive)
+                    index._dead = len(index._doc_ids) - len(index._doc_nums)
+            except Exception as e:
+                print(f"--- Sözcük indeksi okunamadı, yeniden oluşturulacak: {e} ---")
+                index._reset()
+        return index
+
+    def __len__(self):
+        return len(self._doc_nums)
+
+    def add(self, ids, texts):
+        """Chunk'ları indekse ekler; aynı ID zaten varsa önce eskisi çıkarılır (upsert)."""
+        with self._lock:
+            self._remove(ids)
+            for doc_id, text in zip(ids, texts):
+                num = len(self._doc_ids)
+                terms = tokenize(text)
+                counts = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, tf in counts.items():
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = self._postings[term] = (array("I"), array("I"))
+                    posting[0].append(num)
+                    posting[1].append(tf)
+                self._doc_ids.append(doc_id)
+                self._doc_nums[doc_id] = num
+                self._doc_len.append(len(terms))
+                self._alive.append(1)
+                self._total_len += len(terms)
+            self.dirty = True
+
+    def remove(self, ids):
+        with self._lock:
+            self._remove(ids)
+            if self._dead > 1000 and self._dead > len(self._doc_nums):
+                self._compact()
+
+    def _remove(self, ids):
+        for doc_id in ids:
+            num = self._doc_nums.pop(doc_id, None)
+            if num is None:
+                continue
+            self._alive[num] = 0
+            self._total_len -= self._doc_len[num]
+            self._dead += 1
+            self.dirty = True
+
+    def _compact(self):
+        """Silinmiş chunk'ları posting listelerinden atıp doküman numaralarını yeniden sıralar."""
+        remap = array("i", [-1]) * len(self._doc_ids)
+        doc_ids, doc_len = [], array("I")
+        for num, doc_id in enumerate(self._doc_ids):
+            if self._alive[num]:
+                remap[num] = len(doc_ids)
+                doc_ids.append(doc_id)
+                doc_len.append(self._doc_len[num])
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            new_docs, new_tfs = array("I"), array("I")
+            for num, tf in zip(docs, tfs):
+                if remap[num] >= 0:
+                    new_docs.append(remap[num])
+                    new_tfs.append(tf)
+            if new_docs:
+                postings[term] = (new_docs, new_tfs)
+        self._doc_ids = doc_ids
+        self._doc_nums = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self._doc_len = doc_len
+        self._alive = bytearray(b"\x01") * len(doc_ids)
+        self._postings = postings
+        self._dead = 0
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self.dirty = True
+
+    def search(self, query: str, k: int = 10, allowed=None):
+        """
+        BM25 skoruna göre en iyi k chunk'ı [(chunk_id, skor), ...] olarak döndürür.
+        allowed (chunk ID kümesi) verilirse sadece bu chunk'lar skorlanır; IDF yine bütün indeksten hesaplanır.
+        """
+        with self._lock:
+            n_docs = len(self._doc_nums)
+            if not n_docs:
+                return []
+            if allowed is not None:
+                allowed = {self._doc_nums[doc_id] for doc_id in allowed if doc_id in self._doc_nums}
+                if not allowed:
+                    return []
+            avg_len = self._total_len / n_docs or 1.0
+            scores = {}
+            for term in set(tokenize(query)):
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                docs, tfs = posting
+                alive = self._alive
+                df = sum(alive[num] for num in docs)
+                if not df:
+                    continue
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for num, tf in zip(docs, tfs):
+                    if not alive[num] or (allowed is not None and num not in allowed):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[num] / avg_len)
+                    scores[num] = scores.get(num, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self._doc_ids[num], score) for num, score in best]
+
+    def save(self):
+        """İndeksi geçici dosyaya yazıp atomik olarak yerine koyar (değişiklik yoksa yazmaz)."""
+        if self.path is None or not self.dirty:
+            return
+        with self._lock:
+            if self._dead:
+                self._compact()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "version": self.VERSION,
+                    "doc_ids": self._doc_ids,
+                    "doc_len": self._doc_len,
+                    "alive": self._alive,
+                    "postings": self._postings,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def stats(self):
+        return {
+            "documents": len(self._doc_nums),
+            "terms": len(self._postings),
+            "postings": sum(len(docs) for docs, _ in self._postings.values()),
+            "deleted": self._dead,
+            "size_bytes": os.path.getsize(self.path) if self.path and os.path.exists(self.path) else 0,
+        }
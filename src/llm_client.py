@@ -1,23 +1,241 @@
+import asyncio
+import json
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
 import httpx
+from src.metrics import observe_llm
+
+class StreamStats:
+    """Streaming cevaplar için ilk token süresi (TTFT) ve toplam üretim süresi sayaçları."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ttft_ms = 0.0
+        self.total_generation_ms = 0.0
+        self.last = None
+
+    def record(self, ttft_ms: float, total_ms: float):
+        self.count += 1
+        self.total_ttft_ms += ttft_ms
+        self.total_generation_ms += total_ms
+        self.last = {"ttft_ms": ttft_ms, "total_ms": total_ms}
+
+    def to_dict(self):
+        return {
+            "streams": self.count,
+            "avg_ttft_ms": round(self.total_ttft_ms / self.count, 1) if self.count else 0.0,
+            "avg_total_ms": round(self.total_generation_ms / self.count, 1) if self.count else 0.0,
+            "last": self.last,
+        }
+
+class PrefillStats:
+    """Ollama'nın bildirdiği prompt token sayısı ve prompt işleme (prefill) süresi sayaçları."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_prompt_tokens = 0
+        self.total_prefill_ms = 0.0
+        self.last = None
+
+    def record(self, prompt_tokens, prefill_ms):
+        if prompt_tokens is None and prefill_ms is None:
+            return
+        self.count += 1
+        self.total_prompt_tokens += prompt_tokens or 0
+        self.total_prefill_ms += prefill_ms or 0.0
+        self.last = {"prompt_tokens": prompt_tokens, "prefill_ms": prefill_ms}
+
+    def to_dict(self):
+        return {
+            "requests": self.count,
+            "avg_prompt_tokens": round(self.total_prompt_tokens / self.count, 1) if self.count else 0.0,
+            "avg_prefill_ms": round(self.total_prefill_ms / self.count, 1) if self.count else 0.0,
+            "last": self.last,
+        }
+
+def _ns_to_ms(value):
+    return round(value / 1e6, 1) if value is not None else None
+
+def ollama_metrics(final: dict) -> dict:
+    """
+    Ollama'nın son cevabındaki sayaçlar. prompt_tokens sadece gerçekten işlenen prompt token'larıdır:
+    önceki istekle ortak önek KV-cache'ten gelirse bu sayı ve prefill_ms (prompt_eval_duration) düşer.
+    """
+    return {
+        "prompt_tokens": final.get("prompt_eval_count"),
+        "prefill_ms": _ns_to_ms(final.get("prompt_eval_duration")),
+        "completion_tokens": final.get("eval_count"),
+        "generation_ms": _ns_to_ms(final.get("eval_duration")),
+        "load_ms": _ns_to_ms(final.get("load_duration")),
+    }
 
 class LLMClient:
-    def __init__(self, model_name="llama3.2"):
+    """
+    Ollama /api/generate istemcisi. Uygulama boyunca yaşayan, havuzlanmış tek bir
+    httpx.AsyncClient kullanır (lifespan'de start/close edilir). Aynı anda Ollama'ya giden
+    istek sayısı max_concurrency ile sınırlanır; fazlası sırada bekler. Bağlantı hataları ve
+    5xx cevapları üstel bekleme (backoff) ile yeniden denenir.
+    """
+
+    def __init__(self, model_name="llama3.2", host="http://localhost:11434",
+                 max_connections: int = 10, connect_timeout: float = 5.0, read_timeout: float = 120.0,
+                 max_retries: int = 2, retry_backoff: float = 0.5, max_concurrency: int = 4):
          # Ollama yerelde bu porttan yayın yapar
-        self.base_url = "http://localhost:11434/api/generate"
+        self.base_url = f"{host.rstrip('/')}/api/generate"
         self.model_name = model_name
+        self.stream_stats = StreamStats()
+        self.prefill_stats = PrefillStats()
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_concurrency = max_concurrency
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._client = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
 
-    async def ask(self, prompt: str) -> str:
+    async def start(self):
+        """Paylaşılan HTTP istemcisini oluşturur (lifespan başlangıcında çağrılır)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+
+    async def close(self):
+        """Paylaşılan HTTP istemcisini kapatır (lifespan bitişinde çağrılır)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # start() çağrılmadan kullanılırsa (ör. testler) istemciyi ilk istekte oluştur
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Eşzamanlılık sınırı: boş yer yoksa istek burada sırada bekler."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+
+    async def _post(self, payload: dict) -> dict:
+        attempt = 0
+        while True:
+            try:
+                response = await self._get_client().post(self.base_url, json=payload)
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+                attempt += 1
+
+    async def generate(self, prompt: str) -> dict:
+        """
+        Cevabı tek parça üretir; {"response": ..., "metrics": {...}} döndürür. metrics toplam süreyi
+        (total_ms) ve Ollama sayaçlarını (prompt_tokens, prefill_ms, completion_tokens, ...) içerir.
+        Hata durumunda response "Hata oluştu: ..." olur.
+        """
         payload = {
             "model": self.model_name,
             "prompt": prompt,
             "stream": False
         }
-        
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        start = time.perf_counter()
+
+        async with self._slot():
+            try:
+                data = await self._post(payload)
+            except Exception as e:
+                return {"response": f"Hata oluştu: {str(e)}", "metrics": {}}
+
+        metrics = {"total_ms": round((time.perf_counter() - start) * 1000, 1), **ollama_metrics(data)}
+        self.prefill_stats.record(metrics["prompt_tokens"], metrics["prefill_ms"])
+        observe_llm(metrics)
+        return {"response": data.get("response", "Cevap alınamadı."), "metrics": metrics}
+
+    async def ask(self, prompt: str) -> str:
+        return (await self.generate(prompt))["response"]
+
+    async def _open_stream(self, stack: AsyncExitStack, payload: dict) -> httpx.Response:
+        """Akışı açar; bağlantı/5xx hataları ilk token gelmeden önce yeniden denenir."""
+        attempt = 0
+        while True:
             try:
-                response = await client.post(self.base_url, json=payload)
+                response = await stack.enter_async_context(
+                    self._get_client().stream("POST", self.base_url, json=payload)
+                )
                 response.raise_for_status()
-                return response.json().get("response", "Cevap alınamadı.")
+                return response
             except Exception as e:
-                return f"Hata oluştu: {str(e)}"
-            
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+                attempt += 1
+
+    async def ask_stream(self, prompt: str):
+        """
+        Ollama'nın NDJSON akışını okuyup token'ları geldikçe üreten async generator.
+        Her token için {"token": "..."} döner; akış bitince ilk token süresi (ttft_ms),
+        toplam süre (total_ms) ve Ollama sayaçlarını (bkz. ollama_metrics) içeren {"done": True, "metrics": {...}} döner.
+        """
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": True
+        }
+        start = time.perf_counter()
+        ttft_ms = None
+        final = {}
+
+        async with self._slot(), AsyncExitStack() as stack:
+            response = await self._open_stream(stack, payload)
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+                token = data.get("response", "")
+                if token:
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                    yield {"token": token}
+                if data.get("done"):
+                    final = data
+                    break
+
+        total_ms = (time.perf_counter() - start) * 1000
+        if ttft_ms is None:
+            ttft_ms = total_ms
+        self.stream_stats.record(ttft_ms, total_ms)
+        metrics = {"ttft_ms": round(ttft_ms, 1), "total_ms": round(total_ms, 1), **ollama_metrics(final)}
+        self.prefill_stats.record(metrics["prompt_tokens"], metrics["prefill_ms"])
+        observe_llm(metrics)
+        yield {"done": True, "metrics": metrics}
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "stream": self.stream_stats.to_dict(),
+            "prefill": self.prefill_stats.to_dict(),
+        }
@@ -1,27 +1,87 @@
+import time
+# Soğuk açılış ölçümü için: modül importlarının başladığı an
+IMPORT_STARTED = time.perf_counter()
 from fastapi import FastAPI, HTTPException, Body
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
 from contextlib import asynccontextmanager
 from src.llm_client import LLMClient
-from src.document_processor import DocumentProcessor
-from src.vector_store import VectorStoreManager
+from src.vector_store import VectorStoreManager, metadata_filter, search_filter
+from src.ingestion import (
+    find_supported_files, process_files, sync_directory, pending_changes, new_report,
+    IngestionManifest, MANIFEST_FILE, chunk_metadata
+)
+from src.embedding_cache import EmbeddingCache
+from src.embedding_pipeline import create_embeddings
+from src.query_cache import LRUCache, TTLCache, normalize_question
+from src.store_generations import GenerationStore, StoreLeases
+from src.reload_jobs import ReloadJobManager
+from src.context_builder import ContextBuilder, TokenCounter
+from src.watcher import DataDirWatcher
+from src.collection_registry import CollectionRegistry, DEFAULT_COLLECTION
+from src.metrics import (
+    REGISTRY, CallbackMetric, MetricsMiddleware, QUERY_STAGE_SECONDS, HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS,
+)
+from src.config import (
+    PROJECT_DIR, DATA_DIR, CHROMA_DB_DIR, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES,
+    OLLAMA_BASE_URL, EMBEDDING_PROVIDER, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY, INGEST_WORKERS,
+    LLM_MAX_CONNECTIONS, LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_MAX_RETRIES, LLM_MAX_CONCURRENCY,
+    RETRIEVAL_WORKERS, QUERY_CACHE_SIZE, ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, RELOAD_GC_GRACE_SECONDS,
+    RETRIEVAL_MODE, VECTOR_BACKEND, VECTOR_QUANTIZATION, VECTOR_INDEX, VECTOR_IVF_MIN_VECTORS, VECTOR_IVF_NPROBE,
+    DEDUP_MODE, CONTEXT_CANDIDATES, CONTEXT_TOKEN_BUDGET, CONTEXT_TOKENIZER_PATH,
+    ASK_BATCH_CONCURRENCY, ASK_BATCH_RETRIEVAL_SIZE, ASK_BATCH_MAX_QUESTIONS,
+    WATCH_DATA_DIR, WATCH_POLL_SECONDS, WATCH_DEBOUNCE_SECONDS,
+    COLLECTIONS_DIR, COLLECTION_MAX_OPEN, COLLECTION_MAX_MEMORY_MB
+)
 import os
-import glob
+import json
+import asyncio
+import hashlib
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+class SearchFilters(BaseModel):
+    """Aramayı daraltan metadata koşulları; verilmeyenler yok sayılır (bkz. search_filter)."""
+    source: Optional[str] = None
+    file_type: Optional[str] = None
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+    ingested_after: Optional[datetime] = None
+    ingested_before: Optional[datetime] = None
+
+    def to_where(self):
+        return search_filter(
+            source=self.source, file_type=self.file_type, page_from=self.page_from, page_to=self.page_to,
+            ingested_after=self.ingested_after.timestamp() if self.ingested_after else None,
+            ingested_before=self.ingested_before.timestamp() if self.ingested_before else None,
+        )
 
 class QuestionRequest(BaseModel):
     question: str
+    collection: Optional[str] = None
+    filters: Optional[SearchFilters] = None
 
-def load_all_documents(data_dir: str):
-    """data/ klasöründeki tüm desteklenen dosyaları (PDF, TXT, MD) yükler."""
+class BatchQuestionRequest(BaseModel):
+    questions: List[str]
+    collection: Optional[str] = None
+    filters: Optional[SearchFilters] = None
+
+def load_all_documents(data_dir: str, workers: int = INGEST_WORKERS, errors: list = None):
+    """
+    data/ klasöründeki tüm desteklenen dosyaları (PDF, TXT, MD) yükler.
+    Dosyalar workers kadar süreçte paralel işlenir; chunk sırası dosya adı sırasına göre sabittir.
+    Okunamayan dosyalar atlanır, errors listesi verilmişse {"file", "type", "message"} olarak eklenir.
+    Chunk'lara aramada filtrelenebilmeleri için dosya adı, türü ve ingest zamanı eklenir (bkz. chunk_metadata).
+    """
     all_chunks = []
-    supported_extensions = ['.pdf', '.txt', '.md']
     
-    # Tüm desteklenen dosyaları bul
-    files_found = []
-    for ext in supported_extensions:
-        pattern = os.path.join(data_dir, f"*{ext}")
-        files_found.extend(glob.glob(pattern))
+    # Tüm desteklenen dosyaları bul (sıralı, böylece chunk sırası deterministik olur)
+    files_found = find_supported_files(data_dir)
     
     if not files_found:
         print(f"--- UYARI: {data_dir} klasöründe desteklenen dosya bulunamadı ---")
@@ -29,58 +89,331 @@ def load_all_documents(data_dir: str):
     
     print(f"--- {len(files_found)} dosya bulundu, işleniyor... ---")
     
-    for file_path in files_found:
-        try:
-            print(f"--- Döküman işleniyor: {os.path.basename(file_path)} ---")
-            processor = DocumentProcessor(file_path)
-            chunks = processor.process()
-            all_chunks.extend(chunks)
-            print(f"--- ✓ {os.path.basename(file_path)} işlendi ({len(chunks)} chunk) ---")
-        except Exception as e:
-            print(f"--- ✗ Hata ({os.path.basename(file_path)}): {e} ---")
+    ingested_at = int(time.time())
+    for file_path, chunks, error in process_files(files_found, workers=workers):
+        if error is not None:
+            if errors is not None:
+                errors.append({"file": os.path.basename(file_path), **error})
             continue
+        extra = chunk_metadata(os.path.relpath(file_path, data_dir), ingested_at)
+        for chunk in chunks:
+            chunk.metadata.update(extra)
+        all_chunks.extend(chunks)
     
     return all_chunks
 
-def initialize_database():
-    """Veritabanını başlatır veya yeniden yükler."""
+def open_store(persist_directory: str) -> VectorStoreManager:
+    backend_options = {}
+    if VECTOR_BACKEND == "numpy":
+        backend_options = {
+            "quantization": VECTOR_QUANTIZATION, "index": VECTOR_INDEX,
+            "ivf_min_vectors": VECTOR_IVF_MIN_VECTORS, "nprobe": VECTOR_IVF_NPROBE,
+        }
+    return VectorStoreManager(
+        chunks=None, persist_directory=persist_directory, embeddings=embeddings,
+        embedding_cache=embedding_cache, backend=VECTOR_BACKEND, backend_options=backend_options
+    )
+
+def log_sync_report(report: dict, count: int):
+    if report["errors"]:
+        print(f"--- {len(report['errors'])} dosya işlenemedi (ayrıntılar /db/reload yanıtında) ---")
+    print(
+        f"--- RAG Sistemi Hazır ({count} toplam chunk; "
+        f"{len(report['added'])} yeni, {len(report['updated'])} güncellenen, "
+        f"{len(report['removed'])} silinen, {report['unchanged']} değişmeyen dosya) ---"
+    )
+    dedup = report["dedup"]
+    if dedup["chunks"]:
+        print(
+            f"--- Tekrar ayıklama: {dedup['chunks']} chunk'tan {dedup['exact_duplicates']} birebir, "
+            f"{dedup['near_duplicates']} neredeyse aynı chunk embed edilmedi (oran {dedup['ratio']:.1%}) ---"
+        )
+
+def has_changes(report: dict) -> bool:
+    return bool(report["added"] or report["updated"] or report["removed"] or report["reprocessed"])
+
+def open_database():
+    """
+    Aktif veritabanı sürümünü diskten açar; embedding veya dosya okuma yapılmaz, böylece servis
+    hemen trafik alabilir. Önceki çalışmalardan kalan yarım sürüm dizinleri temizlenir.
+    data/ ile uzlaştırma ayrıca arka plan işi olarak çalışır (bkz. rebuild_database).
+    """
     global vector_manager
-    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(current_dir, "data")
-    
+    vector_manager = open_store(generations.current())
+    generations.gc()
+    mismatch = vector_manager.embedding_mismatch()
+    if mismatch is not None:
+        print(f"--- UYARI: {mismatch}; yeniden indeksleme bitene kadar sadece BM25 araması yapılır ---")
+    return vector_manager
+
+def rebuild_database(job, collection=None):
+    """
+    Blue/green reload: aktif sürüm yeni bir dizine kopyalanır, data/ ile senkronizasyon kopya
+    üzerinde yapılır ve bittiğinde canlı VectorStoreManager tek atamayla yenisiyle değiştirilir.
+    Bu süre boyunca /ask ve /db/* istekleri eski (tam) sürümden cevap vermeye devam eder.
+    Eski sürüm, üzerindeki okumalar bitsin diye RELOAD_GC_GRACE_SECONDS sonra silinir.
+    collection verilirse o koleksiyonun data/ dizini ve sürümleri kullanılır; deposu iş boyunca açık tutulur.
+    """
+    if collection is None or collection is default_collection:
+        return sync_collection(job, default_collection)
+    with collection_registry.lease(collection.name):
+        return sync_collection(job, collection)
+
+def sync_collection(job, collection):
+    """rebuild_database'in gövdesi: koleksiyonun data/ dizinini yeni bir sürümde senkronize edip canlıya alır."""
+    data_dir, generations, live_manager = collection.data_dir, collection.generations, collection.manager
     if not os.path.exists(data_dir):
-        print(f"--- HATA: {data_dir} klasörü bulunamadı! ---")
-        vector_manager = VectorStoreManager(chunks=None)
+        raise FileNotFoundError(f"{data_dir} klasörü bulunamadı")
+
+    live_path = generations.current()
+    if live_manager is not None and os.path.abspath(live_manager.persist_directory) == os.path.abspath(live_path):
+        # Dosyalar stat ile kontrol edilir; değişiklik yoksa depo kopyalanmaz, iş hemen biter
+        job.set_phase("checking")
+        manifest = IngestionManifest(os.path.join(live_path, MANIFEST_FILE))
+        changes = pending_changes(data_dir, manifest)
+        if (manifest.exists() and manifest.version == IngestionManifest.VERSION and not any(changes.values())
+                and manifest.chunk_count() == live_manager.get_document_count()
+                and live_manager.embedding_mismatch() is None):
+            job.set_phase("done")
+            return {
+                "generation": os.path.basename(live_path),
+                "total_documents": live_manager.get_document_count(),
+                "changes": new_report(unchanged=len(manifest.files)),
+                "skipped": True
+            }
+
+    job.set_phase("copying")
+    new_path = generations.create(copy_from=live_path)
+    new_manager = open_store(new_path)
+    try:
+        job.set_phase("syncing")
+        report = sync_directory(data_dir, new_manager, workers=INGEST_WORKERS, progress=job.set_progress,
+                                dedup=DEDUP_MODE)
+    except Exception:
+        new_manager.close()
+        generations.remove(new_path)
+        raise
+
+    job.set_phase("swapping")
+    old_manager = collection.manager
+    generations.promote(new_path)
+    collection.manager = new_manager
+    if has_changes(report):
+        invalidate_caches()
+    count = new_manager.get_document_count()
+    log_sync_report(report, count)
+
+    if old_manager is not None and old_manager is not new_manager:
+        schedule_generation_cleanup(old_manager, live_path, store=generations)
+    job.set_phase("done")
+    return {
+        "generation": os.path.basename(new_path),
+        "total_documents": count,
+        "changes": report,
+        "skipped": False
+    }
+
+def reload_target(collection):
+    """Koleksiyonun reload_jobs kuyruğuna verilecek iş fonksiyonu."""
+    return rebuild_database if collection is default_collection else partial(rebuild_database, collection=collection)
+
+def apply_file_changes(paths):
+    """
+    Dosya izleyicisinin batch'ini işler: sadece verilen dosyalar canlı sürüme artımlı olarak eklenir,
+    güncellenir veya silinir (depo kopyalanmaz). Reload işleriyle aynı kuyruktan geçtiği için tam
+    reload ile aynı anda çalışmaz; bir iş sürüyorsa None döner ve izleyici daha sonra tekrar dener.
+    İş bitene kadar bekler ve senkronizasyon raporunu döndürür.
+    """
+    def target(job):
+        manager = vector_manager
+        if manager.embedding_mismatch() is not None:
+            # Model değişmişse canlı sürüm yerinde sıfırlanmaz; tam (blue/green) reindex yapılır
+            return rebuild_database(job)
+        job.set_phase("syncing")
+        report = sync_directory(DATA_DIR, manager, workers=min(INGEST_WORKERS, len(paths)),
+                                progress=job.set_progress, dedup=DEDUP_MODE, paths=paths)
+        if has_changes(report):
+            invalidate_caches()
+        job.set_phase("done")
+        return {
+            "generation": os.path.basename(manager.persist_directory),
+            "total_documents": manager.get_document_count(),
+            "changes": report,
+            "skipped": False
+        }
+
+    job, new = reload_jobs.submit(target, kind="watch")
+    if not new:
+        return None
+    job.wait()
+    if job.error is not None:
+        raise RuntimeError(job.error["message"])
+    return job.result["changes"]
+
+class DefaultCollection:
+    """
+    İstekte koleksiyon verilmediğinde kullanılan data/ + chroma_db/ koleksiyonu. Durumu modül
+    değişkenlerinde (vector_manager, generations, reload_jobs) tutulur; açılışta açılır ve LRU'ya girmez.
+    """
+
+    name = DEFAULT_COLLECTION
+
+    @property
+    def data_dir(self):
+        return DATA_DIR
+
+    @property
+    def generations(self):
+        return generations
+
+    @property
+    def reload_jobs(self):
+        return reload_jobs
+
+    @property
+    def manager(self):
+        return vector_manager
+
+    @manager.setter
+    def manager(self, value):
+        global vector_manager
+        vector_manager = value
+
+def open_collection(collection):
+    """Bir koleksiyonun deposu (ilk istekte veya LRU'dan çıkarıldıktan sonra) açıldığında data/ ile uzlaştırır."""
+    collection.reload_jobs.submit(reload_target(collection))
+
+def get_collection(name: str = None):
+    """İstekteki koleksiyon adını çözer; bilinmeyen koleksiyon için 404."""
+    if not name or name == DEFAULT_COLLECTION:
+        return default_collection
+    try:
+        return collection_registry.get(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Koleksiyon bulunamadı: {name}")
+
+@asynccontextmanager
+async def collection_store(name: str = None):
+    """
+    Koleksiyonun deposunu blok süresince verir. Varsayılan koleksiyonda canlı vector_manager döner;
+    diğerlerinde depo gerekirse (event loop dışında) diskten açılır ve blok bitene kadar kapatılmaz.
+    Depo store_leases ile tutulur: blok sürerken reload yeni sürüme geçse de bu depo, blok bitene kadar
+    LRU tahliyesiyle de sürüm temizliğiyle de kapatılmaz.
+    """
+    collection = get_collection(name)
+    if collection is default_collection:
+        with store_leases.hold(vector_manager) as manager:
+            yield manager
         return
-    
-    chunks = load_all_documents(data_dir)
-    
-    if chunks:
-        vector_manager = VectorStoreManager(chunks)
-        print(f"--- RAG Sistemi Hazır ({len(chunks)} toplam chunk) ---")
-    else:
-        # Eğer dosya yoksa ama veritabanı varsa, mevcut veritabanını yükle
-        vector_manager = VectorStoreManager(chunks=None)
-        count = vector_manager.get_document_count()
-        if count > 0:
-            print(f"--- Mevcut veritabanı yüklendi ({count} doküman) ---")
-        else:
-            print("--- Veritabanı boş ---")
+    manager = await asyncio.to_thread(collection_registry.acquire, collection.name)
+    try:
+        with store_leases.hold(manager):
+            yield manager
+    finally:
+        collection_registry.release(collection.name)
+
+def schedule_generation_cleanup(old_manager, path: str, delay: float = None, store: GenerationStore = None):
+    """
+    Eski sürümü bekleme süresi dolunca kapatıp diskten siler (store verilmezse varsayılan koleksiyonun
+    sürümleri). Süre dolduğunda eski depoyu hâlâ tutan istekler varsa (bkz. collection_store) onlar bitene
+    kadar beklenir.
+    """
+    def cleanup():
+        store_leases.wait_idle(old_manager)
+        old_manager.close()
+        (store or generations).remove(path)
+
+    timer = threading.Timer(RELOAD_GC_GRACE_SECONDS if delay is None else delay, cleanup)
+    timer.daemon = True
+    timer.start()
+    return timer
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global vector_manager
-    initialize_database()
+    """
+    Açılışta sadece kalıcı veritabanı açılır ve servis hemen hazır olur; data/ ile uzlaştırma
+    (yeni/değişmiş/silinmiş dosyalar) /db/reload ile aynı arka plan işinde yapılır.
+    Açılış süreleri startup_info'ya yazılır ve /db/stats'ta raporlanır.
+    """
+    global vector_manager, retrieval_executor, watcher, embedding_cache
+    startup_info["import_seconds"] = round(APP_IMPORTED - IMPORT_STARTED, 3)
+    retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+    embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+    await llm.start()
+
+    open_started = time.perf_counter()
+    open_database()
+    startup_info["store_open_seconds"] = round(time.perf_counter() - open_started, 3)
+    job, _ = reload_jobs.submit(rebuild_database)
+    startup_info["reconcile_job_id"] = job.id
+    if WATCH_DATA_DIR:
+        # Uzlaştırma işi sürerken izleyicinin batch'leri bekler (aynı iş kuyruğu)
+        watcher = DataDirWatcher(DATA_DIR, apply_file_changes, poll_seconds=WATCH_POLL_SECONDS,
+                                 debounce_seconds=WATCH_DEBOUNCE_SECONDS)
+        watcher.start()
+    # Yorumlayıcının kendi açılışı hariç: src.main importunun başından trafiğe hazır olana kadar
+    startup_info["ready_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    print(
+        f"--- Servis hazır: {startup_info['ready_seconds']} sn "
+        f"(import {startup_info['import_seconds']} sn, veritabanı açılışı {startup_info['store_open_seconds']} sn); "
+        f"data/ senkronizasyonu arka planda: /db/reload/{job.id} ---"
+    )
     yield
+    if watcher is not None:
+        watcher.stop()
+    collection_registry.close_all()
+    await llm.close()
+    retrieval_executor.shutdown(wait=False)
+    if vector_manager is not None:
+        vector_manager.save()
+    if hasattr(embeddings, "close"):
+        embeddings.close()
+    if embedding_cache is not None:
+        embedding_cache.close()
+        embedding_cache = None
     print("--- Servis kapatılıyor ---")
 
 app = FastAPI(title="Doküman Soru-Cevap Servisi", lifespan=lifespan)
-llm = LLMClient()
+app.add_middleware(MetricsMiddleware, in_flight=HTTP_IN_FLIGHT, duration=HTTP_REQUEST_SECONDS)
+startup_info = {}
+query_vector_cache = LRUCache(max_entries=QUERY_CACHE_SIZE)
+answer_cache = TTLCache(max_entries=ANSWER_CACHE_SIZE, ttl_seconds=ANSWER_CACHE_TTL)
+# lifespan'de oluşturulur; None ise run_in_executor varsayılan havuzu kullanır
+retrieval_executor = None
+llm = LLMClient(
+    host=OLLAMA_BASE_URL,
+    max_connections=LLM_MAX_CONNECTIONS,
+    connect_timeout=LLM_CONNECT_TIMEOUT,
+    read_timeout=LLM_READ_TIMEOUT,
+    max_retries=LLM_MAX_RETRIES,
+    max_concurrency=LLM_MAX_CONCURRENCY
+)
 vector_manager = None
+generations = GenerationStore(CHROMA_DB_DIR)
+# Eski sürüm depolarının temizliği, onları tutan istekler bitene kadar bekletilir
+store_leases = StoreLeases()
+reload_jobs = ReloadJobManager()
+default_collection = DefaultCollection()
+collection_registry = CollectionRegistry(
+    COLLECTIONS_DIR, open_store, on_open=open_collection,
+    max_open=COLLECTION_MAX_OPEN, max_memory_bytes=COLLECTION_MAX_MEMORY_MB << 20,
+)
+# WATCH_DATA_DIR açıksa lifespan'de başlatılır
+watcher = None
+context_builder = ContextBuilder(
+    token_budget=CONTEXT_TOKEN_BUDGET, counter=TokenCounter(CONTEXT_TOKENIZER_PATH or None)
+)
+# lifespan'de açılır; import sırasında diske dokunulmaz. None ise embedding'ler önbelleksiz hesaplanır
+embedding_cache = None
+embeddings = create_embeddings(
+    EMBEDDING_PROVIDER, EMBEDDING_MODEL or None, base_url=OLLAMA_BASE_URL,
+    batch_size=EMBEDDING_BATCH_SIZE, max_concurrency=EMBEDDING_CONCURRENCY
+)
+
+APP_IMPORTED = time.perf_counter()
 
 # Static dosyalar için mount
-current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-static_dir = os.path.join(current_dir, "static")
+static_dir = os.path.join(PROJECT_DIR, "static")
 if os.path.exists(static_dir):
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
@@ -92,18 +425,10 @@ async def read_root():
         return FileResponse(static_file)
     return {"message": "Web arayüzü bulunamadı. Lütfen /docs adresini kullanın."}
 
-@app.post("/ask")
-async def ask_question(request: QuestionRequest):
-    question = request.question
-    context = ""
-    if vector_manager:
-        relevant_docs = vector_manager.search(question, k=3)
-        
-        context = "\n".join([doc.page_content for doc in relevant_docs])
-        
-        
-        prompt = f"""### SİSTEM TALİMATI:
-Sen bir döküman asistanısın. Aşağıdaki döküman içeriğini bir bilgi kaynağı olarak kullan ve soruyu cevapla. 
+# Sistem talimatı her istekte birebir aynı önek olarak en başta durur; değişken kısımlar (bağlam, soru)
+# sonra gelir. Ollama ardışık istekler arasında ortak öneki KV-cache'ten kullanır, yeniden işlemez.
+PROMPT_TEMPLATE = """### SİSTEM TALİMATI:
+Sen bir döküman asistanısın. Aşağıdaki döküman içeriğini bir bilgi kaynağı olarak kullan ve soruyu cevapla.
 Sadece dökümandaki bilgilere sadık kal.
 
 ### DÖKÜMAN İÇERİĞİ:
@@ -112,92 +437,470 @@ Sadece dökümandaki bilgilere sadık kal.
 ### KULLANICI SORUSU:
 {question}
 """
-    else:
-        prompt = question
 
-    answer = await llm.ask(prompt)
-    
-    
+# Şablon veya bağlam bütçesi değişirse eski cevaplar önbellekten kullanılmasın diye anahtara özetleri eklenir
+PROMPT_TEMPLATE_VERSION = hashlib.sha1(
+    f"{PROMPT_TEMPLATE}\x00{CONTEXT_TOKEN_BUDGET}".encode("utf-8")
+).hexdigest()[:12]
+
+async def retrieve(question: str, k: int = 3, manager=None, where: dict = None):
+    """
+    Aramayı (gerekirse sorgu embedding'i için Ollama'ya giden bloklayan HTTP çağrısı + Chroma/BM25
+    araması) event loop dışında, sınırlı boyutlu retrieval thread havuzunda çalıştırır.
+    Böylece bir sorunun embedding'i beklenirken diğer istekler (/db/stats, statik dosyalar) durmaz.
+    Aynı (normalize edilmiş) soru daha önce sorulduysa sorgu vektörü önbellekten alınır;
+    anahtar kelime tarzı sorgularda (RETRIEVAL_MODE=hybrid) embedding hiç hesaplanmaz.
+    manager verilmezse varsayılan koleksiyonun deposunda aranır; where verilirse filtre aramaya eklenir.
+    """
+    manager = manager if manager is not None else vector_manager
+    normalized = normalize_question(question)
+    cached_vector = query_vector_cache.get(normalized)
+
+    def search():
+        vector = cached_vector
+        if vector is None and manager.needs_embedding(question, RETRIEVAL_MODE):
+            with QUERY_STAGE_SECONDS.time("embed"):
+                vector = manager.embed_query(question)
+        with QUERY_STAGE_SECONDS.time("search"):
+            return vector, manager.search(question, k=k, mode=RETRIEVAL_MODE, query_vector=vector, where=where)
+
+    loop = asyncio.get_running_loop()
+    vector, docs = await loop.run_in_executor(retrieval_executor, search)
+    if cached_vector is None and vector is not None:
+        query_vector_cache.put(normalized, vector)
+    return docs
+
+async def retrieve_batch(questions, k: int = 3, manager=None, where: dict = None):
+    """
+    retrieve()'ün çoklu soru hali: önbellekte vektörü olmayan ve embedding gerektiren sorular tek
+    batch'li embedding çağrısıyla embed edilir, aramalar VectorStoreManager.search_batch ile birlikte
+    yapılır. Soru sırasıyla döküman listeleri döndürür.
+    """
+    manager = manager if manager is not None else vector_manager
+    normalized = [normalize_question(q) for q in questions]
+    cached = [query_vector_cache.get(n) for n in normalized]
+
+    def search():
+        vectors = list(cached)
+        missing = [
+            i for i, question in enumerate(questions)
+            if vectors[i] is None and manager.needs_embedding(question, RETRIEVAL_MODE)
+        ]
+        with QUERY_STAGE_SECONDS.time("embed_batch"):
+            for i, vector in zip(missing, manager.embed_queries([questions[i] for i in missing])):
+                vectors[i] = vector
+        with QUERY_STAGE_SECONDS.time("search_batch"):
+            return vectors, manager.search_batch(questions, k=k, mode=RETRIEVAL_MODE, query_vectors=vectors,
+                                                 where=where)
+
+    loop = asyncio.get_running_loop()
+    vectors, results = await loop.run_in_executor(retrieval_executor, search)
+    for key, cached_vector, vector in zip(normalized, cached, vectors):
+        if cached_vector is None and vector is not None:
+            query_vector_cache.put(key, vector)
+    return results
+
+async def build_prompt(question: str, manager=None, where: dict = None):
+    """
+    Soruyla ilgili CONTEXT_CANDIDATES aday parçayı getirip token bütçesine sığan bağlamı kurar
+    (bkz. ContextBuilder) ve LLM'e gidecek prompt'u hazırlar. manager verilmezse varsayılan koleksiyon,
+    where verilirse sadece filtreye uyan parçalar kullanılır.
+    (prompt, kullanılan chunk ID'leri, bağlam istatistikleri) döndürür.
+    """
+    manager = manager if manager is not None else vector_manager
+    if not manager:
+        return question, (), None
+    docs = await retrieve(question, k=CONTEXT_CANDIDATES, manager=manager, where=where)
+    return assemble_prompt(question, docs)
+
+def assemble_prompt(question: str, relevant_docs):
+    """Getirilmiş aday parçalardan bağlamı kurup prompt'u hazırlar (bkz. build_prompt)."""
+    with QUERY_STAGE_SECONDS.time("prompt"):
+        context = context_builder.build(relevant_docs)
+        prompt = PROMPT_TEMPLATE.format(context=context.text, question=question)
+        stats = {**context.stats, "prompt_tokens": context_builder.counter.count(prompt)}
+    return prompt, context.doc_ids, stats
+
+def answer_cache_key(question: str, doc_ids, collection: str = None):
+    """Cevap önbelleği anahtarı: aynı koleksiyon + aynı soru + aynı parçalar + aynı model + aynı şablon = aynı cevap."""
+    return (collection or DEFAULT_COLLECTION, normalize_question(question), tuple(doc_ids), llm.model_name,
+            PROMPT_TEMPLATE_VERSION)
+
+def is_cacheable_answer(answer: str) -> bool:
+    return bool(answer) and not answer.startswith("Hata oluştu")
+
+def invalidate_caches():
+    """Veritabanı içeriği değiştiğinde sorgu vektörü ve cevap önbelleklerini boşaltır."""
+    query_vector_cache.clear()
+    answer_cache.clear()
+
+@app.post("/ask")
+async def ask_question(request: QuestionRequest):
+    question = request.question
+    where = request.filters.to_where() if request.filters else None
+    async with collection_store(request.collection) as manager:
+        prompt, doc_ids, context_stats = await build_prompt(question, manager, where)
+
+    cache_key = answer_cache_key(question, doc_ids, request.collection)
+    answer = answer_cache.get(cache_key)
+    metrics = {"cached": answer is not None, "context": context_stats}
+    if answer is None:
+        result = await llm.generate(prompt)
+        answer = result["response"]
+        metrics.update(result["metrics"])
+        if is_cacheable_answer(answer):
+            answer_cache.put(cache_key, answer)
+
     return {
-        "question": question, 
+        "question": question,
         "answer": answer,
+        "metrics": metrics,
     }
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+@app.post("/ask/batch")
+async def ask_question_batch(request: BatchQuestionRequest):
+    """
+    Çok sayıda soruyu (gece değerlendirmeleri, SSS ön üretimi) tek istekte cevaplar.
+    Sorular ASK_BATCH_RETRIEVAL_SIZE'lık gruplar halinde retrieve_batch ile getirilir; hazırlanan
+    prompt'lar sınırlı bir kuyruk üzerinden ASK_BATCH_CONCURRENCY işçiye dağıtılır. Kuyruk dolunca
+    yeni grup getirilmez, yani arama üretimin ancak biraz önünden gider.
+    Cevaplar tamamlandıkça NDJSON satırı olarak gönderilir (sıra soru sırası değildir, "index" alanına
+    bakın): {"index", "question", "answer", "cached", "metrics", "timing"}; hata olursa "error" alanı
+    eklenir. Son satır {"done": true, "count", "errors", "cached", "total_ms"} özetidir.
+    collection verilirse koleksiyonun deposu akış bitene kadar açık tutulur.
+    timing: retrieval_ms (sorunun grubunun ortak arama süresi), queue_ms (işçi beklemesi),
+    generation_ms ve elapsed_ms (isteğin başından cevabın hazır olmasına kadar).
+    """
+    questions = request.questions
+    if len(questions) > ASK_BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {ASK_BATCH_MAX_QUESTIONS} soru gönderilebilir")
+    get_collection(request.collection)
+    where = request.filters.to_where() if request.filters else None
+    started = time.perf_counter()
+    workers = max(1, min(ASK_BATCH_CONCURRENCY, len(questions)))
+    jobs = asyncio.Queue(maxsize=workers * 2)
+    results = asyncio.Queue()
+
+    async def produce(manager):
+        for start in range(0, len(questions), ASK_BATCH_RETRIEVAL_SIZE):
+            group = questions[start:start + ASK_BATCH_RETRIEVAL_SIZE]
+            group_started = time.perf_counter()
+            try:
+                if manager:
+                    docs = await retrieve_batch(group, k=CONTEXT_CANDIDATES, manager=manager, where=where)
+                    prompts = [assemble_prompt(q, d) for q, d in zip(group, docs)]
+                else:
+                    prompts = [(q, (), None) for q in group]
+            except Exception as e:
+                for index, question in enumerate(group, start):
+                    results.put_nowait({"index": index, "question": question, "error": f"Hata oluştu: {str(e)}"})
+                continue
+            retrieval_ms = elapsed_ms(group_started)
+            for index, (question, (prompt, doc_ids, context_stats)) in enumerate(zip(group, prompts), start):
+                await jobs.put({
+                    "index": index, "question": question, "prompt": prompt, "doc_ids": doc_ids,
+                    "context": context_stats, "retrieval_ms": retrieval_ms, "ready": time.perf_counter(),
+                })
+        for _ in range(workers):
+            await jobs.put(None)
+
+    async def answer(job):
+        question = job["question"]
+        item = {"index": job["index"], "question": question}
+        queue_ms = elapsed_ms(job["ready"])
+        generation_started = time.perf_counter()
+        try:
+            cache_key = answer_cache_key(question, job["doc_ids"], request.collection)
+            text = answer_cache.get(cache_key)
+            metrics = {"cached": text is not None, "context": job["context"]}
+            if text is None:
+                result = await llm.generate(job["prompt"])
+                text = result["response"]
+                metrics.update(result["metrics"])
+                if is_cacheable_answer(text):
+                    answer_cache.put(cache_key, text)
+            item.update(answer=text, cached=metrics.pop("cached"), metrics=metrics)
+            if not is_cacheable_answer(text):
+                item["error"] = text
+        except Exception as e:
+            item["error"] = f"Hata oluştu: {str(e)}"
+        item["timing"] = {
+            "retrieval_ms": job["retrieval_ms"],
+            "queue_ms": queue_ms,
+            "generation_ms": elapsed_ms(generation_started),
+            "elapsed_ms": elapsed_ms(started),
+        }
+        return item
+
+    async def work():
+        while (job := await jobs.get()) is not None:
+            results.put_nowait(await answer(job))
+
+    async def ndjson_stream():
+        async with collection_store(request.collection) as manager:
+            tasks = [asyncio.create_task(produce(manager))] + [asyncio.create_task(work()) for _ in range(workers)]
+            errors = cached = 0
+            try:
+                for _ in range(len(questions)):
+                    item = await results.get()
+                    errors += "error" in item
+                    cached += bool(item.get("cached"))
+                    yield json.dumps(item, ensure_ascii=False) + "\n"
+                summary = {"done": True, "count": len(questions), "errors": errors, "cached": cached,
+                           "total_ms": elapsed_ms(started)}
+                yield json.dumps(summary) + "\n"
+            finally:
+                # İstemci bağlantıyı keserse bekleyen aramalar ve üretimler de iptal edilir
+                for task in tasks:
+                    task.cancel()
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events formatında tek bir olay satırı üretir."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    /ask ile aynı RAG akışı, fakat cevap token token Server-Sent Events olarak gönderilir.
+    Olaylar: "token" ({"token": ...}), "done" ({"question", "metrics"}), "error" ({"detail"}).
+    Cevap önbellekteyse tek bir token olayı ve "cached": true içeren done olayı gönderilir.
+    """
+    question = request.question
+    where = request.filters.to_where() if request.filters else None
+    async with collection_store(request.collection) as manager:
+        prompt, doc_ids, context_stats = await build_prompt(question, manager, where)
+    cache_key = answer_cache_key(question, doc_ids, request.collection)
+
+    async def event_stream():
+        cached_answer = answer_cache.get(cache_key)
+        if cached_answer is not None:
+            yield sse_event("token", {"token": cached_answer})
+            yield sse_event("done", {"question": question, "cached": True, "metrics": {
+                "ttft_ms": 0.0, "total_ms": 0.0, "context": context_stats,
+            }})
+            return
+
+        tokens = []
+        try:
+            async for item in llm.ask_stream(prompt):
+                if item.get("done"):
+                    answer = "".join(tokens)
+                    if is_cacheable_answer(answer):
+                        answer_cache.put(cache_key, answer)
+                    metrics = {**item["metrics"], "context": context_stats}
+                    yield sse_event("done", {"question": question, "cached": False, "metrics": metrics})
+                else:
+                    tokens.append(item["token"])
+                    yield sse_event("token", item)
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Hata oluştu: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def cache_counters(name: str):
+    """Önbellek istatistiklerinden /metrics için {(önbellek, sayaç): değer}."""
+    caches = {"query": query_vector_cache, "answer": answer_cache, "embedding": embedding_cache}
+    values = {}
+    for cache_name, cache in caches.items():
+        if cache is not None:
+            values[(cache_name,)] = cache.stats()[name]
+    return values
+
+def store_sizes():
+    # Sadece sayaçlar okunur (koleksiyon/indeks taranmaz), scrape maliyeti sabit kalır
+    if vector_manager is None:
+        return None
+    return {
+        ("chunks",): vector_manager.get_document_count(),
+        ("lexical_documents",): len(vector_manager.lexical_index),
+        ("dedup_chunks",): len(vector_manager.dedup_index),
+    }
+
+def llm_queue():
+    return {("in_flight",): llm.in_flight, ("waiting",): llm.waiting} if hasattr(llm, "in_flight") else None
+
+CallbackMetric("rag_store_size", "Canlı veritabanı sürümündeki kayıt sayıları", store_sizes, ["kind"])
+CallbackMetric("rag_cache_hits_total", "Önbellek isabetleri", lambda: cache_counters("hits"), ["cache"], kind="counter")
+CallbackMetric("rag_cache_misses_total", "Önbellek ıskaları", lambda: cache_counters("misses"), ["cache"], kind="counter")
+CallbackMetric("rag_cache_entries", "Önbellekteki kayıt sayısı", lambda: cache_counters("entries"), ["cache"])
+CallbackMetric("rag_llm_requests", "Ollama'ya giden ve sırada bekleyen üretim istekleri", llm_queue, ["state"])
+CallbackMetric(
+    "rag_watch_queue_depth", "data/ izleyicisinde depoya işlenmeyi bekleyen dosya sayısı",
+    lambda: watcher.queue_depth() if watcher is not None else None,
+)
+CallbackMetric(
+    "rag_collections_open", "Deposu bellekte açık olan koleksiyon sayısı (varsayılan hariç)",
+    lambda: len(collection_registry.open_collections()),
+)
+CallbackMetric(
+    "rag_collection_evictions_total", "Bellek/sayı sınırı nedeniyle kapatılan koleksiyon depoları",
+    lambda: collection_registry.evictions, kind="counter",
+)
+CallbackMetric(
+    "rag_reload_running", "Sürmekte olan reload işi (1/0)",
+    lambda: int(reload_jobs.active is not None),
+)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus formatında metrikler: sorgu ve ingestion aşama süreleri (histogram), token ve chunk
+    sayaçları, HTTP istekleri, depo boyutu ve önbellek sayaçları. Değerler zaten tutulan sayaçlardan
+    okunur; scrape sırasında depo taranmaz veya model çağrılmaz.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 #veri tabanı işlemleri için endpointlarımız:
 # A. get_db_stats: veritabanındaki toplam doküman sayısını döndürür
 @app.get("/db/stats") 
-async def get_db_stats():
-    """Veritabanı istatistiklerini döndürür."""
-    if not vector_manager:
-        raise HTTPException(status_code=503, detail="Veritabanı başlatılmamış")
-    
-    count = vector_manager.get_document_count()
+async def get_db_stats(collection: str = None):
+    """Veritabanı istatistiklerini döndürür. collection verilirse o koleksiyonun deposu için."""
+    target = get_collection(collection)
+    async with collection_store(collection) as manager:
+        if not manager:
+            raise HTTPException(status_code=503, detail="Veritabanı başlatılmamış")
+        return db_stats(target, manager)
+
+def db_stats(collection, manager):
+    active_reload = collection.reload_jobs.active
+    count = manager.get_document_count()
     return {
+        "collection": collection.name,
         "total_documents": count,
-        "status": "active" if count > 0 else "empty"
+        "status": "active" if count > 0 else "empty",
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+        "ingestion": manager.ingest_stats.to_dict(),
+        "llm": llm.stats(),
+        "query_cache": query_vector_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "lexical_index": manager.lexical_index.stats(),
+        "dedup": manager.dedup_index.stats(),
+        "vector_backend": manager.backend.stats(),
+        "embedding": {
+            **manager.embedding_model,
+            "store": manager.store_info,
+            "mismatch": manager.embedding_mismatch(),
+        },
+        "generation": os.path.basename(manager.persist_directory),
+        "reload": active_reload.to_dict() if active_reload else None,
+        "watcher": watcher.stats() if watcher is not None else None,
+        "collections": collection_registry.stats(),
+        "startup": startup_info
     }
 
-# B. get_documents: veritabanındaki dokümanları listeler
+def document_filter(source: str = None, page: int = None, data_dir: str = None):
+    """
+    /db/documents ve /db/preview için metadata filtresi.
+    source sadece dosya adı olarak verilirse koleksiyonun data/ klasöründeki tam yola çevrilir
+    (loader'lar metadata'ya dosyanın tam yolunu yazar).
+    """
+    if source and os.path.basename(source) == source:
+        source = os.path.join(data_dir or DATA_DIR, source)
+    return metadata_filter(source=source, page=page)
+
+# B. get_documents: veritabanındaki dokümanları sayfalı olarak listeler
 @app.get("/db/documents")
-async def get_documents(limit: int = 10):
-    """Veritabanındaki dokümanları listeler."""
-    if not vector_manager:
-        raise HTTPException(status_code=503, detail="Veritabanı başlatılmamış")
-    
-    documents = vector_manager.get_documents_with_metadata(limit=limit)
-    return {
-        "count": len(documents),
-        "documents": documents
-    }
+async def get_documents(limit: int = 10, offset: int = 0, fields: str = "content,full_content,metadata",
+                        source: str = None, page: int = None, collection: str = None):
+    """
+    Veritabanındaki dokümanları listeler. Embedding veya vektör araması yapılmaz.
+    offset/limit ile sayfalama yapılır, fields ile dönecek alanlar seçilir (virgülle ayrılmış:
+    content, full_content, metadata). source (dosya adı/yolu) ve page ile metadata filtresi uygulanır.
+    Sadece istenen sayfa ve alanlar okunur.
+    """
+    if limit < 1 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit en az 1, offset en az 0 olmalı")
+    data_dir = get_collection(collection).data_dir
+    async with collection_store(collection) as manager:
+        if not manager:
+            raise HTTPException(status_code=503, detail="Veritabanı başlatılmamış")
+        result = manager.get_documents_page(
+            offset=offset, limit=limit, fields=[f.strip() for f in fields.split(",") if f.strip()],
+            where=document_filter(source, page, data_dir)
+        )
+        return {
+            "count": len(result["documents"]),
+            "offset": offset,
+            "next_offset": result["next_offset"],
+            "total_documents": manager.get_document_count(),
+            "documents": result["documents"]
+        }
 
 # C. preview_documents: veritabanındaki dokümanların önizlemesini gösterir
 @app.get("/db/preview")
-async def preview_documents(limit: int = 5):
-    """Veritabanındaki dokümanların önizlemesini gösterir."""
-    if not vector_manager:
-        raise HTTPException(status_code=503, detail="Veritabanı başlatılmamış")
-    
-    documents = vector_manager.get_documents_with_metadata(limit=limit)
+async def preview_documents(limit: int = 5, source: str = None, page: int = None, collection: str = None):
+    """Veritabanındaki dokümanların önizlemesini gösterir (model çağrısı yapmaz)."""
+    data_dir = get_collection(collection).data_dir
+    async with collection_store(collection) as manager:
+        if not manager:
+            raise HTTPException(status_code=503, detail="Veritabanı başlatılmamış")
+        documents = manager.get_documents_with_metadata(
+            limit=limit, where=document_filter(source, page, data_dir)
+        )
+        return {
+            "preview_count": len(documents),
+            "total_documents": manager.get_document_count(),
+            "documents": documents
+        }
+
+# D. reload_database: data/ klasörünü arka planda yeni bir veritabanı sürümüne senkronize eder
+@app.post("/db/reload")
+async def reload_database(wait: bool = False, collection: str = None):
+    """
+    data/ klasöründeki yeni/değişmiş dosyaları embed eder, silinen dosyaların chunk'larını kaldırır.
+    İş arka planda yeni bir veritabanı sürümünde çalışır; bitene kadar sorgular mevcut sürümden
+    cevaplanır. Hemen job_id döner (202), ilerleme GET /db/reload/{job_id} ile izlenir.
+    Bir reload zaten sürüyorsa yeni iş açılmaz, çalışan işin job_id'si döner.
+    wait=true verilirse iş bitene kadar beklenir ve sonuç doğrudan döner.
+    collection verilirse o koleksiyonun data/ dizini kendi sürümlerine senkronize edilir.
+    """
+    target = get_collection(collection)
+    job, created = target.reload_jobs.submit(reload_target(target))
+    if not wait:
+        status_url = f"/db/reload/{job.id}"
+        if target is not default_collection:
+            status_url += f"?collection={target.name}"
+        return JSONResponse(status_code=202, content={
+            "status": "accepted" if created else "already_running",
+            "job_id": job.id,
+            "status_url": status_url
+        })
+
+    await asyncio.to_thread(job.wait)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Veritabanı yeniden yüklenirken hata: {job.error['message']}")
     return {
-        "preview_count": len(documents),
-        "total_documents": vector_manager.get_document_count(),
-        "documents": documents
+        "status": "success",
+        "message": "Veritabanı başarıyla yeniden yüklendi",
+        "job_id": job.id,
+        "generation": job.result["generation"],
+        "total_documents": job.result["total_documents"],
+        "changes": job.result["changes"]
     }
 
-# D. reload_database: veritabanını temizleyip data/ klasöründeki tüm dosyaları yeniden yükler
-@app.post("/db/reload")
-async def reload_database():
-    """Veritabanını temizleyip data/ klasöründeki tüm dosyaları yeniden yükler."""
-    global vector_manager
-    
-    try:
-        # Mevcut veritabanını temizle
-        import shutil
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        chroma_db_path = os.path.join(current_dir, "chroma_db")
-        
-        if os.path.exists(chroma_db_path):
-            shutil.rmtree(chroma_db_path)
-            print("--- Mevcut veritabanı temizlendi ---")
-        
-        # Veritabanını yeniden başlat
-        initialize_database()
-        
-        count = vector_manager.get_document_count() if vector_manager else 0
-        return {
-            "status": "success",
-            "message": "Veritabanı başarıyla yeniden yüklendi",
-            "total_documents": count
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Veritabanı yeniden yüklenirken hata: {str(e)}")
+@app.get("/db/reload/{job_id}")
+async def reload_status(job_id: str, collection: str = None):
+    """Reload işinin durumunu (queued/running/succeeded/failed), aşamasını ve dosya ilerlemesini döndürür."""
+    job = get_collection(collection).reload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Reload işi bulunamadı")
+    return job.to_dict()
 
 # E. list_files: data/ klasöründeki tüm dosyaları listeler
 @app.get("/db/files")
-async def list_files():
-    """data/ klasöründeki desteklenen dosyaları listeler."""
-    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(current_dir, "data")
-    
+async def list_files(collection: str = None):
+    """data/ klasöründeki (collection verilirse koleksiyonun data/ klasöründeki) desteklenen dosyaları listeler."""
+    data_dir = get_collection(collection).data_dir
     if not os.path.exists(data_dir):
         return {
             "files": [],
@@ -205,14 +908,8 @@ async def list_files():
             "message": "data/ klasörü bulunamadı"
         }
     
-    supported_extensions = ['.pdf', '.txt', '.md']
-    files_found = []
-    for ext in supported_extensions:
-        pattern = os.path.join(data_dir, f"*{ext}")
-        files_found.extend(glob.glob(pattern))
-    
     files_info = []
-    for file_path in files_found:
+    for file_path in find_supported_files(data_dir):
         file_name = os.path.basename(file_path)
         file_size = os.path.getsize(file_path)
         files_info.append({
@@ -226,4 +923,31 @@ async def list_files():
         "files": files_info,
         "count": len(files_info),
         "data_directory": data_dir
+    }
+
+# F. list_collections: koleksiyonları ve depolarının açık olup olmadığını listeler
+@app.get("/db/collections")
+async def list_collections():
+    """
+    COLLECTIONS_DIR altındaki koleksiyonları listeler (her biri <ad>/data dizini olan bir klasör).
+    Depolar ilk istekte açılır; "open": false olan koleksiyonun deposu henüz açılmamış veya
+    bellek sınırı nedeniyle kapatılmıştır.
+    """
+    collections = [default_collection_stats()]
+    for name in collection_registry.names():
+        collections.append(collection_registry.get(name).stats())
+    return {
+        "collections": collections,
+        "count": len(collections),
+        "collections_directory": COLLECTIONS_DIR,
+        **{k: v for k, v in collection_registry.stats().items() if k != "known"},
+    }
+
+def default_collection_stats():
+    return {
+        "name": DEFAULT_COLLECTION,
+        "open": vector_manager is not None,
+        "memory_bytes": vector_manager.memory_estimate() if vector_manager is not None else 0,
+        "users": None,
+        "idle_seconds": None,
     }
\ No newline at end of file
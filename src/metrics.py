@@ -0,0 +1,323 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Süre histogramlarının varsayılan kova sınırları (saniye): milisaniyelik BM25 aramasından
+# dakikalık uzun prompt üretimine kadar
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    """Kayıtlı metrikleri Prometheus metin formatında (text/plain; version=0.0.4) sunar."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    """
+    Etiketli metriklerin ortak kısmı: labels(...) her etiket değeri kombinasyonu için bir alt seri
+    döndürür (ilk kullanımda oluşturulur). Etiketsiz metrikte değer doğrudan metriğin üzerindedir.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} için {len(self.labelnames)} etiket değeri gerekli")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} etiketli bir metrik; önce labels(...) çağrılmalı")
+        return self._children[()]
+
+    def samples(self):
+        for key, child in sorted(self._children.items()):
+            yield from child.samples(self.name, self.labelnames, key)
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def samples(self, name, labelnames, labelvalues):
+        yield f"{name}{_labels(labelnames, labelvalues)} {_format_value(self.value)}"
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç (istek, chunk, token sayısı)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    """Artıp azalabilen anlık değer (sürmekte olan istek sayısı gibi)."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    @contextmanager
+    def track(self):
+        """Blok süresince değeri bir artırır."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self, name, labelnames, labelvalues):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_value(float(bound))}"'
+            yield f"{name}_bucket{_labels(labelnames, labelvalues, le)} {cumulative}"
+        yield f"{name}_sum{_labels(labelnames, labelvalues)} {_format_value(total)}"
+        yield f"{name}_count{_labels(labelnames, labelvalues)} {cumulative}"
+
+
+class Histogram(_Metric):
+    """
+    Süre dağılımı: gözlemler sabit kovalara sayılır, bellek ve gözlem maliyeti gözlem sayısından
+    bağımsızdır. Prometheus tarafında histogram_quantile ile p50/p99 hesaplanır.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Blok süresini (saniye) gözlem olarak ekler."""
+        target = self.labels(*labelvalues) if labelvalues else self._default()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            target.observe(time.perf_counter() - start)
+
+
+class CallbackMetric(_Metric):
+    """
+    Değeri her okumada (scrape) bir fonksiyondan alınan metrik; depo boyutu ve önbellek sayaçları
+    gibi zaten başka bir yerde tutulan değerleri kopyalamadan sunmak için. Fonksiyon etiketsiz
+    metrikte bir sayı, etiketlide {etiket değerleri (tuple): sayı} döndürür; None ise seri yazılmaz.
+    Fonksiyon scrape'i yavaşlatmamalı: sadece sayaç okumalı, dosya/koleksiyon taramamalı.
+    """
+
+    def __init__(self, name: str, documentation: str, function, labelnames=(), kind: str = "gauge",
+                 registry: Registry = REGISTRY):
+        self.function = function
+        self.kind = kind
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return None
+
+    def samples(self):
+        try:
+            values = self.function()
+        except Exception:
+            return
+        if values is None:
+            return
+        if not self.labelnames:
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            if value is not None:
+                key = key if isinstance(key, tuple) else (key,)
+                yield f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class MetricsMiddleware:
+    """
+    Bütün HTTP isteklerini sayan ASGI ara katmanı: sürmekte olan istek sayısı ve route şablonuna göre
+    (ör. /db/documents/{doc_id}) istek süresi. Streaming cevaplarda süre son byte gönderilince biter.
+    """
+
+    def __init__(self, app, in_flight: Gauge, duration: Histogram, skip_paths=("/metrics",)):
+        self.app = app
+        self.in_flight = in_flight
+        self.duration = duration
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "other"
+            self.duration.labels(scope["method"], path, str(status["code"])).observe(time.perf_counter() - start)
+
+
+# Uygulamanın metrikleri. Aşamalar: sorgu tarafında embed / search / prompt / prefill / generation,
+# ingestion tarafında parse / split (dosya başına) ve embed / write (yazma batch'i başına)
+QUERY_STAGE_SECONDS = Histogram(
+    "rag_query_stage_seconds", "Soru-cevap akışında aşama başına süre", ["stage"],
+)
+INGEST_STAGE_SECONDS = Histogram(
+    "rag_ingest_stage_seconds",
+    "Ingestion aşama süreleri (parse/split dosya başına, embed/write batch başına; karışık batch'lerde file_type=mixed)",
+    ["stage", "file_type"],
+)
+INGEST_CHUNKS = Counter("rag_ingest_chunks_total", "Depoya yazılan chunk sayısı", ["file_type"])
+INGEST_FILES = Counter("rag_ingest_files_total", "İşlenen dosya sayısı", ["file_type", "result"])
+LLM_TOKENS = Counter("rag_llm_tokens_total", "Ollama'nın işlediği token sayısı", ["kind"])
+# Dosya izleyicisi: değişikliğin ilk görüldüğü andan depoya yazılmasına kadar geçen süre (dosya başına)
+WATCH_FRESHNESS_SECONDS = Histogram(
+    "rag_watch_freshness_seconds", "data/ değişikliğinin fark edilmesinden depoya işlenmesine kadar geçen süre",
+)
+HTTP_IN_FLIGHT = Gauge("rag_http_requests_in_flight", "Sürmekte olan HTTP istekleri")
+HTTP_REQUEST_SECONDS = Histogram(
+    "rag_http_request_seconds", "HTTP istek süresi", ["method", "route", "status"],
+)
+
+
+def file_type(path: str) -> str:
+    """Metrik etiketi olarak dosya uzantısı (noktasız, küçük harf)."""
+    extension = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    return extension or "none"
+
+
+def observe_llm(metrics: dict):
+    """Ollama'nın bildirdiği prefill/üretim sürelerini ve token sayılarını kaydeder (bkz. ollama_metrics)."""
+    for stage, key in (("prefill", "prefill_ms"), ("generation", "generation_ms")):
+        if metrics.get(key) is not None:
+            QUERY_STAGE_SECONDS.labels(stage).observe(metrics[key] / 1000)
+    for kind, key in (("prompt", "prompt_tokens"), ("completion", "completion_tokens")):
+        if metrics.get(key):
+            LLM_TOKENS.labels(kind).inc(metrics[key])
@@ -0,0 +1,107 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_question(question: str) -> str:
+    """
+    Soruyu önbellek anahtarı olarak kullanmak için normalize eder:
+    baştaki/sondaki boşluklar ve tekrar eden boşluklar atılır, Türkçe kurallarıyla küçük harfe çevrilir
+    (I -> ı, İ -> i), sondaki noktalama işaretleri yok sayılır.
+    """
+    text = question.replace("I", "ı").replace("İ", "i").lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?!.… ")
+
+
+def approx_size(value) -> int:
+    """Önbellekteki bir değerin yaklaşık bellek kullanımı (byte)."""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    En fazla max_entries kayıt tutan, en uzun süredir kullanılmayanı atan basit önbellek.
+    Arka plandaki reload thread'i de clear() çağırabildiği için işlemler kilitle korunur.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        size = approx_size(key) + approx_size(value)
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries:
+                _, (_, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "memory_bytes": self._bytes,
+        }
+
+
+class TTLCache(LRUCache):
+    """LRUCache'e ek olarak her kaydı ttl_seconds sonra geçersiz sayan önbellek."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        super().__init__(max_entries)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key):
+        with self._lock:
+            item = super().get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if time.monotonic() >= expires_at:
+                # Süresi dolmuş kayıt: sil ve miss olarak say
+                self._bytes -= self._data.pop(key)[1]
+                self.hits -= 1
+                self.misses += 1
+                return None
+            return value
+
+    def put(self, key, value):
+        super().put(key, (time.monotonic() + self.ttl_seconds, value))
+
+    def stats(self):
+        return {**super().stats(), "ttl_seconds": self.ttl_seconds}
@@ -0,0 +1,106 @@
+import threading
+import time
+import traceback
+import uuid
+
+
+class ReloadJob:
+    """Arka planda çalışan tek bir reload işinin durumu ve ilerlemesi."""
+
+    def __init__(self, kind: str = "reload"):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind    # "reload" (tam senkronizasyon) veya "watch" (dosya izleyicisinin batch'i)
+        self.status = "queued"  # queued -> running -> succeeded | failed
+        self.phase = None
+        self.files_done = 0
+        self.files_total = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def set_phase(self, phase: str):
+        self.phase = phase
+
+    def set_progress(self, done: int, total: int):
+        self.files_done = done
+        self.files_total = total
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "progress": {"files_done": self.files_done, "files_total": self.files_total},
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ReloadJobManager:
+    """
+    Reload işlerini ayrı bir thread'de çalıştırır. Aynı anda tek iş çalışır: iş sürerken gelen
+    yeni istekler çalışan işe bağlanır (aynı job_id döner). Son max_history iş sorgulanabilir kalır.
+    """
+
+    def __init__(self, max_history: int = 20):
+        self.max_history = max_history
+        self._jobs = {}
+        self._active = None
+        self._lock = threading.Lock()
+
+    def submit(self, target, kind: str = "reload"):
+        """
+        target(job) fonksiyonunu arka planda çalıştırır; dönüş değeri job.result olur.
+        (job, yeni_mi) döndürür; bir iş zaten çalışıyorsa o iş ve False döner.
+        """
+        with self._lock:
+            if self._active is not None and not self._active.finished:
+                return self._active, False
+            job = ReloadJob(kind)
+            self._jobs[job.id] = job
+            self._active = job
+            while len(self._jobs) > self.max_history:
+                del self._jobs[next(iter(self._jobs))]
+
+        thread = threading.Thread(target=self._run, args=(job, target), name=f"reload-{job.id}", daemon=True)
+        thread.start()
+        return job, True
+
+    def _run(self, job: ReloadJob, target):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = target(job)
+            job.status = "succeeded"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = {"type": type(e).__name__, "message": str(e)}
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            job._done.set()
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    @property
+    def active(self):
+        """Şu an çalışan iş (yoksa None)."""
+        job = self._active
+        return job if job is not None and not job.finished else None
@@ -0,0 +1,148 @@
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+_GENERATION_RE = re.compile(rf"^{GENERATION_PREFIX}(\d+)$")
+
+
+class GenerationStore:
+    """
+    Vektör deposunun sürümlü (blue/green) dizinlerini yönetir:
+
+        chroma_db/
+            CURRENT          -> "gen-000003" (aktif sürümün adı)
+            gen-000002/      eski sürüm (temizlenmeyi bekliyor)
+            gen-000003/      canlı sürüm (Chroma dosyaları + manifest.json)
+
+    Reload canlı dizine hiç dokunmaz: aktif sürüm yeni bir dizine kopyalanır, senkronizasyon
+    kopya üzerinde yapılır ve bitince CURRENT atomik olarak yeni sürüme çevrilir.
+    """
+
+    def __init__(self, root: str):
+        # Dizin ilk kullanımda oluşturulur, böylece nesneyi oluşturmak diske dokunmaz
+        self.root = root
+        self._ready = False
+
+    def _ensure_root(self):
+        if not self._ready:
+            os.makedirs(self.root, exist_ok=True)
+            self._migrate_legacy_layout()
+            self._ready = True
+
+    @property
+    def _current_file(self):
+        return os.path.join(self.root, CURRENT_FILE)
+
+    def _migrate_legacy_layout(self):
+        """Sürümsüz eski kurulumda chroma_db/ içindeki dosyaları ilk sürüm dizinine taşır."""
+        if os.path.exists(self._current_file):
+            return
+        legacy = [name for name in os.listdir(self.root) if not _GENERATION_RE.match(name)]
+        if not legacy:
+            return
+        path = self._path(self._next_number())
+        os.makedirs(path)
+        for name in legacy:
+            os.replace(os.path.join(self.root, name), os.path.join(path, name))
+        self.promote(path)
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.root, f"{GENERATION_PREFIX}{number:06d}")
+
+    def _next_number(self) -> int:
+        numbers = [int(m.group(1)) for m in map(_GENERATION_RE.match, os.listdir(self.root)) if m]
+        return max(numbers, default=0) + 1
+
+    def generations(self):
+        """Diskteki tüm sürüm dizinlerinin yollarını eskiden yeniye döndürür."""
+        self._ensure_root()
+        names = sorted(name for name in os.listdir(self.root) if _GENERATION_RE.match(name))
+        return [os.path.join(self.root, name) for name in names]
+
+    def current(self) -> str:
+        """Aktif sürümün dizini; hiç sürüm yoksa boş bir ilk sürüm oluşturulur."""
+        self._ensure_root()
+        if os.path.exists(self._current_file):
+            with open(self._current_file, "r", encoding="utf-8") as f:
+                path = os.path.join(self.root, f.read().strip())
+            if os.path.isdir(path):
+                return path
+        path = self.create()
+        self.promote(path)
+        return path
+
+    def create(self, copy_from: str = None) -> str:
+        """Yeni bir sürüm dizini açar; copy_from verilirse o sürümün kopyasıyla başlar."""
+        self._ensure_root()
+        path = self._path(self._next_number())
+        if copy_from:
+            shutil.copytree(copy_from, path)
+        else:
+            os.makedirs(path)
+        return path
+
+    def promote(self, path: str):
+        """CURRENT'ı path'e çevirir (geçici dosya + os.replace ile atomik)."""
+        tmp_path = self._current_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(path))
+        os.replace(tmp_path, self._current_file)
+
+    def remove(self, path: str):
+        """Aktif olmayan bir sürüm dizinini siler."""
+        if os.path.abspath(path) == os.path.abspath(self.current()):
+            raise ValueError(f"Aktif sürüm silinemez: {path}")
+        shutil.rmtree(path, ignore_errors=True)
+
+    def gc(self):
+        """Aktif sürüm dışındaki tüm sürüm dizinlerini (ör. yarıda kalmış reload'lar) siler."""
+        current = os.path.abspath(self.current())
+        removed = []
+        for path in self.generations():
+            if os.path.abspath(path) != current:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(os.path.basename(path))
+        return removed
+
+
+class StoreLeases:
+    """
+    Depo nesnesi (VectorStoreManager) başına süren okuma sayacı. Reload bir sürümü devreden çıkardığında
+    eski depo, onu almış istekler (ör. dakikalarca süren bir /ask/batch akışı) bırakana kadar kapatılmaz;
+    bkz. main.schedule_generation_cleanup.
+    """
+
+    def __init__(self):
+        self._readers = {}
+        self._changed = threading.Condition()
+
+    @contextmanager
+    def hold(self, store):
+        """Blok süresince store'u kullanımda sayar; store None ise bir şey yapmaz."""
+        if store is None:
+            yield store
+            return
+        key = id(store)
+        with self._changed:
+            self._readers[key] = self._readers.get(key, 0) + 1
+        try:
+            yield store
+        finally:
+            with self._changed:
+                self._readers[key] -= 1
+                if not self._readers[key]:
+                    del self._readers[key]
+                    self._changed.notify_all()
+
+    def readers(self, store) -> int:
+        with self._changed:
+            return self._readers.get(id(store), 0)
+
+    def wait_idle(self, store, timeout: float = None) -> bool:
+        """store'u tutan okuma kalmayana kadar bekler; timeout dolarsa False döner."""
+        with self._changed:
+            return self._changed.wait_for(lambda: id(store) not in self._readers, timeout)
@@ -0,0 +1,695 @@
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+from langchain_core.documents import Document
+
+BACKENDS = ("chroma", "numpy")
+QUANTIZATIONS = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+INDEX_TYPES = ("auto", "flat", "ivf")
+
+
+class VectorBackend:
+    """
+    VectorStoreManager'ın kullandığı depolama arayüzü. get() sonuçları Chroma'nın
+    {"ids": [...], "documents": [...], "metadatas": [...]} biçimindedir; where ifadeleri de
+    Chroma sözdizimindedir ({"alan": değer}, {"$and": [...]}, {"alan": {"$gte": 3}} ...).
+    """
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def update_metadata(self, ids, metadatas):
+        """Var olan kayıtların metadata'sını değiştirir; vektörler ve metinler olduğu gibi kalır."""
+        raise NotImplementedError
+
+    def query(self, vectors, k: int, where: dict = None, ids=None, with_distances: bool = False):
+        """
+        Her sorgu vektörü için en yakın k kaydı Document listesi olarak döndürür (L2 uzaklığı).
+        ids verilirse arama sadece bu ID'li kayıtlar arasında yapılır. with_distances=True ise
+        listeler (Document, uzaklık²) çiftlerinden oluşur (farklı sorguların sonuçlarını birleştirmek için).
+        """
+        raise NotImplementedError
+
+    def get(self, ids=None, where: dict = None, limit: int = None, offset: int = 0,
+            include=("documents", "metadatas")):
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def reset(self):
+        """Bütün kayıtları siler ve vektör boyutunu unutur (embedding modeli değiştiğinde)."""
+        raise NotImplementedError
+
+    def wait_for_index(self, timeout: float = None) -> bool:
+        """Arka planda süren bir indeks eğitimi varsa bitmesini bekler; timeout dolarsa False döner."""
+        return True
+
+    def persist(self):
+        """Bellekteki değişiklikleri diske yazar (gerekmiyorsa bir şey yapmaz)."""
+
+    def close(self):
+        """Dosya/bağlantı kaynaklarını bırakır; dizin silinmeden önce çağrılmalı."""
+
+    def memory_bytes(self) -> int:
+        """Açıkken bellekte tutulan indekslerin yaklaşık boyutu (memmap'li, diskten sayfalanan veriler hariç)."""
+        return 0
+
+    def stats(self):
+        return {"backend": type(self).__name__}
+
+
+class ChromaBackend(VectorBackend):
+    """langchain_community Chroma koleksiyonu üzerinde çalışan varsayılan arka uç."""
+
+    def __init__(self, persist_directory: str, embedding_function=None):
+        from langchain_community.vectorstores import Chroma
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        self.db = Chroma(persist_directory=persist_directory, embedding_function=embedding_function)
+
+    @property
+    def max_batch_size(self) -> int:
+        return self.db._client.get_max_batch_size()
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        # Chroma tek çağrıda sınırlı sayıda kayıt kabul eder, en büyük batch boyutunda parçala
+        batch_size = self.max_batch_size
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.db._collection.upsert(
+                ids=ids[start:end],
+                embeddings=vectors[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+            )
+
+    def delete(self, ids):
+        batch_size = self.max_batch_size
+        for start in range(0, len(ids), batch_size):
+            self.db.delete(ids=ids[start:start + batch_size])
+
+    def update_metadata(self, ids, metadatas):
+        batch_size = self.max_batch_size
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.db._collection.update(ids=ids[start:end], metadatas=metadatas[start:end])
+
+    def query(self, vectors, k: int, where: dict = None, ids=None, with_distances: bool = False):
+        results = self.db._collection.query(
+            query_embeddings=list(vectors), ids=list(ids) if ids is not None else None, n_results=k, where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        found = []
+        for ids, documents, metadatas, distances in zip(
+            results["ids"], results["documents"], results["metadatas"], results["distances"]
+        ):
+            docs = [
+                Document(id=doc_id, page_content=text, metadata=metadata or {})
+                for doc_id, text, metadata in zip(ids, documents, metadatas)
+            ]
+            found.append(list(zip(docs, distances)) if with_distances else docs)
+        return found
+
+    def get(self, ids=None, where: dict = None, limit: int = None, offset: int = 0,
+            include=("documents", "metadatas")):
+        return self.db._collection.get(
+            ids=list(ids) if ids is not None else None, where=where,
+            limit=limit, offset=offset or None, include=list(include)
+        )
+
+    def count(self) -> int:
+        return self.db._collection.count()
+
+    def memory_bytes(self) -> int:
+        # Chroma her koleksiyon segmentinin HNSW indeksini (alt dizinlerdeki .bin dosyaları) belleğe yükler
+        total = 0
+        for entry in os.scandir(self.persist_directory):
+            if entry.is_dir():
+                total += sum(f.stat().st_size for f in os.scandir(entry.path) if f.name.endswith(".bin"))
+        return total
+
+    def reset(self):
+        # Chroma koleksiyonun boyutunu ilk kayıtta sabitler; kayıtları silmek yetmez, koleksiyon yeniden kurulur
+        from langchain_community.vectorstores import Chroma
+        self.db.delete_collection()
+        self.db = Chroma(persist_directory=self.persist_directory, embedding_function=self.embedding_function)
+
+    def close(self):
+        from chromadb.api.shared_system_client import SharedSystemClient
+        system = SharedSystemClient._identifier_to_system.pop(self.db._client._identifier, None)
+        if system is not None:
+            system.stop()
+
+
+_SQL_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def where_to_sql(where: dict):
+    """Chroma where ifadesini SQLite json_extract koşuluna çevirir: (sql, parametreler)."""
+    if not where:
+        return "1", []
+    clauses, params = [], []
+    for key, value in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_to_sql(item) for item in value]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+            for _, part_params in parts:
+                params.extend(part_params)
+            continue
+        if not str(key).replace("_", "").replace("-", "").isalnum():
+            raise ValueError(f"Geçersiz metadata alanı: {key}")
+        column = f"json_extract(metadata, '$.\"{key}\"')"
+        condition = value if isinstance(value, dict) else {"$eq": value}
+        for op, operand in condition.items():
+            if op in ("$in", "$nin"):
+                placeholders = ",".join("?" * len(operand)) or "NULL"
+                clauses.append(f"{column} {'IN' if op == '$in' else 'NOT IN'} ({placeholders})")
+                params.extend(operand)
+            elif op in _SQL_OPERATORS:
+                clauses.append(f"{column} {_SQL_OPERATORS[op]} ?")
+                params.append(operand)
+            else:
+                raise ValueError(f"Desteklenmeyen where operatörü: {op}")
+    return " AND ".join(clauses), params
+
+
+_PY_OPERATORS = {
+    "$eq": lambda a, b: a == b, "$ne": lambda a, b: a != b, "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b, "$lt": lambda a, b: a < b, "$lte": lambda a, b: a <= b,
+    "$in": lambda a, b: a in b, "$nin": lambda a, b: a not in b,
+}
+
+
+def matches_where(where: dict, metadata: dict) -> bool:
+    """Chroma where ifadesini tek bir metadata sözlüğü üzerinde değerlendirir (where_to_sql'in Python hali)."""
+    for key, value in (where or {}).items():
+        if key in ("$and", "$or"):
+            results = (matches_where(item, metadata) for item in value)
+            if not (all(results) if key == "$and" else any(results)):
+                return False
+            continue
+        actual = metadata.get(key)
+        condition = value if isinstance(value, dict) else {"$eq": value}
+        for op, operand in condition.items():
+            if op not in _PY_OPERATORS:
+                raise ValueError(f"Desteklenmeyen where operatörü: {op}")
+            # SQL'deki gibi alanı olmayan kayıt hiçbir koşula uymaz
+            try:
+                if actual is None or not _PY_OPERATORS[op](actual, operand):
+                    return False
+            except TypeError:
+                return False
+    return True
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Harici servis gerektirmeyen yerel vektör motoru:
+    - vektörler persist dizininde bellek eşlemeli (memmap) bir dosyada satır satır tutulur
+      (float32, ya da bellek için float16 / satır ölçekli int8 olarak nicemlenmiş),
+    - metin ve metadata SQLite'ta saklanır, where filtreleri json_extract ile SQL'e çevrilir,
+    - arama küçük koleksiyonlarda bloklar halinde matris çarpımıyla tam (brute-force) top-k,
+      büyüklerde (index="ivf" veya "auto" ile ivf_min_vectors üstünde) IVF kümeleriyle yapılır.
+      IVF merkezleri yazma tarafında, vektör sayısı son eğitimdekinin iki katını aşınca arka plan
+      thread'inde yeniden eğitilir; eğitim sürerken aramalar eski merkezlerle (yoksa tam aramayla) yapılır.
+    Açılışta sadece dolu satırların listesi okunur; vektörler ihtiyaç oldukça diskten sayfalanır.
+    """
+
+    INFO_FILE = "numpy_store.json"
+    VECTORS_FILE = "vectors.bin"
+    NORMS_FILE = "norms.bin"
+    SCALES_FILE = "scales.bin"
+    IVF_FILE = "ivf.npz"
+    RECORDS_FILE = "records.sqlite"
+    BLOCK_ROWS = 32768
+
+    def __init__(self, persist_directory: str, quantization: str = "float32", index: str = "auto",
+                 ivf_min_vectors: int = 50_000, nprobe: int = 8):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Bilinmeyen nicemleme: {quantization} ({', '.join(QUANTIZATIONS)})")
+        if index not in INDEX_TYPES:
+            raise ValueError(f"Bilinmeyen indeks tipi: {index} ({', '.join(INDEX_TYPES)})")
+        self.persist_directory = persist_directory
+        self.index = index
+        self.ivf_min_vectors = ivf_min_vectors
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        os.makedirs(persist_directory, exist_ok=True)
+
+        info = self._read_info()
+        # Var olan bir deponun nicemleme tipi dosya biçimini belirler, ayar sadece yeni depolarda geçerli
+        self.quantization = info.get("quantization", quantization)
+        self.dim = info.get("dim")
+        self.capacity = info.get("capacity", 0)
+        self._dtype = np.dtype(QUANTIZATIONS[self.quantization])
+
+        self._conn = sqlite3.connect(self._path(self.RECORDS_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "row INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, document TEXT, metadata TEXT)"
+        )
+        self._conn.commit()
+
+        self._alive = np.zeros(self.capacity, dtype=bool)
+        rows = np.fromiter((r for (r,) in self._conn.execute("SELECT row FROM records")), dtype=np.int64)
+        self._alive[rows] = True
+        self._open_arrays()
+
+        self._centroids = None
+        self._assign = None
+        self._ivf_trained_count = 0
+        self._ivf_lists = None
+        self._training = None           # arka planda IVF eğiten thread
+        self._written_during_training = None  # eğitim sürerken yazılan satırlar (yeni merkezlere atanacak)
+        if os.path.exists(self._path(self.IVF_FILE)):
+            data = np.load(self._path(self.IVF_FILE))
+            self._centroids = data["centroids"]
+            self._assign = np.full(self.capacity, -1, dtype=np.int32)
+            self._assign[:len(data["assign"])] = data["assign"][:self.capacity]
+            self._ivf_trained_count = int(data["trained_count"])
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, name)
+
+    def _read_info(self):
+        path = self._path(self.INFO_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_info(self):
+        tmp_path = self._path(self.INFO_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "capacity": self.capacity, "quantization": self.quantization}, f)
+        os.replace(tmp_path, self._path(self.INFO_FILE))
+
+    def _memmap(self, name: str, dtype, shape):
+        path = self._path(name)
+        needed = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not os.path.exists(path) or os.path.getsize(path) < needed:
+            with open(path, "ab") as f:
+                f.truncate(needed)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_arrays(self):
+        if not self.capacity:
+            self._vectors = self._norms = self._scales = None
+            return
+        self._vectors = self._memmap(self.VECTORS_FILE, self._dtype, (self.capacity, self.dim))
+        self._norms = self._memmap(self.NORMS_FILE, np.float32, (self.capacity,))
+        self._scales = (
+            self._memmap(self.SCALES_FILE, np.float32, (self.capacity,)) if self.quantization == "int8" else None
+        )
+
+    def _grow(self, needed: int):
+        """Kapasiteyi ikiye katlayarak dosyaları büyütür (mevcut satırlar yerinde kalır)."""
+        capacity = max(1024, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        for array in (self._vectors, self._norms, self._scales):
+            if array is not None:
+                array.flush()
+        self.capacity = capacity
+        self._open_arrays()
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        if self._assign is not None:
+            self._assign = np.concatenate([self._assign, np.full(capacity - len(self._assign), -1, np.int32)])
+        self._write_info()
+
+    def _encode(self, vectors: np.ndarray, rows: np.ndarray):
+        """Vektörleri seçilen nicemlemeyle yazar; uzaklık hesabı için çözülmüş vektörün normunu saklar."""
+        if self.quantization == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            self._vectors[rows] = codes
+            self._scales[rows] = scales
+            decoded = codes.astype(np.float32) * scales[:, None]
+        else:
+            self._vectors[rows] = vectors.astype(self._dtype)
+            decoded = self._vectors[rows].astype(np.float32)
+        self._norms[rows] = np.einsum("ij,ij->i", decoded, decoded)
+
+    def _decode(self, rows):
+        block = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self._scales is not None:
+            block *= self._scales[rows][:, None]
+        return block
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(set(ids)) != len(ids):
+            # Aynı ID batch içinde birden fazla geçiyorsa (Chroma'daki gibi) sonuncusu geçerli olur
+            keep = sorted({doc_id: i for i, doc_id in enumerate(ids)}.values())
+            ids = [ids[i] for i in keep]
+            texts = [texts[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            vectors = vectors[keep]
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vektör boyutu {vectors.shape[1]}, depo boyutu {self.dim}")
+
+            existing = self._rows_for_ids(ids)
+            free = np.flatnonzero(~self._alive)
+            new_count = sum(1 for doc_id in ids if doc_id not in existing)
+            if new_count > len(free):
+                self._grow(int(self._alive.sum()) + new_count)
+                free = np.flatnonzero(~self._alive)
+            free_iter = iter(free.tolist())
+            rows = np.array([existing[doc_id] if doc_id in existing else next(free_iter) for doc_id in ids])
+
+            self._encode(vectors, rows)
+            self._alive[rows] = True
+            if self._centroids is not None:
+                self._assign[rows] = self._nearest_centroids(self._decode(rows), 1)[:, 0]
+                self._ivf_lists = None
+            if self._written_during_training is not None:
+                self._written_during_training.update(rows.tolist())
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (int(row), doc_id, text, json.dumps(metadata, ensure_ascii=False) if metadata else None)
+                    for row, doc_id, text, metadata in zip(rows, ids, texts, metadatas)
+                ],
+            )
+            self._conn.commit()
+            if self.dim is not None and not os.path.exists(self._path(self.INFO_FILE)):
+                self._write_info()
+        self._schedule_training()
+
+    def _rows_for_ids(self, ids):
+        found = {}
+        ids = list(ids)
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for row, doc_id in self._conn.execute(
+                f"SELECT row, id FROM records WHERE id IN ({placeholders})", batch
+            ):
+                found[doc_id] = row
+        return found
+
+    def delete(self, ids):
+        with self._lock:
+            rows = list(self._rows_for_ids(ids).values())
+            if not rows:
+                return
+            self._alive[rows] = False
+            self._conn.executemany("DELETE FROM records WHERE row = ?", [(row,) for row in rows])
+            self._conn.commit()
+
+    def update_metadata(self, ids, metadatas):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE records SET metadata = ? WHERE id = ?",
+                [
+                    (json.dumps(metadata, ensure_ascii=False) if metadata else None, doc_id)
+                    for doc_id, metadata in zip(ids, metadatas)
+                ],
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        return int(self._alive.sum())
+
+    def memory_bytes(self) -> int:
+        # Vektörler memmap'li olduğundan sayılmaz; dolu satır listesi, IVF atamaları ve merkezleri bellekte
+        total = self._alive.nbytes
+        for array in (self._assign, self._centroids):
+            if array is not None:
+                total += array.nbytes
+        return total
+
+    def reset(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM records")
+            self._conn.commit()
+            self._vectors = self._norms = self._scales = None
+            for name in (self.INFO_FILE, self.VECTORS_FILE, self.NORMS_FILE, self.SCALES_FILE, self.IVF_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self.dim = None
+            self.capacity = 0
+            self._alive = np.zeros(0, dtype=bool)
+            self._centroids = self._assign = self._ivf_lists = None
+            self._ivf_trained_count = 0
+            # Süren bir eğitimin sonucu artık geçersiz: devreye alınmaz (bkz. train_ivf)
+            self._written_during_training = None
+
+    def _filtered_rows(self, where: dict):
+        sql, params = where_to_sql(where)
+        with self._lock:
+            rows = [r for (r,) in self._conn.execute(f"SELECT row FROM records WHERE {sql}", params)]
+        return np.array(rows, dtype=np.int64)
+
+    def _nearest_centroids(self, vectors: np.ndarray, n: int, centroids: np.ndarray = None):
+        centroids = self._centroids if centroids is None else centroids
+        distances = np.einsum("ij,ij->i", centroids, centroids)[None, :] - 2 * vectors @ centroids.T
+        n = min(n, len(centroids))
+        return np.argpartition(distances, n - 1, axis=1)[:, :n]
+
+    def _use_ivf(self) -> bool:
+        if self.index == "flat":
+            return False
+        if self.index == "ivf":
+            return True
+        return self.count() >= self.ivf_min_vectors
+
+    def _index_stale(self) -> bool:
+        """IVF gerekiyor ama merkezler yok ya da son eğitimden beri vektör sayısı iki katını aştı."""
+        count = self.count()
+        return bool(count) and self._use_ivf() and (self._centroids is None or count > 2 * self._ivf_trained_count)
+
+    def _schedule_training(self):
+        """Gerekiyorsa IVF eğitimini arka plan thread'inde başlatır; süren bir eğitim varsa bir şey yapmaz."""
+        with self._lock:
+            if self._training is not None or not self._index_stale():
+                return
+            self._training = threading.Thread(target=self._train_in_background, daemon=True)
+            self._training.start()
+
+    def _train_in_background(self):
+        try:
+            self.train_ivf()
+        except Exception as e:
+            print(f"--- IVF eğitimi başarısız, aramalar mevcut indeksle sürüyor: {e} ---")
+            with self._lock:
+                self._training = None
+            return
+        with self._lock:
+            self._training = None
+        # Eğitim sürerken vektör sayısı yeniden ikiye katlandıysa bir tur daha
+        self._schedule_training()
+
+    def wait_for_index(self, timeout: float = None) -> bool:
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+            return not training.is_alive()
+        return True
+
+    def _top_k(self, queries: np.ndarray, candidates: np.ndarray, k: int):
+        """candidates satırları arasından her sorgu için en yakın k satırı (satır, uzaklık²) olarak bulur."""
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_dist = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(candidates), self.BLOCK_ROWS):
+            rows = candidates[start:start + self.BLOCK_ROWS]
+            if self.quantization == "int8":
+                dots = (np.asarray(self._vectors[rows], dtype=np.float32) @ queries.T) * self._scales[rows][:, None]
+            else:
+                dots = np.asarray(self._vectors[rows], dtype=np.float32) @ queries.T
+            distances = (self._norms[rows][:, None] - 2 * dots).T + query_norms[:, None]
+            best_rows = np.concatenate([best_rows, np.broadcast_to(rows, distances.shape)], axis=1)
+            best_dist = np.concatenate([best_dist, distances.astype(np.float32)], axis=1)
+            if best_dist.shape[1] > k:
+                keep = np.argpartition(best_dist, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_dist = np.take_along_axis(best_dist, keep, axis=1)
+        order = np.argsort(best_dist, axis=1)
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_dist, order, axis=1)
+
+    def _ivf_candidates(self, query: np.ndarray, allowed: np.ndarray):
+        if self._ivf_lists is None:
+            alive_rows = np.flatnonzero(self._alive)
+            assign = self._assign[alive_rows]
+            order = np.argsort(assign, kind="stable")
+            bounds = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+            self._ivf_lists = (alive_rows[order], bounds)
+        rows, bounds = self._ivf_lists
+        lists = self._nearest_centroids(query[None, :], self.nprobe)[0]
+        candidates = np.concatenate([rows[bounds[c]:bounds[c + 1]] for c in lists])
+        return candidates[self._alive[candidates] & allowed[candidates]]
+
+    def query(self, vectors, k: int, where: dict = None, ids=None, with_distances: bool = False):
+        queries = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if not self.count() or k <= 0:
+                return [[] for _ in queries]
+            allowed = self._alive.copy()
+            if where:
+                mask = np.zeros_like(allowed)
+                mask[self._filtered_rows(where)] = True
+                allowed &= mask
+            if ids is not None:
+                mask = np.zeros_like(allowed)
+                mask[list(self._rows_for_ids(ids).values())] = True
+                allowed &= mask
+            k = min(k, int(allowed.sum()))
+            if not k:
+                return [[] for _ in queries]
+
+            if self._index_stale():
+                self._schedule_training()
+            if self._use_ivf() and self._centroids is not None:
+                results = []
+                for query in queries:
+                    candidates = self._ivf_candidates(query, allowed)
+                    if len(candidates) < k:
+                        candidates = np.flatnonzero(allowed)
+                    rows, distances = self._top_k(query[None, :], candidates, min(k, len(candidates)))
+                    results.append((rows[0], distances[0]))
+            else:
+                rows, distances = self._top_k(queries, np.flatnonzero(allowed), k)
+                results = list(zip(rows, distances))
+            return [self._documents_for_rows(r, d if with_distances else None) for r, d in results]
+
+    def _documents_for_rows(self, rows, distances=None):
+        rows = [int(r) for r in rows]
+        if not rows:
+            return []
+        placeholders = ",".join("?" * len(rows))
+        found = {
+            row: Document(id=doc_id, page_content=text or "", metadata=json.loads(metadata) if metadata else {})
+            for row, doc_id, text, metadata in self._conn.execute(
+                f"SELECT row, id, document, metadata FROM records WHERE row IN ({placeholders})", rows
+            )
+        }
+        if distances is not None:
+            return [(found[row], float(d)) for row, d in zip(rows, distances) if row in found]
+        return [found[row] for row in rows if row in found]
+
+    def train_ivf(self, iterations: int = 10, sample_size: int = 50_000, seed: int = 0):
+        """
+        Canlı vektörlerden k-means ile ~√N küme merkezi öğrenir ve her satırı en yakın kümeye atar.
+        k-means ve atamalar kilit dışında yapılır (vektörler bloklar halinde kilitle okunur); bu sürede
+        arama ve yazmalar eski merkezlerle sürer. Yeni merkezler bitince tek adımda devreye alınır,
+        eğitim sırasında yazılan satırlar o an yeni merkezlere atanır.
+        """
+        with self._lock:
+            alive_rows = np.flatnonzero(self._alive)
+            if not len(alive_rows):
+                return
+            rng = np.random.default_rng(seed)
+            n_lists = int(np.clip(np.sqrt(len(alive_rows)), 1, 4096))
+            # Eğitim örneği en fazla ~256 MB float32 olacak şekilde sınırlanır (büyük boyutlu embedding'ler)
+            sample_size = min(sample_size, len(alive_rows), max(n_lists, (256 << 20) // (4 * self.dim)))
+            sample = rng.choice(alive_rows, size=sample_size, replace=False)
+            data = self._decode(np.sort(sample))
+            written = self._written_during_training = set()
+
+        centroids = data[rng.choice(len(data), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._nearest_centroids(data, 1, centroids)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            counts = np.bincount(labels, minlength=n_lists)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled][:, None]
+        labels = np.empty(len(alive_rows), dtype=np.int32)
+        for start in range(0, len(alive_rows), self.BLOCK_ROWS):
+            rows = alive_rows[start:start + self.BLOCK_ROWS]
+            with self._lock:
+                if self._written_during_training is not written:
+                    return
+                block = self._decode(rows)
+            labels[start:start + len(rows)] = self._nearest_centroids(block, 1, centroids)[:, 0]
+
+        with self._lock:
+            if self._written_during_training is not written:
+                # Eğitim sürerken depo sıfırlandı
+                return
+            assign = np.full(self.capacity, -1, dtype=np.int32)
+            assign[alive_rows] = labels
+            if written:
+                rows = np.fromiter(written, dtype=np.int64, count=len(written))
+                assign[rows] = self._nearest_centroids(self._decode(rows), 1, centroids)[:, 0]
+            self._centroids = centroids
+            self._assign = assign
+            self._ivf_trained_count = len(alive_rows)
+            self._ivf_lists = None
+            self._written_during_training = None
+
+    def get(self, ids=None, where: dict = None, limit: int = None, offset: int = 0,
+            include=("documents", "metadatas")):
+        sql, params = where_to_sql(where)
+        if ids is not None:
+            ids = list(ids)
+            sql += f" AND id IN ({','.join('?' * len(ids)) or 'NULL'})"
+            params = params + ids
+        query = f"SELECT id, document, metadata FROM records WHERE {sql} ORDER BY row LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + [limit if limit is not None else -1, offset or 0]).fetchall()
+        result = {"ids": [doc_id for doc_id, _, _ in rows]}
+        if "documents" in include:
+            result["documents"] = [text for _, text, _ in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(metadata) if metadata else None for _, _, metadata in rows]
+        return result
+
+    def persist(self):
+        with self._lock:
+            for array in (self._vectors, self._norms, self._scales):
+                if array is not None:
+                    array.flush()
+            if self._centroids is not None:
+                tmp_path = self._path("ivf.tmp.npz")
+                np.savez(tmp_path, centroids=self._centroids, assign=self._assign,
+                         trained_count=self._ivf_trained_count)
+                os.replace(tmp_path, self._path(self.IVF_FILE))
+            if self.dim is not None:
+                self._write_info()
+
+    def close(self):
+        self.wait_for_index()
+        with self._lock:
+            self.persist()
+            self._vectors = self._norms = self._scales = None
+            self._conn.close()
+
+    def stats(self):
+        vector_bytes = self.capacity * (self.dim or 0) * self._dtype.itemsize
+        return {
+            "backend": "numpy",
+            "quantization": self.quantization,
+            "index": "ivf" if self._use_ivf() else "flat",
+            "ivf_lists": len(self._centroids) if self._centroids is not None else 0,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "vector_bytes": vector_bytes,
+        }
+
+
+def create_backend(name: str, persist_directory: str, embedding_function=None, **options) -> VectorBackend:
+    """Yapılandırmadaki isme göre arka ucu oluşturur ("chroma" veya "numpy")."""
+    if name == "chroma":
+        return ChromaBackend(persist_directory, embedding_function=embedding_function)
+    if name == "numpy":
+        return NumpyBackend(persist_directory, **options)
+    raise ValueError(f"Bilinmeyen vektör arka ucu: {name} ({', '.join(BACKENDS)})")
@@ -1,98 +1,564 @@
-from langchain_community.vectorstores import Chroma
-from langchain_ollama import OllamaEmbeddings
+import itertools
+import json
+import os
+import uuid
+from collections import Counter
+from langchain_core.documents import Document
+from src.embedding_cache import CachedEmbeddings
+from src.embedding_pipeline import OllamaBatchEmbeddings, IngestionStats, timed
+from src.lexical_index import LexicalIndex, is_keyword_query, reciprocal_rank_fusion
+from src.dedup import DedupIndex
+from src.vector_backends import create_backend, matches_where
+from src.metrics import INGEST_CHUNKS, INGEST_STAGE_SECONDS, file_type
+
+LEXICAL_INDEX_FILE = "lexical_index.pkl"
+DEDUP_INDEX_FILE = "dedup_index.pkl"
+# Deponun hangi embedding modeliyle (sağlayıcı, model adı, vektör boyutu) kurulduğu
+STORE_INFO_FILE = "store_info.json"
+# store_info.json'dan önceki depolar sabit olarak Ollama'daki llama3.2 ile embed edilmişti
+LEGACY_EMBEDDING = {"provider": "ollama", "model": "llama3.2"}
+SEARCH_MODES = ("hybrid", "dense", "lexical")
+# BM25 ve tekrar indeksleri bellekte Python nesneleri olarak tutulur; bellek kullanımları pickle
+# dosyalarının yaklaşık bu katı kadardır
+INDEX_MEMORY_FACTOR = 4
+# Hibrit aramada RRF'e giren vektör ve BM25 aday sayısı (her biri için)
+HYBRID_CANDIDATES = 20
+# Tekrar chunk'larının kaynaklarına göre çözülen filtrelerden kaç tanesinin sonucu önbellekte tutulur
+SHARED_FILTER_CACHE_SIZE = 64
+
+def embedding_identity(embeddings) -> dict:
+    """Embedding modelini depoda kaydetmek ve karşılaştırmak için {"provider", "model"}."""
+    name = type(embeddings).__name__
+    return {"provider": getattr(embeddings, "provider", name), "model": getattr(embeddings, "model", name)}
+
 
 class VectorStoreManager:
     """Vektör veritabanı işlemlerini (kayıt ve arama) yöneten sınıf."""
     
-    def __init__(self, chunks=None):
-        # Ollama üzerinden Llama 3.2 modelini embedding için kullanıyoruz
-        self.embeddings = OllamaEmbeddings(model="llama3.2")
-        self.persist_directory = "./chroma_db"
+    def __init__(self, chunks=None, persist_directory: str = "./chroma_db", embeddings=None, ids=None,
+                 embedding_cache=None, backend: str = "chroma", backend_options: dict = None):
+        # Ollama üzerinden Llama 3.2 modelini embedding için kullanıyoruz (batch'li, eşzamanlı istemci)
+        self.embeddings = embeddings or OllamaBatchEmbeddings(model="llama3.2")
+        self.embedding_model = embedding_identity(self.embeddings)
+        self.persist_directory = persist_directory
+        self.embedding_cache = embedding_cache
+        self.ingest_stats = IngestionStats()
+        if embedding_cache is not None:
+            # Aynı metin daha önce embed edildiyse Ollama'ya tekrar gitmeden önbellekten al.
+            # Anahtar sağlayıcı + model: aynı model adını taşıyan farklı sağlayıcılar vektör paylaşmaz
+            model_key = "{provider}:{model}".format(**self.embedding_model)
+            self.embeddings = CachedEmbeddings(self.embeddings, embedding_cache, model_key)
         
+        # Mevcut veritabanını diskten yükle (yoksa boş olarak oluşturulur).
+        # backend="chroma" Chroma koleksiyonunu, "numpy" yerel memmap motorunu kullanır.
+        self.backend = create_backend(
+            backend, self.persist_directory, embedding_function=self.embeddings, **(backend_options or {})
+        )
+        self.store_info = self._load_store_info()
+        # Aynı chunk'lardan kurulan BM25 indeksi; vektörlerle aynı dizinde saklanır
+        self.lexical_index = LexicalIndex.load(os.path.join(self.persist_directory, LEXICAL_INDEX_FILE))
+        if len(self.lexical_index) != self.get_document_count():
+            self.rebuild_lexical_index()
+        # Chunk içerik özetleri ve kaynakları; ingestion'da tekrar eden chunk'ları bulmak için
+        # (tutarlılığı manifestle birlikte sync_directory'de kontrol edilir)
+        self.dedup_index = DedupIndex.load(os.path.join(self.persist_directory, DEDUP_INDEX_FILE))
+        # (tekrar indeksinin sürümü, {filtre: başka bir kaynağı filtreye uyan chunk ID'leri})
+        self._shared_cache = (None, {})
         if chunks:
-            # Eğer döküman parçaları gelmişse veritabanını oluştur ve diske kaydet
-            self.db = Chroma.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                persist_directory=self.persist_directory
-            )
-        else:
-            # Eğer parçalar yoksa mevcut veritabanını diskten yükle
-            self.db = Chroma(
-                persist_directory=self.persist_directory,
-                embedding_function=self.embeddings
-            )
-
-    def search(self, query: str, k: int = 3):
-        """Soruyla en alakalı k adet döküman parçasını getirir."""
-        if not self.db:
+            # Eğer döküman parçaları gelmişse batch'li embedding hattıyla ekle ve diske kaydet
+            self.add_documents(chunks, ids=ids)
+            self.save()
+
+    @property
+    def db(self):
+        """Chroma arka ucunda langchain Chroma nesnesi (geriye dönük uyumluluk), diğerlerinde arka ucun kendisi."""
+        return getattr(self.backend, "db", self.backend)
+
+    def _load_store_info(self):
+        path = os.path.join(self.persist_directory, STORE_INFO_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if self.get_document_count() > 0:
+            return {**LEGACY_EMBEDDING, "dimension": None}
+        return None
+
+    def embedding_mismatch(self):
+        """
+        Depo yapılandırılan embedding modelinden farklı bir modelle kurulduysa açıklaması, değilse None.
+        Farklı modelin vektörleri aynı uzayda olmadığından (boyut aynı olsa bile) bu durumda vektör
+        araması yapılmaz; sync_directory depoyu yeni modelle baştan indeksler.
+        """
+        info = self.store_info
+        if info is None:
+            return None
+        stored = {"provider": info.get("provider"), "model": info.get("model")}
+        if stored == self.embedding_model:
+            return None
+        return (f"depo {stored['provider']}/{stored['model']} ile kurulmuş, yapılandırılan model "
+                f"{self.embedding_model['provider']}/{self.embedding_model['model']}")
+
+    def _search_mode(self, mode: str) -> str:
+        # Model değişmiş ve depo henüz yeniden indekslenmemişse sadece BM25 güvenilirdir
+        return "lexical" if mode != "lexical" and self.embedding_mismatch() is not None else mode
+
+    def needs_embedding(self, query: str, mode: str = "hybrid") -> bool:
+        """search() bu sorgu için sorgu embedding'ine ihtiyaç duyacak mı (lexical hızlı yol değilse)."""
+        mode = self._search_mode(mode)
+        return mode == "dense" or (mode == "hybrid" and not is_keyword_query(query))
+
+    def search(self, query: str, k: int = 3, mode: str = "hybrid", query_vector=None, where: dict = None):
+        """
+        Soruyla en alakalı k adet döküman parçasını getirir.
+        mode="dense" sadece vektör araması, "lexical" sadece BM25 yapar. "hybrid" iki sonucu
+        Reciprocal Rank Fusion ile birleştirir; anahtar kelime tarzı sorgularda (hata kodu, ürün kodu,
+        kısa ifade) BM25 sonuç bulursa embedding hiç hesaplanmaz.
+        query_vector verilirse (ör. önbellekten) tekrar embed edilmez.
+        where (bkz. search_filter) verilirse sadece filtreye uyan chunk'lar aranır: filtre vektör
+        sorgusuna eklenir, BM25 de sadece filtreye uyan chunk'ları skorlar (izinli ID kümesi sadece
+        BM25 için hesaplanır). Tekrarları ayıklanmış bir
+        chunk, kaynaklarından (onu içeren dosya/sayfalardan) biri filtreye uyuyorsa filtreye uymuş sayılır.
+        """
+        if self.db is None:
+            return []
+        mode = self._search_mode(mode)
+        allowed = self._allowed_ids(where) if mode != "dense" else None
+        if mode == "lexical" or (mode == "hybrid" and query_vector is None and is_keyword_query(query)):
+            docs = self.search_lexical(query, k=k, allowed=allowed)
+            if docs or mode == "lexical":
+                return docs
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        if mode == "dense":
+            return self.with_provenance(self.search_by_vector(query_vector, k=k, where=where))
+        return self.search_hybrid(query, query_vector, k=k, where=where, allowed=allowed)
+
+    def _allowed_ids(self, where: dict):
+        """
+        where'e uyan chunk ID'leri (BM25 filtresi için); filtre yoksa None. Metadata'sı (chunk'ı depoya
+        yazan dosyanınki) uyanlara, başka bir kaynağı uyan tekrar chunk'lar da eklenir.
+        """
+        if not where:
+            return None
+        return set(self.backend.get(where=where, include=())["ids"]) | self._shared_matches(where)
+
+    def _shared_matches(self, where: dict):
+        """
+        Depoya yazan dosya dışındaki bir kaynağı where'e uyan tekrar chunk'ları. Tekrar indeksi
+        değişmedikçe aynı filtre için tekrar hesaplanmaz.
+        """
+        revision, cache = self._shared_cache
+        if revision != self.dedup_index.revision or len(cache) >= SHARED_FILTER_CACHE_SIZE:
+            revision, cache = self.dedup_index.revision, {}
+            self._shared_cache = (revision, cache)
+        key = json.dumps(where, sort_keys=True)
+        if key not in cache:
+            cache[key] = self.dedup_index.matching_references(lambda metadata: matches_where(where, metadata))
+        return cache[key]
+
+    def _query(self, vectors, k: int, where: dict = None):
+        """
+        Vektör araması. Filtre arka uca where olarak iletilir; filtreye başka bir kaynağı sayesinde uyan
+        tekrar chunk'ları varsa metadata filtresi bunları bulamayacağından onlar ayrıca ID'leriyle aranır
+        ve iki sonuç uzaklığa göre birleştirilir.
+        """
+        shared = self._shared_matches(where) if where else None
+        if not shared:
+            return self.backend.query(vectors, k=k, where=where)
+        pushed = self.backend.query(vectors, k=k, where=where, with_distances=True)
+        extra = self.backend.query(vectors, k=min(k, len(shared)), ids=sorted(shared), with_distances=True)
+        results = []
+        for first, second in zip(pushed, extra):
+            best = {}
+            for doc, distance in first + second:
+                if doc.id not in best or distance < best[doc.id][1]:
+                    best[doc.id] = (doc, distance)
+            results.append([doc for doc, _ in sorted(best.values(), key=lambda pair: pair[1])[:k]])
+        return results
+
+    def with_provenance(self, docs):
+        """
+        Tekrarları ayıklanmış chunk'ların metadata'sına bütün kaynaklarını ekler: aynı içerik birden fazla
+        dosyada/sayfada geçiyorsa metadata["sources"] = [{"source", "pages"}, ...] olur. Chunk'ı ilk
+        yazan dosya silinmişse "source" kalan kaynaklardan birine çevrilir.
+        """
+        for doc in docs:
+            sources = self.dedup_index.sources(doc.id)
+            if not sources:
+                continue
+            if len(sources) > 1 or len(sources[0]["pages"]) > 1:
+                doc.metadata["sources"] = sources
+            if doc.metadata.get("source") not in {s["source"] for s in sources}:
+                doc.metadata["source"] = sources[0]["source"]
+                if sources[0]["pages"]:
+                    doc.metadata["page"] = sources[0]["pages"][0]
+        return docs
+
+    def embed_query(self, query: str):
+        """Sorguyu embedding vektörüne çevirir (önbelleğe alınabilmesi için aramadan ayrı)."""
+        return self.embeddings.embed_query(query)
+
+    def embed_queries(self, queries):
+        """
+        Birden fazla sorguyu tek bir batch'li embedding çağrısıyla vektöre çevirir.
+        Sorgular (embed_query'de olduğu gibi) kalıcı embedding önbelleğine yazılmaz.
+        """
+        queries = list(queries)
+        if not queries:
             return []
-        return self.db.similarity_search(query, k=k)
+        embed = getattr(self.embeddings, "embed_queries", self.embeddings.embed_documents)
+        return embed(queries)
+
+    def search_batch(self, queries, k: int = 3, mode: str = "hybrid", query_vectors=None, where: dict = None):
+        """
+        search()'ün çoklu sorgu hali: her sorgu için search() ile aynı sonucu döndürür, fakat
+        embedding'i gereken bütün sorgular tek embed_queries çağrısıyla embed edilir ve vektör
+        aramaları arka uca tek bir çok sorgulu query() olarak gider.
+        query_vectors verilirse (sorguyla aynı sırada, bilinmeyenler None) onlar tekrar embed edilmez.
+        where bütün sorgulara uygulanır.
+        """
+        queries = list(queries)
+        vectors = list(query_vectors) if query_vectors is not None else [None] * len(queries)
+        results = [None] * len(queries)
+        if self.db is None:
+            return [[] for _ in queries]
+        mode = self._search_mode(mode)
+        allowed = self._allowed_ids(where) if mode != "dense" else None
+        for i, query in enumerate(queries):
+            if mode == "lexical" or (mode == "hybrid" and vectors[i] is None and is_keyword_query(query)):
+                docs = self.search_lexical(query, k=k, allowed=allowed)
+                if docs or mode == "lexical":
+                    results[i] = docs
+
+        pending = [i for i, docs in enumerate(results) if docs is None]
+        missing = [i for i in pending if vectors[i] is None]
+        for i, vector in zip(missing, self.embed_queries(queries[i] for i in missing)):
+            vectors[i] = vector
+        if pending:
+            candidates = k if mode == "dense" else max(k, HYBRID_CANDIDATES)
+            dense = self._query([vectors[i] for i in pending], k=candidates, where=where)
+            for i, dense_docs in zip(pending, dense):
+                if mode == "dense":
+                    results[i] = self.with_provenance(dense_docs)
+                else:
+                    results[i] = self._fuse(queries[i], dense_docs, k=k, candidates=candidates, allowed=allowed)
+        return results
+
+    def search_by_vector(self, vector, k: int = 3, where: dict = None):
+        """Hazır bir sorgu vektörüne en yakın k parçayı chunk ID'leriyle birlikte getirir (where: filtre)."""
+        if self.db is None:
+            return []
+        return self._query([vector], k=k, where=where)[0]
     
-    def add_documents(self, chunks):
-        """Mevcut veritabanına yeni dokümanlar ekler (mevcut veriler korunur)."""
-        if not self.db or not chunks:
+    def _get_by_ids(self, ids):
+        """ID'leri verilen chunk'ları verilen sırayla Document olarak getirir (embedding gerektirmez)."""
+        if not ids:
+            return []
+        results = self.backend.get(ids=list(ids), include=["documents", "metadatas"])
+        found = {
+            doc_id: Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def search_lexical(self, query: str, k: int = 3, where: dict = None, allowed=None):
+        """
+        Sadece BM25 sözcük indeksiyle arama yapar; model çağrısı yoktur.
+        where yerine önceden hesaplanmış izinli chunk ID kümesi (allowed) de verilebilir.
+        """
+        if self.db is None:
+            return []
+        if allowed is None:
+            allowed = self._allowed_ids(where)
+        hits = self.lexical_index.search(query, k=k, allowed=allowed)
+        return self.with_provenance(self._get_by_ids([doc_id for doc_id, _ in hits]))
+
+    def search_hybrid(self, query: str, query_vector, k: int = 3, candidates: int = HYBRID_CANDIDATES,
+                      rrf_k: int = 60, where: dict = None, allowed=None):
+        """Vektör ve BM25 aramalarının ilk candidates sonucunu RRF ile birleştirip ilk k'yı döndürür."""
+        if self.db is None:
+            return []
+        candidates = max(k, candidates)
+        if allowed is None:
+            allowed = self._allowed_ids(where)
+        dense = self.search_by_vector(query_vector, k=candidates, where=where)
+        return self._fuse(query, dense, k=k, candidates=candidates, rrf_k=rrf_k, allowed=allowed)
+
+    def _fuse(self, query: str, dense, k: int, candidates: int, rrf_k: int = 60, allowed=None):
+        """Hazır vektör sonuçlarını sorgunun BM25 sonuçlarıyla RRF ile birleştirir."""
+        lexical = [doc_id for doc_id, _ in self.lexical_index.search(query, k=candidates, allowed=allowed)]
+        fused = [doc_id for doc_id, _ in reciprocal_rank_fusion([[d.id for d in dense], lexical], k=rrf_k)[:k]]
+
+        # Vektör aramasından gelenler zaten elde; sadece BM25'e özgü kazananlar okunur
+        docs = {d.id: d for d in dense}
+        docs.update((d.id, d) for d in self._get_by_ids([i for i in fused if i not in docs]))
+        return self.with_provenance([docs[doc_id] for doc_id in fused if doc_id in docs])
+
+    def add_documents(self, chunks, ids=None, stats: IngestionStats = None):
+        """
+        Mevcut veritabanına yeni dokümanlar ekler (mevcut veriler korunur).
+        ids verilirse aynı ID'ye sahip kayıtların üzerine yazılır (upsert).
+        Embedding'ler batch'ler halinde eşzamanlı hesaplanır, Chroma'ya toplu yazılır;
+        süre ve hacim bilgisi ingest_stats (ve verilirse stats) üzerine eklenir.
+        """
+        if self.db is None or not chunks:
             return False
         try:
-            self.db.add_documents(chunks)
+            if ids is None:
+                ids = [str(uuid.uuid4()) for _ in chunks]
+            texts = [chunk.page_content for chunk in chunks]
+            metadatas = [chunk.metadata or None for chunk in chunks]
+
+            vectors, embed_seconds = timed(self.embeddings.embed_documents, texts)
+            dimension = len(vectors[0])
+            if self.store_info is None or self.store_info.get("dimension") is None:
+                self.store_info = {**self.embedding_model, "dimension": dimension}
+            elif dimension != self.store_info["dimension"]:
+                raise ValueError(f"Embedding boyutu {dimension}, depo {self.store_info['dimension']} boyutlu")
+            _, write_seconds = timed(self._write_batches, ids, vectors, texts, metadatas)
+            self.lexical_index.add(ids, texts)
+
+            types = Counter(file_type(m.get("source", "")) for m in metadatas if m)
+            label = "mixed" if len(types) > 1 else next(iter(types), "none")
+            INGEST_STAGE_SECONDS.labels("embed", label).observe(embed_seconds)
+            INGEST_STAGE_SECONDS.labels("write", label).observe(write_seconds)
+            for extension, count in types.items():
+                INGEST_CHUNKS.labels(extension).inc(count)
+
+            size = sum(len(t.encode("utf-8")) for t in texts)
+            for target in (self.ingest_stats, stats):
+                if target is not None:
+                    target.record(len(texts), size, embed_seconds, write_seconds)
             return True
         except Exception as e:
             print(f"Hata: Yeni dokümanlar eklenirken hata oluştu: {e}")
             return False
 
+    def _write_batches(self, ids, vectors, texts, metadatas):
+        """Hazır vektörleri arka uca toplu upsert eder (Chroma'da en büyük batch boyutunda parçalanır)."""
+        self.backend.upsert(ids, vectors, texts, metadatas)
+
+    def delete_documents(self, ids):
+        """Verilen ID'lere sahip chunk'ları veritabanından siler."""
+        if self.db is None or not ids:
+            return
+        ids = list(ids)
+        self.backend.delete(ids)
+        self.lexical_index.remove(ids)
+        self.dedup_index.remove(ids)
+
+    def update_metadata(self, ids, metadatas):
+        """Chunk'ların metadata'sını yeniden embed etmeden değiştirir (ör. yeni filtre alanlarını eklemek için)."""
+        if self.db is None or not ids:
+            return
+        self.backend.update_metadata(list(ids), list(metadatas))
+
+    def merge_metadata(self, updates):
+        """
+        {chunk ID: {alan: değer}} güncellemelerini chunk'ların mevcut metadata'sıyla birleştirip yazar;
+        verilmeyen alanlar korunur. Depoda olmayan ID'ler atlanır.
+        """
+        if self.db is None or not updates:
+            return
+        current = self.backend.get(ids=list(updates), include=["metadatas"])
+        ids = current["ids"]
+        self.update_metadata(ids, [{**(metadata or {}), **updates[doc_id]}
+                                   for doc_id, metadata in zip(ids, current["metadatas"])])
+
+    def rebuild_lexical_index(self, batch_size: int = 1000):
+        """BM25 indeksini Chroma'daki metinlerden baştan kurar (indeks dosyası yoksa/uyumsuzsa)."""
+        self.lexical_index.clear()
+        ids, texts = [], []
+        for item in self.scan(fields=("full_content",), batch_size=batch_size):
+            ids.append(item["id"])
+            texts.append(item["full_content"])
+            if len(ids) >= batch_size:
+                self.lexical_index.add(ids, texts)
+                ids, texts = [], []
+        self.lexical_index.add(ids, texts)
+        self.lexical_index.save()
+
+    def save(self):
+        """Bellekte tutulan indeksleri (BM25, tekrar indeksi, numpy memmap/IVF) ve model bilgisini diske yazar."""
+        self.lexical_index.save()
+        self.dedup_index.save()
+        if self.backend is not None:
+            self.backend.persist()
+        if self.store_info is not None:
+            path = os.path.join(self.persist_directory, STORE_INFO_FILE)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.store_info, f)
+            os.replace(tmp_path, path)
+
+    def memory_estimate(self) -> int:
+        """Depo açıkken tuttuğu belleğin kaba tahmini (byte); koleksiyonların LRU'da tutulması için."""
+        if self.backend is None:
+            return 0
+        index_bytes = sum(
+            os.path.getsize(path) for path in (self.lexical_index.path, self.dedup_index.path)
+            if path and os.path.exists(path)
+        )
+        return INDEX_MEMORY_FACTOR * index_bytes + self.backend.memory_bytes()
+
+    def close(self):
+        """
+        Arka ucun dosya/bağlantı kaynaklarını bırakır (Chroma'da bu dizin için süreç içinde
+        paylaşılan sistemi durdurur). Dizin silinmeden önce çağrılmalı.
+        """
+        if self.backend is None:
+            return
+        backend, self.backend = self.backend, None
+        backend.close()
+
+    def clear(self):
+        """Koleksiyondaki tüm kayıtları siler (dizin ve koleksiyon yerinde kalır)."""
+        if self.db is None:
+            return
+        self.delete_documents(self.backend.get(include=[])["ids"])
+        self.dedup_index.clear()
+
+    def reset(self):
+        """
+        Depoyu yapılandırılan embedding modeli için baştan kurar: kayıtlar, vektör boyutu, BM25 ve
+        tekrar indeksleri silinir, model bilgisi bir sonraki yazmada kaydedilir.
+        """
+        if self.db is None:
+            return
+        self.backend.reset()
+        self.lexical_index.clear()
+        self.dedup_index.clear()
+        self.store_info = None
+        path = os.path.join(self.persist_directory, STORE_INFO_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+
 
 #veri tabanı işlemleri için fonksiyonlar:
     # A. get_all_documents: veritabanındaki tüm dokümanları getirir
     def get_all_documents(self, limit: int = None):
         """Veritabanındaki tüm dokümanları getirir."""
-        if not self.db:
+        if self.db is None:
             return []
         # Boş bir query ile tüm dokümanları almak için get() metodunu kullanıyoruz
         try:
-            # Chromadbden tüm dokümanları çekmek için get() kullanılır
-            results = self.db.get()
+            # Arka uçtan dokümanları çekmek için get() kullanılır; limit varsa sadece o kadarı okunur
+            results = self.backend.get(limit=limit or None, include=["documents"])
             if results and 'documents' in results:
-                documents = results['documents']
-                if limit:
-                    documents = documents[:limit]
-                return documents
+                return results['documents']
             return []
         except Exception as e:
-            # Eğer get() çalışmazsa, boş query ile similarity_search kullan
-            if limit:
-                return self.db.similarity_search("", k=limit)
-            # Limit yoksa
-            return self.db.similarity_search("", k=1000) # büyük bir sayı ile tümünü almaya çalış
+            print(f"Hata: Dokümanlar okunurken hata oluştu: {e}")
+            return []
     
     # B. get_document_count: veritabanındaki toplam doküman sayısını döndürür
     def get_document_count(self):
         """Veritabanındaki toplam doküman sayısını döndürür."""
-        if not self.db: # eğer veritabanı yoksa 0 döndür
+        if self.db is None: # eğer veritabanı yoksa 0 döndür
             return 0
         try:
-            results = self.db.get() # veritabanındaki tüm dokümanları al
-            if results and 'documents' in results:
-                return len(results['documents']) # doküman sayısını döndür
-            return 0
+            # koleksiyonun kendi sayacını kullan, dokümanları belleğe çekme
+            return self.backend.count()
         except Exception:
             return 0
     
     # C. get_documents_with_metadata: veritabanındaki dokümanları metadata bilgileriyle birlikte getirir
-    def get_documents_with_metadata(self, limit: int = 10): 
-        """Dokümanları metadata bilgileriyle birlikte getirir."""
-        if not self.db:
+    def get_documents_with_metadata(self, limit: int = 10, where: dict = None):
+        """
+        Dokümanları metadata bilgileriyle birlikte getirir.
+        Embedding/vektör araması yapmaz; scan() ile koleksiyonu doğrudan okur.
+        """
+        if self.db is None:
             return []
-        try:
-            # Boş query ile arama yaparak tüm dokümanları al
-            docs = self.db.similarity_search("", k=limit if limit else 1000) # büyük bir sayı ile tümünü almaya çalış
-            result = []
-            for i, doc in enumerate(docs): 
-                result.append({ # dictşonary for loop içinde oluşturulur ve sonuç listesine eklenir 
-                    "id": i,
-                    "content": doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content, 
-                    "full_content": doc.page_content,
-                    "metadata": doc.metadata if hasattr(doc, 'metadata') else {} # eğer doc.metadata varsa onu döndür, yoksa boş bir dictionary döndür
-                })
-            return result
-        except Exception as e:
-            return [] 
\ No newline at end of file
+        return list(itertools.islice(self.scan(where=where), limit if limit else None))
+
+    # D. get_documents_page: offset/limit ile sayfalı ve alan seçimli (projection) listeleme
+    PAGE_FIELDS = ("content", "full_content", "metadata")
+
+    def get_documents_page(self, offset: int = 0, limit: int = 10, fields=PAGE_FIELDS, where: dict = None):
+        """
+        Koleksiyondan sadece istenen sayfayı okur; tüm koleksiyonu belleğe almaz.
+        fields ile dönecek alanlar seçilir ("content", "full_content", "metadata"; "id" her zaman döner).
+        Sadece gereken sütunlar Chroma'dan istenir, ör. fields=("metadata",) metinleri hiç okumaz.
+        where verilirse metadata filtresi doğrudan Chroma sorgusuna eklenir.
+        Sonraki sayfa yoksa next_offset None olur.
+        """
+        if self.db is None:
+            return {"documents": [], "next_offset": None}
+        fields = [f for f in fields if f in self.PAGE_FIELDS]
+        include = []
+        if "content" in fields or "full_content" in fields:
+            include.append("documents")
+        if "metadata" in fields:
+            include.append("metadatas")
+
+        # Bir sonraki sayfa olup olmadığını anlamak için bir fazla kayıt iste
+        results = self.backend.get(limit=limit + 1, offset=offset, where=where, include=include)
+        ids = results["ids"][:limit]
+        documents = []
+        for i, doc_id in enumerate(ids):
+            item = {"id": doc_id}
+            if "content" in fields:
+                text = results["documents"][i]
+                item["content"] = text[:500] + "..." if len(text) > 500 else text
+            if "full_content" in fields:
+                item["full_content"] = results["documents"][i]
+            if "metadata" in fields:
+                item["metadata"] = results["metadatas"][i] or {}
+            documents.append(item)
+        return {
+            "documents": documents,
+            "next_offset": offset + limit if len(results["ids"]) > limit else None,
+        }
+
+    # E. scan: embedding gerektirmeden koleksiyonu sabit sırayla dolaşır
+    def scan(self, where: dict = None, fields=PAGE_FIELDS, offset: int = 0, batch_size: int = 256):
+        """
+        Koleksiyondaki kayıtları batch_size'lık sayfalar halinde okuyup tek tek üreten generator.
+        Hiçbir model çağrısı yapmaz. Sıra Chroma'nın kayıt sırasıdır; kayıt silinmedikçe/eklenmedikçe
+        her çağrıda aynıdır. Dönen "id" alanı gerçek (deterministik) chunk ID'sidir.
+        """
+        while offset is not None:
+            page = self.get_documents_page(offset=offset, limit=batch_size, fields=fields, where=where)
+            yield from page["documents"]
+            offset = page["next_offset"]
+
+
+def metadata_filter(**conditions):
+    """
+    Değeri None olmayan koşullardan Chroma where ifadesi üretir.
+    Ör. metadata_filter(source="a.pdf", page=2) -> {"$and": [{"source": "a.pdf"}, {"page": 2}]}
+    """
+    clauses = [{key: value} for key, value in conditions.items() if value is not None]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def search_filter(source: str = None, file_type: str = None, page_from: int = None, page_to: int = None,
+                  ingested_after: int = None, ingested_before: int = None):
+    """
+    Aramayı daraltan koşullardan (verilmeyenler yok sayılır) Chroma where ifadesi üretir:
+    source data/'ya göre dosya yolu (source_name), file_type uzantı ("pdf" veya ".pdf"),
+    page_from/page_to sayfa aralığı (metadata'daki 0 tabanlı sayfa, sınırlar dahil),
+    ingested_after/ingested_before ingest zamanı aralığı (unix saniye, sınırlar dahil).
+    Sayfa koşulu sadece sayfası olan (PDF) chunk'larla eşleşir. Birden fazla dosyada geçen (tekrarı
+    ayıklanmış) bir chunk, kaynaklarından birinin dosyası/sayfası koşullara uyuyorsa eşleşir
+    (bkz. VectorStoreManager._allowed_ids).
+    """
+    clauses = []
+    if source:
+        clauses.append({"source_name": source.replace(os.sep, "/")})
+    if file_type:
+        clauses.append({"file_type": file_type.lower().lstrip(".")})
+    for key, op, value in (("page", "$gte", page_from), ("page", "$lte", page_to),
+                           ("ingested_at", "$gte", ingested_after), ("ingested_at", "$lte", ingested_before)):
+        if value is not None:
+            clauses.append({key: {op: int(value)}})
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
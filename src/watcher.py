@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+import traceback
+from src.ingestion import find_supported_files
+from src.metrics import WATCH_FRESHNESS_SECONDS
+
+
+def snapshot(data_dir: str):
+    """data_dir'deki desteklenen dosyaların göreli yol -> (mtime_ns, boyut) haritası; dosyalar okunmaz."""
+    files = {}
+    for file_path in find_supported_files(data_dir):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        files[os.path.relpath(file_path, data_dir)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class DataDirWatcher:
+    """
+    data_dir'i poll_seconds aralıklarla stat ile tarar ve değişen (yeni, değişmiş, silinmiş) dosyaları
+    apply(göreli_yollar) ile işlenmeye gönderir. Bir dosya, debounce_seconds boyunca mtime/boyutu
+    değişmeden kalana kadar bekletilir; böylece kopyalanmakta olan bir dosya yarım okunmaz ve art arda
+    gelen değişiklikler tek batch'te işlenir.
+
+    apply batch'i işleyip bitene kadar bekler ve sync_directory raporunu döndürür; None döndürürse
+    (ör. tam reload sürüyor) dosyalar kuyrukta kalır ve bir sonraki turda tekrar denenir. İşlenemeyen
+    dosyalar tekrar denenmez, errors sayacına eklenir; bir sonraki tam reload onları yeniden dener.
+    Tazelik gecikmesi, değişikliğin ilk görüldüğü andan apply'ın bitişine kadar ölçülür (tarama
+    aralığı kadar ek gecikme ölçüme girmez).
+    """
+
+    def __init__(self, data_dir: str, apply, poll_seconds: float = 2.0, debounce_seconds: float = 1.0):
+        self.data_dir = data_dir
+        self.apply = apply
+        self.poll_seconds = poll_seconds
+        self.debounce_seconds = debounce_seconds
+        self._snapshot = None
+        self._pending = {}      # göreli yol -> {"first_seen", "last_change"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {
+            "batches": 0,
+            "files": 0,
+            "errors": 0,
+            "last_batch_at": None,
+            "last_lag_seconds": None,
+            "max_lag_seconds": None,
+        }
+
+    def start(self):
+        """İlk anlık görüntüyü alır ve tarama thread'ini başlatır."""
+        self._snapshot = snapshot(self.data_dir) if os.path.isdir(self.data_dir) else {}
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll()
+            except Exception:
+                traceback.print_exc()
+
+    def poll(self, now: float = None):
+        """
+        Tek tarama turu: değişen dosyaları kuyruğa ekler, debounce süresini doldurmuş olanları
+        apply'a gönderir. İşlenen dosya sayısını döndürür.
+        """
+        now = time.time() if now is None else now
+        if not os.path.isdir(self.data_dir):
+            return 0
+        current = snapshot(self.data_dir)
+        previous = self._snapshot if self._snapshot is not None else current
+        changed = {path for path in current.keys() | previous.keys() if current.get(path) != previous.get(path)}
+        self._snapshot = current
+        with self._lock:
+            for path in changed:
+                entry = self._pending.setdefault(path, {"first_seen": now})
+                entry["last_change"] = now
+            ready = sorted(
+                path for path, entry in self._pending.items()
+                if now - entry["last_change"] >= self.debounce_seconds
+            )
+        if not ready:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            result = self.apply(ready)
+            errors = len(result["errors"]) if result is not None else 0
+        except Exception:
+            traceback.print_exc()
+            result, errors = {}, len(ready)
+        if result is None:
+            return 0
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            entries = [self._pending.pop(path) for path in ready]
+            lags = [now - entry["first_seen"] + elapsed for entry in entries]
+            stats = self._stats
+            stats["batches"] += 1
+            stats["files"] += len(ready)
+            stats["errors"] += errors
+            stats["last_batch_at"] = time.time()
+            stats["last_lag_seconds"] = round(max(lags), 3)
+            stats["max_lag_seconds"] = round(max(max(lags), stats["max_lag_seconds"] or 0.0), 3)
+        for lag in lags:
+            WATCH_FRESHNESS_SECONDS.observe(lag)
+        return len(ready)
+
+    def queue_depth(self) -> int:
+        """Değişikliği görülmüş ama henüz depoya işlenmemiş dosya sayısı."""
+        return len(self._pending)
+
+    def stats(self):
+        with self._lock:
+            oldest = min((entry["first_seen"] for entry in self._pending.values()), default=None)
+            return {
+                "poll_seconds": self.poll_seconds,
+                "debounce_seconds": self.debounce_seconds,
+                "queue_depth": len(self._pending),
+                "oldest_pending_seconds": round(time.time() - oldest, 3) if oldest is not None else None,
+                **self._stats,
+            }
@@ -0,0 +1,28 @@
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.vector_store import VectorStoreManager
+from benchmarks.stub_ollama import StubOllamaServer
+
+
+def write(path, content):
+    """Test dosyasını UTF-8 olarak yazar."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Ollama gerektirmeyen sahte embedding ile geçici bir VectorStoreManager."""
+    return VectorStoreManager(
+        chunks=None,
+        persist_directory=str(tmp_path / "chroma_db"),
+        embeddings=DeterministicFakeEmbedding(size=16),
+    )
+
+
+@pytest.fixture
+def stub_server():
+    """Ollama yerine geçen stub sunucu: token başına 10 ms, /api/embed isteği başına 50 ms gecikme."""
+    server = StubOllamaServer(delay=0.01, embed_delay=0.05)
+    yield server
+    server.close()
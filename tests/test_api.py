@@ -0,0 +1,307 @@
+import asyncio
+import os
+import time
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from fastapi.testclient import TestClient
+from src import main
+from src.reload_jobs import ReloadJobManager
+from src.store_generations import GenerationStore
+
+
+class SlowSearchManager:
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.embed_calls = 0
+
+    def embed_query(self, query):
+        self.embed_calls += 1
+        time.sleep(self.delay)
+        return [1.0, 0.0]
+
+    def search_by_vector(self, vector, k=3, where=None):
+        return [Document(id="c1", page_content="parça")]
+
+    def needs_embedding(self, query, mode="hybrid"):
+        return True
+
+    def search(self, query, k=3, mode="hybrid", query_vector=None, where=None):
+        return self.search_by_vector(query_vector, k=k)
+
+
+class CountingLLM:
+    model_name = "sahte"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ask(self, prompt):
+        self.calls += 1
+        return f"cevap {self.calls}"
+
+    async def generate(self, prompt):
+        return {"response": await self.ask(prompt), "metrics": {}}
+
+
+def test_retrieval_does_not_block_event_loop(monkeypatch):
+    """Bloklayan vektör araması sürerken event loop'taki diğer işler ilerleyebilmeli."""
+    monkeypatch.setattr(main, "vector_manager", SlowSearchManager())
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        docs = await main.retrieve("soru", k=1)
+        task.cancel()
+        return docs, ticks
+
+    docs, ticks = asyncio.run(run())
+    assert [d.page_content for d in docs] == ["parça"]
+    assert ticks >= 5
+
+
+def test_repeated_questions_hit_query_and_answer_caches(monkeypatch):
+    """Aynı soru tekrar sorulduğunda sorgu tekrar embed edilmemeli ve cevap yeniden üretilmemeli."""
+    manager = SlowSearchManager(delay=0)
+    llm = CountingLLM()
+    monkeypatch.setattr(main, "vector_manager", manager)
+    monkeypatch.setattr(main, "llm", llm)
+    main.invalidate_caches()
+    client = TestClient(main.app)
+
+    first = client.post("/ask", json={"question": "Toplantı ne zaman?"}).json()
+    second = client.post("/ask", json={"question": "  toplantı NE zaman "}).json()
+    assert first["answer"] == second["answer"] == "cevap 1"
+    assert manager.embed_calls == 1 and llm.calls == 1
+
+    main.invalidate_caches()
+    third = client.post("/ask", json={"question": "Toplantı ne zaman?"}).json()
+    assert third["answer"] == "cevap 2"
+    assert manager.embed_calls == 2
+
+
+def use_temp_store(tmp_path, monkeypatch):
+    """main modülünü geçici data/ ve veritabanı dizinleriyle, sahte embedding'le çalışacak hale getirir."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    monkeypatch.setattr(main, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(main, "INGEST_WORKERS", 1)
+    monkeypatch.setattr(main, "RELOAD_GC_GRACE_SECONDS", 0)
+    monkeypatch.setattr(main, "embeddings", DeterministicFakeEmbedding(size=16))
+    monkeypatch.setattr(main, "embedding_cache", None)
+    monkeypatch.setattr(main, "EMBEDDING_CACHE_PATH", str(tmp_path / "embedding_cache.sqlite"))
+    monkeypatch.setattr(main, "generations", GenerationStore(str(tmp_path / "chroma_db")))
+    monkeypatch.setattr(main, "reload_jobs", ReloadJobManager())
+    return data_dir
+
+
+def test_reload_swaps_store_in_background(tmp_path, monkeypatch):
+    """Reload yeni bir sürümde çalışmalı; eski sürüm iş bitene kadar sorgulanabilir kalmalı."""
+    data_dir = use_temp_store(tmp_path, monkeypatch)
+    (data_dir / "a.txt").write_text("Birinci dosya", encoding="utf-8")
+    main.open_database()
+    assert main.reload_jobs.submit(main.rebuild_database)[0].wait(timeout=30)
+    old_manager = main.vector_manager
+    assert old_manager.get_document_count() == 1
+
+    (data_dir / "b.txt").write_text("İkinci dosya", encoding="utf-8")
+    client = TestClient(main.app)
+    accepted = client.post("/db/reload")
+    assert accepted.status_code == 202
+    job_id = accepted.json()["job_id"]
+    assert main.reload_jobs.get(job_id).wait(timeout=30)
+
+    status = client.get(f"/db/reload/{job_id}").json()
+    assert status["status"] == "succeeded"
+    assert status["progress"] == {"files_done": 1, "files_total": 1}
+    assert status["result"]["changes"]["added"] == ["b.txt"]
+    assert main.vector_manager is not old_manager
+    assert main.vector_manager.get_document_count() == 2
+    assert client.get("/db/stats").json()["generation"] == "gen-000003"
+
+    # Eski sürüm bekleme süresinden sonra kapatılıp silinmeli
+    deadline = time.time() + 5
+    while os.path.exists(old_manager.persist_directory) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not os.path.exists(old_manager.persist_directory)
+    assert client.get("/db/reload/yok").status_code == 404
+    main.vector_manager.close()
+
+
+def test_startup_serves_immediately_and_reconciles_in_background(tmp_path, monkeypatch):
+    """Açılışta veritabanı hemen açılmalı, data/ uzlaştırması arka plan işinde yapılmalı;
+    değişiklik yoksa ikinci açılışta depo kopyalanmamalı."""
+    data_dir = use_temp_store(tmp_path, monkeypatch)
+    (data_dir / "a.txt").write_text("Birinci dosya", encoding="utf-8")
+    with TestClient(main.app) as client:
+        stats = client.get("/db/stats").json()
+        assert set(stats["startup"]) >= {"import_seconds", "store_open_seconds", "ready_seconds"}
+        job = main.reload_jobs.get(stats["startup"]["reconcile_job_id"])
+        assert job.wait(timeout=30) and job.status == "succeeded"
+        assert client.get("/db/stats").json()["total_documents"] == 1
+
+    with TestClient(main.app) as client:
+        job = main.reload_jobs.get(client.get("/db/stats").json()["startup"]["reconcile_job_id"])
+        assert job.wait(timeout=30)
+        assert job.result["skipped"] is True
+        assert job.result["changes"]["unchanged"] == 1
+    main.vector_manager.close()
+
+
+class BatchSearchManager:
+    """Toplu embedding ve aramayı sayan sahte arama katmanı."""
+
+    def __init__(self):
+        self.embed_batches = []
+        self.search_batches = []
+
+    def needs_embedding(self, query, mode="hybrid"):
+        return True
+
+    def embed_queries(self, queries):
+        self.embed_batches.append(len(queries))
+        return [[float(len(q))] for q in queries]
+
+    def search_batch(self, queries, k=3, mode="hybrid", query_vectors=None, where=None):
+        self.search_batches.append(len(queries))
+        return [[Document(id=f"c{i}", page_content=f"{q} hakkında parça")] for i, q in enumerate(queries)]
+
+
+class SlowLLM:
+    """Eşzamanlı üretim sayısının tepe değerini ölçen sahte LLM."""
+
+    model_name = "sahte"
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, prompt):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {"response": "cevap: " + prompt.rsplit("\n", 2)[-2], "metrics": {"prefill_ms": 1.0}}
+
+
+def test_batch_endpoint_shares_retrieval_and_bounds_generation(monkeypatch):
+    """/ask/batch soruları grup halinde embed edip aramalı, üretimi sınırlı işçiyle yapıp NDJSON akıtmalı."""
+    import json
+    manager, llm = BatchSearchManager(), SlowLLM()
+    monkeypatch.setattr(main, "vector_manager", manager)
+    monkeypatch.setattr(main, "llm", llm)
+    monkeypatch.setattr(main, "retrieval_executor", None)
+    monkeypatch.setattr(main, "ASK_BATCH_CONCURRENCY", 3)
+    monkeypatch.setattr(main, "ASK_BATCH_RETRIEVAL_SIZE", 8)
+    main.invalidate_caches()
+    questions = [f"soru {i}?" for i in range(20)]
+
+    response = TestClient(main.app).post("/ask/batch", json={"questions": questions})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    items, summary = lines[:-1], lines[-1]
+
+    assert sorted(item["index"] for item in items) == list(range(20))
+    assert all(item["answer"] == f"cevap: {questions[item['index']]}" for item in items)
+    assert all(item["timing"]["generation_ms"] > 0 and "queue_ms" in item["timing"] for item in items)
+    assert items[0]["metrics"]["prefill_ms"] == 1.0
+    assert summary == {**summary, "done": True, "count": 20, "errors": 0, "cached": 0}
+    assert manager.embed_batches == manager.search_batches == [8, 8, 4]
+    assert llm.max_in_flight == 3
+
+
+class ClosableBatchSearchManager(BatchSearchManager):
+    """Kapatıldıktan sonra (VectorStoreManager gibi) her sorguya boş sonuç döndüren sahte arama katmanı."""
+
+    def __init__(self):
+        super().__init__()
+        self.closed = False
+
+    def search_batch(self, queries, k=3, mode="hybrid", query_vectors=None, where=None):
+        if self.closed:
+            return [[] for _ in queries]
+        return super().search_batch(queries, k=k, mode=mode, query_vectors=query_vectors, where=where)
+
+    def close(self):
+        self.closed = True
+
+
+def test_generation_swap_during_batch_keeps_old_store_open(monkeypatch):
+    """Batch sürerken yeni sürüme geçilse de akışın tuttuğu eski depo batch bitene kadar kapatılmamalı."""
+    import json
+    old, new = ClosableBatchSearchManager(), ClosableBatchSearchManager()
+    removed, timers = [], []
+
+    class SwappingLLM(PromptRecordingLLM):
+        async def generate(self, prompt):
+            if not timers:
+                # Reload'un yaptığı gibi: canlı depo değişir, eski sürümün temizliği beklemesiz planlanır
+                main.vector_manager = new
+                timers.append(main.schedule_generation_cleanup(old, "gen-eski", delay=0, store=RemovedPaths()))
+                await asyncio.sleep(0.05)
+            return await super().generate(prompt)
+
+    class RemovedPaths:
+        def remove(self, path):
+            removed.append(path)
+
+    llm = SwappingLLM()
+    monkeypatch.setattr(main, "vector_manager", old)
+    monkeypatch.setattr(main, "llm", llm)
+    monkeypatch.setattr(main, "retrieval_executor", None)
+    monkeypatch.setattr(main, "ASK_BATCH_CONCURRENCY", 1)
+    monkeypatch.setattr(main, "ASK_BATCH_RETRIEVAL_SIZE", 1)
+    main.invalidate_caches()
+    questions = [f"soru {i}?" for i in range(6)]
+
+    response = TestClient(main.app).post("/ask/batch", json={"questions": questions})
+    summary = json.loads(response.text.splitlines()[-1])
+    assert summary["count"] == 6 and summary["errors"] == 0
+    # Geçişten sonraki gruplar da eski depodan bağlamla cevaplanır
+    assert len(llm.prompts) == 6 and all("hakkında parça" in prompt for prompt in llm.prompts)
+    assert old.search_batches == [1] * 6 and new.search_batches == []
+    timers[0].join(timeout=5)
+    assert old.closed and removed == ["gen-eski"]
+    assert main.store_leases.readers(old) == 0
+
+
+class PromptRecordingLLM(CountingLLM):
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        return await super().generate(prompt)
+
+
+def test_ask_filters_restrict_retrieved_context(tmp_path, monkeypatch):
+    """/ask'e verilen filtreler bağlama sadece filtreye uyan dosyanın parçalarını sokmalı."""
+    data_dir = use_temp_store(tmp_path, monkeypatch)
+    (data_dir / "fatura.txt").write_text("Fatura iadesi on dört gün içinde yapılır.", encoding="utf-8")
+    (data_dir / "izin.txt").write_text("Yıllık izin talebi yöneticiye iletilir.", encoding="utf-8")
+    main.open_database()
+    assert main.reload_jobs.submit(main.rebuild_database)[0].wait(timeout=30)
+    llm = PromptRecordingLLM()
+    monkeypatch.setattr(main, "llm", llm)
+    monkeypatch.setattr(main, "retrieval_executor", None)
+    main.invalidate_caches()
+    client = TestClient(main.app)
+
+    question = {"question": "Fatura iadesi ne kadar sürer?"}
+    client.post("/ask", json=question)
+    client.post("/ask", json={**question, "filters": {"source": "izin.txt"}})
+    client.post("/ask", json={**question, "filters": {"file_type": "pdf"}})
+    assert "Fatura iadesi on dört" in llm.prompts[0]
+    assert "Yıllık izin" in llm.prompts[1] and "Fatura iadesi on dört" not in llm.prompts[1]
+    assert "Yıllık izin" not in llm.prompts[2] and "Fatura iadesi on dört" not in llm.prompts[2]
+
+    future = client.post("/ask", json={**question, "filters": {"ingested_after": "2999-01-01T00:00:00"}}).json()
+    assert future["metrics"]["context"]["candidates"] == 0
+    main.vector_manager.close()
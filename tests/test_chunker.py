@@ -0,0 +1,74 @@
+from src import config
+from src.chunker import TextChunker
+from src.document_processor import DocumentProcessor
+from src.ingestion import pending_changes, sync_directory, IngestionManifest
+from benchmarks.corpus import sample_text
+from tests.conftest import write
+
+
+def test_chunks_respect_size_overlap_and_paragraphs():
+    """Chunk'lar sınırı aşmamalı, paragraf içinde örtüşmeli, aynı paragraf önündeki metinden bağımsız bölünmeli."""
+    chunker = TextChunker(300, 50)
+    paragraph = sample_text(120, seed=7)
+
+    def chunks(text):
+        return [text[start:end] for start, end in chunker.spans(text)[0]]
+
+    def paragraph_chunks(prefix):
+        text_chunks = chunks(prefix + "\n\n" + paragraph)
+        start = next(i for i, c in enumerate(text_chunks) if c.startswith(paragraph[:40]))
+        return text_chunks[start:]
+
+    first = paragraph_chunks(sample_text(70, seed=1))
+    assert len(first) > 2 and max(len(c) for c in first) <= 300
+    assert first == paragraph_chunks(sample_text(20, seed=2))
+    for previous, current in zip(first, first[1:]):
+        assert current[:20] in previous
+
+    # Akış halinde (blok blok) bölmek tek seferde bölmekle aynı chunk'ları ve konumları vermeli
+    text = "\n\n".join(sample_text(40 + i * 13, seed=i) for i in range(20))
+    blocks = [(text[i:i + 500], {"block": i}) for i in range(0, len(text), 500)]
+    streamed = list(chunker.stream(blocks))
+    assert [c[0] for c in streamed] == chunks(text)
+    assert all(text[start:end] == chunk for chunk, start, end, _ in streamed)
+    assert all(metadata["block"] <= start < metadata["block"] + 500 for _, start, _, metadata in streamed)
+
+
+def test_markdown_is_split_by_heading_hierarchy(tmp_path):
+    """Markdown chunk'ları başlık yolunu ve dosyadaki konumlarını taşımalı; kod bloğundaki # başlık sayılmamalı."""
+    text = (
+        "Önsöz satırı\n\n# Kurulum\n\nGereksinimler.\n\n## Linux\n\n```\n# yorum satırı\n```\n"
+        "Paket kurulur.\n\n## Windows\n\n" + sample_text(200, seed=3) + "\n\n# SSS\n\nSorular.\n"
+    )
+    path = tmp_path / "kilavuz.md"
+    write(path, text)
+
+    chunks = DocumentProcessor(str(path), chunk_size=400, chunk_overlap=40).process()
+    paths = [c.metadata["heading_path"] for c in chunks]
+    assert paths[0] == "" and paths[-1] == "SSS"
+    # Kısa kardeş bölümler üst başlıkta birleşir, uzun bölüm kendi içinde bölünür
+    assert paths[1] == "Kurulum" and "# yorum satırı" in chunks[1].page_content
+    assert paths.count("Kurulum > Windows") >= 3
+    assert all(len(c.page_content) <= 400 for c in chunks)
+    for chunk in chunks:
+        assert text[chunk.metadata["char_start"]:chunk.metadata["char_end"]] == chunk.page_content
+
+
+def test_changed_chunk_settings_rechunk_files(tmp_path, store, monkeypatch):
+    """Bir formatın chunk ayarları değişince o formattaki dosyalar içerik aynı olsa da yeniden bölünmeli."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", sample_text(600, seed=1))
+    write(data_dir / "b.md", "# Başlık\n\n" + sample_text(600, seed=2))
+    sync_directory(str(data_dir), store)
+    manifest = IngestionManifest(str(tmp_path / "chroma_db" / "manifest.json"))
+    assert pending_changes(str(data_dir), manifest)["modified"] == []
+    before = len(manifest.files["a.txt"]["chunk_ids"])
+
+    monkeypatch.setitem(config.CHUNK_SETTINGS, "txt", (400, 40))
+    assert pending_changes(str(data_dir), manifest)["modified"] == ["a.txt"]
+    report = sync_directory(str(data_dir), store)
+    assert report["updated"] == ["a.txt"] and report["unchanged"] == 1
+    manifest = IngestionManifest(str(tmp_path / "chroma_db" / "manifest.json"))
+    assert len(manifest.files["a.txt"]["chunk_ids"]) > before
+    assert store.get_document_count() == manifest.chunk_count()
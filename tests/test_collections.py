@@ -0,0 +1,100 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import main
+from src.collection_registry import CollectionRegistry
+from tests.test_api import use_temp_store, CountingLLM
+
+
+def make_collection(root, name, files):
+    data_dir = root / name / "data"
+    data_dir.mkdir(parents=True)
+    for file_name, content in files.items():
+        (data_dir / file_name).write_text(content, encoding="utf-8")
+    return data_dir
+
+
+def use_temp_collections(tmp_path, monkeypatch, **options):
+    root = tmp_path / "collections"
+    root.mkdir()
+    registry = CollectionRegistry(str(root), main.open_store, on_open=main.open_collection, **options)
+    monkeypatch.setattr(main, "collection_registry", registry)
+    return root, registry
+
+
+def sync(registry, name):
+    """Koleksiyonun açılışta başlattığı uzlaştırma işinin bitmesini bekler."""
+    job = registry.get(name).reload_jobs.active
+    if job is not None:
+        assert job.wait(timeout=30)
+
+
+def test_collections_open_lazily_and_evict_least_recently_used(tmp_path, monkeypatch):
+    """Depolar ilk kullanımda açılmalı; sınır aşılınca boştaki en eski depo kapatılmalı, kullanımdaki asla."""
+    use_temp_store(tmp_path, monkeypatch)
+    root, registry = use_temp_collections(tmp_path, monkeypatch, max_open=1)
+    make_collection(root, "hukuk", {"a.txt": "Sözleşme feshi"})
+    make_collection(root, "ik", {"b.txt": "Yıllık izin"})
+    (root / "Gecersiz Ad").mkdir()
+
+    assert registry.names() == ["hukuk", "ik"]
+    assert registry.open_collections() == []
+    with pytest.raises(KeyError):
+        registry.get("../hukuk")
+
+    with registry.lease("hukuk"):
+        sync(registry, "hukuk")
+        with registry.lease("ik"):
+            sync(registry, "ik")
+            # İkisi de kullanımda: sınır aşılsa da kapatılmamalı
+            assert len(registry.open_collections()) == 2
+    assert registry.get("hukuk").manager.get_document_count() == 1
+
+    # Dıştaki lease bitince sınır (1) aşılmış olur, boştaki "ik" kapatılır
+    assert [c.name for c in registry.open_collections()] == ["hukuk"]
+    assert registry.evictions == 1
+
+    # Kapatılan koleksiyon diskten tekrar açılmalı (yeniden embed edilmeden); yerine "hukuk" kapatılır
+    manager = registry.acquire("ik")
+    sync(registry, "ik")
+    assert manager.get_document_count() == 1
+    assert registry.get("ik").reload_jobs.active is None
+    registry.release("ik")
+    assert [c.name for c in registry.open_collections()] == ["ik"]
+    assert registry.stats()["evictions"] == 2
+    registry.close_all()
+    assert registry.open_collections() == []
+
+
+def test_requests_are_isolated_per_collection(tmp_path, monkeypatch):
+    """collection parametresi verilen istek sadece o koleksiyonun dokümanlarını görmeli."""
+    data_dir = use_temp_store(tmp_path, monkeypatch)
+    (data_dir / "varsayilan.txt").write_text("Varsayılan koleksiyon", encoding="utf-8")
+    main.open_database()
+    assert main.reload_jobs.submit(main.rebuild_database)[0].wait(timeout=30)
+    root, registry = use_temp_collections(tmp_path, monkeypatch)
+    make_collection(root, "hukuk", {"a.txt": "Sözleşme feshi", "b.txt": "Kira artışı"})
+    client = TestClient(main.app)
+
+    reload = client.post("/db/reload", params={"collection": "hukuk", "wait": "true"}).json()
+    assert sorted(reload["changes"]["added"]) == ["a.txt", "b.txt"]
+    documents = client.get("/db/documents", params={"collection": "hukuk", "source": "a.txt"}).json()
+    assert documents["total_documents"] == 2 and documents["count"] == 1
+    assert client.get("/db/documents").json()["total_documents"] == 1
+    assert client.get("/db/files", params={"collection": "hukuk"}).json()["count"] == 2
+
+    stats = client.get("/db/stats", params={"collection": "hukuk"}).json()
+    assert stats["collection"] == "hukuk" and stats["collections"]["open"] == 1
+    listed = client.get("/db/collections").json()
+    assert [c["name"] for c in listed["collections"]] == ["default", "hukuk"]
+
+    # Aynı soru farklı koleksiyonlarda önbellekten birbirinin cevabını almamalı
+    monkeypatch.setattr(main, "llm", CountingLLM())
+    monkeypatch.setattr(main, "retrieval_executor", None)
+    main.invalidate_caches()
+    first = client.post("/ask", json={"question": "Fesih?", "collection": "hukuk"}).json()
+    second = client.post("/ask", json={"question": "Fesih?"}).json()
+    assert first["answer"] != second["answer"]
+    assert client.post("/ask", json={"question": "Fesih?", "collection": "yok"}).status_code == 404
+    assert registry.get("hukuk").users == 0
+    registry.close_all()
+    main.vector_manager.close()
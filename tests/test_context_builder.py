@@ -0,0 +1,40 @@
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.context_builder import ContextBuilder, TokenCounter, overlap_length
+from benchmarks.corpus import sample_text
+
+
+def doc(doc_id, text, source="a.txt", page=None):
+    metadata = {"source": source} if page is None else {"source": source, "page": page}
+    return Document(id=doc_id, page_content=text, metadata=metadata)
+
+
+def test_overlapping_and_contained_candidates_are_not_repeated():
+    """Splitter'ın chunk_overlap'i bağlamda iki kez yer almamalı; başka bir parçanın içindeki aday atılmalı."""
+    text = sample_text(400, seed=3)
+    chunks = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100).split_text(text)
+    assert overlap_length(chunks[0], chunks[1]) > 0
+    docs = [doc("c1", chunks[1]), doc("c0", chunks[0]), doc("c2", chunks[2])]
+    docs.append(doc("icinde", chunks[1][50:200]))
+    docs.append(doc("kopya", chunks[2], source="b.txt"))
+
+    built = ContextBuilder(token_budget=10_000).build(docs)
+    assert sorted(built.doc_ids) == ["c0", "c1", "c2"]
+    assert built.stats["dropped_overlap"] == 2
+    assert text.startswith(" ".join(built.text.split("\n\n")))
+
+
+def test_budget_keeps_most_relevant_passages_in_stable_order():
+    """Bütçeye en alakalı parçalar sığmalı; prompt'taki sıra alaka sırasından bağımsız (kaynak, sayfa) olmalı."""
+    counter = TokenCounter()
+    docs = [doc(f"p{i}", sample_text(120, seed=i), source="rapor.pdf", page=i) for i in range(6)]
+    budget = counter.count(docs[4].page_content) + counter.count(docs[1].page_content) + 60
+    builder = ContextBuilder(token_budget=budget, counter=counter)
+
+    built = builder.build([docs[4], docs[1], docs[0], docs[5]])
+    assert built.doc_ids == ("p0", "p1", "p4")
+    assert built.stats["truncated"] == 1
+    assert built.stats["context_tokens"] <= budget
+    assert docs[0].page_content.startswith(built.text.split("\n\n")[0])
+
+    assert builder.build([docs[1], docs[4]]).text == builder.build([docs[4], docs[1]]).text
@@ -0,0 +1,156 @@
+import os
+from src.dedup import DedupIndex, fingerprint
+from src.ingestion import IngestionManifest, sync_directory, MANIFEST_FILE
+from src.vector_store import VectorStoreManager, DEDUP_INDEX_FILE
+from benchmarks.corpus import sample_text
+from tests.conftest import write
+
+
+def test_index_matches_exact_and_near_duplicates(tmp_path):
+    """Birebir aynı (boşluk/harf farkı hariç) ve birkaç kelimesi değişmiş metin bulunmalı, ilgisiz metin bulunmamalı."""
+    text = sample_text(150, seed=1)
+    index = DedupIndex(str(tmp_path / "dedup.pkl"))
+    index.add("a", fingerprint(text), "a.pdf", "v1", page=0)
+
+    assert index.match(fingerprint("  " + text.replace(" ", "\n"))) == ("exact", "a")
+    edited = text.replace("rapor", "tablo", 1)
+    assert index.match(fingerprint(edited)) == ("near", "a")
+    assert index.match(fingerprint(edited), mode="exact") == (None, None)
+    assert index.match(fingerprint(text), mode="off") == (None, None)
+    assert index.match(fingerprint(sample_text(150, seed=2))) == (None, None)
+
+    index.add_reference("a", "b.pdf", "v1", page=3)
+    assert index.release(["a"], "a.pdf", "v1") == []
+    assert index.sources("a") == [{"source": "b.pdf", "pages": [3]}]
+    index.save()
+    reloaded = DedupIndex.load(index.path)
+    assert reloaded.match(fingerprint(edited)) == ("near", "a")
+    assert reloaded.release(["a"], "b.pdf", "v1") == ["a"]
+
+
+def test_index_counts_and_filter_matches_follow_changes(tmp_path):
+    """stats() sayaçları ve kaynak filtresi eşleşmeleri ekleme/bırakma/silme ve yeniden yüklemeden sonra doğru kalmalı."""
+    index = DedupIndex(str(tmp_path / "dedup.pkl"))
+    pdf = {"source_name": "b.pdf", "file_type": "pdf", "ingested_at": 10}
+    for i in range(3):
+        index.add(f"c{i}", fingerprint(sample_text(40, seed=i)), "a.txt", "v1",
+                  metadata={"source_name": "a.txt", "file_type": "txt", "ingested_at": 10})
+    index.add_reference("c0", "b.pdf", "v1", page=2, metadata=pdf)
+    index.add_reference("c1", "b.pdf", "v1", page=5, metadata=pdf)
+    index.add_reference("c1", "b.pdf", "v1", page=6, metadata=pdf)
+
+    def pdf_pages(metadata):
+        return metadata["file_type"] == "pdf" and metadata.get("page", -1) <= 5
+
+    assert index.stats()["references"] == 6 and index.stats()["duplicates_avoided"] == 3
+    assert index.matching_references(pdf_pages) == {"c0", "c1"}
+    # Chunk'ı depoya yazan kaynak eşleşmeye sayılmaz (metadata filtresi onu zaten bulur)
+    assert index.matching_references(lambda m: m["file_type"] == "txt") == set()
+
+    index.remove(["c0"])
+    assert index.matching_references(pdf_pages) == {"c1"}
+    index.save()
+    reloaded = DedupIndex.load(index.path)
+    assert reloaded.stats()["references"] == 4 and reloaded.matching_references(pdf_pages) == {"c1"}
+    assert reloaded.release(["c1"], "b.pdf", "v1") == []
+    assert reloaded.matching_references(pdf_pages) == set()
+    assert reloaded.stats()["references"] == 2 and reloaded.stats()["duplicates_avoided"] == 0
+
+
+def test_sync_stores_shared_chunks_once_and_keeps_provenance(tmp_path, store):
+    """İki dosyadaki aynı paragraf bir kez embed edilmeli, son kullanan dosya silinene kadar depoda kalmalı."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    boilerplate = sample_text(150, seed=7)
+    write(data_dir / "a.txt", sample_text(150, seed=1) + "\n\n" + boilerplate)
+    write(data_dir / "b.txt", sample_text(150, seed=2) + "\n\n" + boilerplate.replace("proje", "ekip", 1))
+
+    report = sync_directory(str(data_dir), store)
+    assert report["dedup"]["near_duplicates"] + report["dedup"]["exact_duplicates"] >= 1
+    assert report["dedup"]["stored"] == store.get_document_count() == report["chunks_added"]
+    manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+    shared = set(manifest.files["a.txt"]["chunk_ids"]) & set(manifest.files["b.txt"]["chunk_ids"])
+    assert shared
+    shared_id = sorted(shared)[0]
+
+    docs = store.with_provenance(store._get_by_ids([shared_id]))
+    assert [s["source"] for s in docs[0].metadata["sources"]] == [str(data_dir / "a.txt"), str(data_dir / "b.txt")]
+
+    # Paylaşılan chunk'ların sahibi silinince b.txt kendi metniyle yeniden indekslenir
+    os.remove(data_dir / "a.txt")
+    report = sync_directory(str(data_dir), store)
+    assert report["removed"] == ["a.txt"] and report["reprocessed"] == ["b.txt"]
+    manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+    docs = store._get_by_ids(manifest.files["b.txt"]["chunk_ids"])
+    assert store.get_document_count() == manifest.chunk_count() == len(docs)
+    assert all(d.metadata["source_name"] == "b.txt" for d in docs)
+    assert "ekip" in " ".join(d.page_content for d in docs)
+    assert shared_id not in {d.id for d in docs}
+
+    os.remove(data_dir / "b.txt")
+    sync_directory(str(data_dir), store)
+    assert store.get_document_count() == 0 and len(store.dedup_index) == 0
+
+
+def test_removing_owner_rematerializes_shared_chunks(tmp_path, store):
+    """
+    Paylaşılan chunk'ı yazan dosya silinince birebir aynı kopyada sahiplik ve metadata kalan dosyaya geçmeli,
+    sadece neredeyse aynı kopyası kalan dosya kendi metniyle yeniden indekslenmeli.
+    """
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    policy = sample_text(60, seed=4) + " İade talebi teslimattan sonra on dört gün içinde yapılmalıdır."
+    write(data_dir / "a.txt", policy)
+    write(data_dir / "b.txt", policy.replace("on dört gün", "otuz gün"))
+    write(data_dir / "c.txt", policy)
+    report = sync_directory(str(data_dir), store)
+    assert report["dedup"]["exact_duplicates"] == report["dedup"]["near_duplicates"] == 1
+    assert store.get_document_count() == 1
+
+    def stored(name):
+        manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+        return store._get_by_ids(manifest.files[name]["chunk_ids"])
+
+    # Birebir aynı kopya kaldığı için chunk yeniden embed edilmez, metadata'sı c.txt'ye geçer
+    os.remove(data_dir / "a.txt")
+    report = sync_directory(str(data_dir), store)
+    assert report["reprocessed"] == [] and report["chunks_removed"] == 0
+    [c_doc] = stored("c.txt")
+    assert c_doc.metadata["source_name"] == "c.txt" and c_doc.metadata["source"] == str(data_dir / "c.txt")
+    assert stored("b.txt") == [c_doc]
+
+    # Sadece neredeyse aynı kopya kalınca b.txt kendi metniyle yeniden indekslenir (sahiplikler diskten okunur)
+    store = VectorStoreManager(persist_directory=store.persist_directory, embeddings=store.embeddings)
+    os.remove(data_dir / "c.txt")
+    report = sync_directory(str(data_dir), store)
+    assert report["reprocessed"] == ["b.txt"]
+    [b_doc] = stored("b.txt")
+    assert "otuz gün" in b_doc.page_content and "on dört gün" not in b_doc.page_content
+    assert b_doc.metadata["source_name"] == "b.txt" and b_doc.metadata["source"] == str(data_dir / "b.txt")
+    assert store.get_document_count() == 1 == len(store.dedup_index)
+
+    # Dosyanın kendi eski sürümüne neredeyse benzeyen yeni metni eskisinin yerine geçer
+    write(data_dir / "b.txt", policy.replace("on dört gün", "kırk beş gün"))
+    report = sync_directory(str(data_dir), store)
+    assert report["updated"] == ["b.txt"] and report["dedup"]["near_duplicates"] == 0
+    [b_doc] = stored("b.txt")
+    assert "kırk beş gün" in b_doc.page_content and store.get_document_count() == 1
+
+
+def test_missing_dedup_index_is_rebuilt_from_store(tmp_path):
+    """Tekrar indeksi dosyası kaybolursa depo ve manifestten yeniden kurulmalı."""
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", sample_text(150, seed=1))
+    persist = str(tmp_path / "db")
+    store = VectorStoreManager(persist_directory=persist, embeddings=DeterministicFakeEmbedding(size=16))
+    sync_directory(str(data_dir), store)
+    count = store.get_document_count()
+    os.remove(os.path.join(persist, DEDUP_INDEX_FILE))
+
+    store = VectorStoreManager(persist_directory=persist, embeddings=DeterministicFakeEmbedding(size=16))
+    write(data_dir / "kopya.txt", sample_text(150, seed=1))
+    report = sync_directory(str(data_dir), store)
+    assert report["dedup"]["exact_duplicates"] == count
+    assert store.get_document_count() == count == len(store.dedup_index)
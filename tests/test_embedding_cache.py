@@ -0,0 +1,70 @@
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.embedding_cache import EmbeddingCache, CachedEmbeddings
+from src.vector_store import VectorStoreManager
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Kaç metnin gerçekten embed edildiğini sayan sahte embedding."""
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+def test_cache_hits_skip_model_calls(tmp_path):
+    """Aynı metin ikinci kez embed edilmek istendiğinde modele gidilmemeli."""
+    base = CountingEmbeddings(size=8)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    embeddings = CachedEmbeddings(base, cache, "fake")
+
+    first = embeddings.embed_documents(["a", "b", "a"])
+    assert base.calls == 2  # batch içindeki tekrar da tek sefer embed edilir
+    second = embeddings.embed_documents(["b", "a"])
+    assert base.calls == 2
+    assert second == [first[1], first[0]]
+    assert cache.stats()["hits"] == 2
+
+
+def test_cache_persists_and_is_keyed_by_model(tmp_path):
+    """Önbellek yeniden açıldığında korunmalı, farklı model adı ayrı anahtar sayılmalı."""
+    path = str(tmp_path / "cache.sqlite")
+    base = CountingEmbeddings(size=8)
+    CachedEmbeddings(base, EmbeddingCache(path), "model-a").embed_documents(["metin"])
+
+    reopened = EmbeddingCache(path)
+    CachedEmbeddings(base, reopened, "model-a").embed_documents(["metin"])
+    assert base.calls == 1
+    CachedEmbeddings(base, reopened, "model-b").embed_documents(["metin"])
+    assert base.calls == 2
+
+
+def test_store_cache_is_keyed_by_provider_and_model(tmp_path):
+    """Aynı model adını taşıyan iki sağlayıcı önbellekteki vektörleri paylaşmamalı."""
+    class NamedEmbeddings(CountingEmbeddings):
+        provider: str
+        model: str
+
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    first = NamedEmbeddings(size=8, provider="ollama", model="nomic-embed-text")
+    second = NamedEmbeddings(size=16, provider="local", model="nomic-embed-text")
+
+    for i, base in enumerate((first, second)):
+        manager = VectorStoreManager(persist_directory=str(tmp_path / f"db{i}"), embeddings=base,
+                                     embedding_cache=cache)
+        assert len(manager.embeddings.embed_documents(["metin"])[0]) == base.size
+        manager.close()
+    assert (first.calls, second.calls) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Kayıt sayısı sınırı aşılınca en eski kullanılan kayıtlar silinmeli."""
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_entries=3)
+    cache.put_many("m", [("h1", [1.0]), ("h2", [2.0]), ("h3", [3.0])])
+    cache.get_many("m", ["h1"])
+    cache.put_many("m", [("h4", [4.0])])
+
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+    assert set(cache.get_many("m", ["h1", "h2", "h3", "h4"])) == {"h1", "h3", "h4"}
@@ -0,0 +1,37 @@
+from langchain_core.documents import Document
+from src.embedding_pipeline import OllamaBatchEmbeddings
+from src.vector_store import VectorStoreManager
+from benchmarks.stub_ollama import stub_vector
+
+
+def test_batches_are_sent_concurrently_and_in_order(stub_server):
+    """Metinler batch'lere bölünmeli, eşzamanlılık sınırı aşılmamalı ve sıra korunmalı."""
+    embeddings = OllamaBatchEmbeddings(base_url=stub_server.url, batch_size=3, max_concurrency=2)
+    texts = [f"metin {i}" for i in range(10)]
+    try:
+        vectors = embeddings.embed_documents(texts)
+    finally:
+        embeddings.close()
+
+    assert sorted(stub_server.batch_sizes) == [1, 3, 3, 3]
+    assert stub_server.max_in_flight == 2
+    assert vectors == [stub_vector(t) for t in texts]
+
+
+def test_vector_store_reports_throughput(tmp_path, stub_server):
+    """add_documents embedding'leri toplu yazmalı ve chunk/s, byte/s raporlamalı."""
+    embeddings = OllamaBatchEmbeddings(base_url=stub_server.url, batch_size=4, max_concurrency=4)
+    chunks = [Document(page_content=f"parça {i}", metadata={"source": "a.txt"}) for i in range(20)]
+    try:
+        manager = VectorStoreManager(
+            persist_directory=str(tmp_path / "chroma_db"), embeddings=embeddings
+        )
+        assert manager.add_documents(chunks, ids=[str(i) for i in range(20)])
+    finally:
+        embeddings.close()
+
+    stats = manager.ingest_stats.to_dict()
+    assert manager.get_document_count() == 20
+    assert stats["chunks"] == 20
+    assert stats["bytes"] == sum(len(c.page_content.encode("utf-8")) for c in chunks)
+    assert stats["chunks_per_second"] > 0
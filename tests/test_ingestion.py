@@ -0,0 +1,180 @@
+import os
+from src.ingestion import IngestionManifest, sync_directory, make_chunk_ids, process_files, MANIFEST_FILE
+from benchmarks.corpus import sample_text
+from tests.conftest import write
+
+
+def test_chunk_ids_are_deterministic():
+    """Aynı dosya yolu ve içerik aynı chunk ID'lerini üretmeli."""
+    assert make_chunk_ids("a.txt", "abc", 3) == make_chunk_ids("a.txt", "abc", 3)
+    assert make_chunk_ids("a.txt", "abc", 1) != make_chunk_ids("b.txt", "abc", 1)
+
+
+def test_sync_only_processes_changed_files(tmp_path, store):
+    """İkinci senkronizasyonda değişmeyen dosyalar tekrar embed edilmemeli."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", "Birinci dosya içeriği " * 100)
+    write(data_dir / "b.txt", "İkinci dosya içeriği " * 10)
+
+    report = sync_directory(str(data_dir), store)
+    assert sorted(report["added"]) == ["a.txt", "b.txt"]
+    first_count = store.get_document_count()
+    assert first_count == report["chunks_added"]
+    assert os.path.exists(os.path.join(store.persist_directory, MANIFEST_FILE))
+
+    report = sync_directory(str(data_dir), store)
+    assert report["added"] == [] and report["updated"] == []
+    assert report["unchanged"] == 2
+    assert store.get_document_count() == first_count
+
+
+def test_sync_updates_and_removes_files(tmp_path, store):
+    """Değişen dosyanın eski chunk'ları silinmeli, silinen dosyanın chunk'ları kaldırılmalı."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", "Eski içerik " * 200)
+    write(data_dir / "b.txt", "Kalıcı içerik")
+    sync_directory(str(data_dir), store)
+
+    write(data_dir / "a.txt", "Yeni içerik")
+    os.remove(data_dir / "b.txt")
+    report = sync_directory(str(data_dir), store)
+
+    assert report["updated"] == ["a.txt"]
+    assert report["removed"] == ["b.txt"]
+    manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+    assert list(manifest.files) == ["a.txt"]
+    assert store.get_document_count() == len(manifest.files["a.txt"]["chunk_ids"]) == 1
+
+
+def test_sync_collects_errors_without_touching_other_files(tmp_path, store):
+    """Bozuk bir dosya diğer dosyaların işlenmesini engellememeli."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "ok.txt", "Sağlam içerik")
+    with open(data_dir / "broken.txt", "wb") as f:
+        f.write(b"\xff\xfe\x00invalid utf-8 \xff")
+
+    report = sync_directory(str(data_dir), store)
+    assert report["added"] == ["ok.txt"]
+    assert [e["file"] for e in report["errors"]] == ["broken.txt"]
+
+
+def test_parallel_processing_matches_sequential_order(tmp_path):
+    """Süreç havuzuyla işleme, sıralı işlemeyle aynı sırada aynı chunk'ları üretmeli."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"dosya_{i}.txt"
+        write(path, f"Dosya {i} içeriği " * (50 * (i + 1)))
+        paths.append(str(path))
+    missing = str(tmp_path / "yok.txt")
+    paths.insert(2, missing)
+
+    sequential = process_files(paths, workers=1)
+    parallel = process_files(paths, workers=2)
+
+    assert [r[0] for r in parallel] == paths
+    assert [[c.page_content for c in r[1]] for r in parallel] == \
+        [[c.page_content for c in r[1]] for r in sequential]
+    assert parallel[2][2]["type"] == "FileNotFoundError"
+    assert all(r[2] is None for i, r in enumerate(parallel) if i != 2)
+
+
+
+def test_pdf_chunks_keep_overlap_across_pages(tmp_path):
+    """Sayfa sınırında bölünen cümle tek chunk'ta birleşmeli, chunk'ın sayfası başladığı sayfa olmalı."""
+    from benchmarks.corpus import write_pdf
+    from src.document_processor import DocumentProcessor
+    path = str(tmp_path / "kitap.pdf")
+    write_pdf(path, [sample_text(300, seed=1) + " Bu cumle sayfa", "sonunda bolunuyor. " + sample_text(300, seed=2)])
+
+    chunks = list(DocumentProcessor(path).iter_chunks())
+    spanning = [c for c in chunks if "cumle sayfa\nsonunda bolunuyor" in c.page_content]
+    assert len(spanning) == 1 and spanning[0].metadata["page"] == 0
+    assert chunks[-1].metadata["page"] == 1
+    # Ardışık chunk'lar sayfa geçişinde de örtüşmeye devam etmeli
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.page_content[:20] in previous.page_content
+
+
+def test_prefetch_applies_backpressure():
+    """Üretici thread tüketicinin en fazla max_items eleman önüne geçebilmeli."""
+    import time
+    from src.ingestion import prefetch
+    produced = []
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    items = prefetch(source(), max_items=3)
+    assert next(items) == 0
+    time.sleep(0.2)
+    assert len(produced) <= 5
+    assert list(items) == list(range(1, 20))
+
+
+def test_sync_streams_large_file_in_bounded_batches(tmp_path, store, monkeypatch):
+    """Büyük bir dosyanın chunk'ları ADD_BATCH_CHUNKS'lık batch'ler halinde yazılmalı."""
+    import src.ingestion as ingestion
+    monkeypatch.setattr(ingestion, "ADD_BATCH_CHUNKS", 8)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "buyuk.txt", sample_text(12000))
+    batches = []
+    original = store.add_documents
+    monkeypatch.setattr(store, "add_documents", lambda chunks, **kw: batches.append(len(chunks)) or original(chunks, **kw))
+
+    report = sync_directory(str(data_dir), store)
+    assert len(batches) > 1 and max(batches) <= 8
+    assert report["chunks_added"] == sum(batches) == store.get_document_count()
+
+
+def test_failed_batch_rolls_back_partially_written_file(tmp_path, store, monkeypatch):
+    """Bir dosyanın batch'lerinden biri yazılamazsa daha önce yazılan chunk'ları da geri alınmalı."""
+    import src.ingestion as ingestion
+    monkeypatch.setattr(ingestion, "ADD_BATCH_CHUNKS", 8)
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "buyuk.txt", sample_text(12000))
+    calls = []
+    original = store.add_documents
+
+    def flaky(chunks, **kw):
+        calls.append(len(chunks))
+        return False if len(calls) == 3 else original(chunks, **kw)
+
+    monkeypatch.setattr(store, "add_documents", flaky)
+    report = sync_directory(str(data_dir), store)
+    assert [e["file"] for e in report["errors"]] == ["buyuk.txt"]
+    assert report["added"] == [] and store.get_document_count() == 0
+    manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+    assert manifest.files == {}
+
+
+def test_old_store_gets_filter_metadata_without_reembedding(tmp_path, store):
+    """Filtre metadata'sından önce kurulmuş (manifest sürüm 1) depoya alanlar embed edilmeden eklenmeli."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", sample_text(400, seed=1))
+    sync_directory(str(data_dir), store)
+    items = list(store.scan(fields=("metadata",)))
+    store.update_metadata([i["id"] for i in items], [{"source": i["metadata"]["source"]} for i in items])
+    manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+    for entry in manifest.files.values():
+        del entry["ingested_at"]
+    manifest.save()
+    with open(manifest.path, "r+", encoding="utf-8") as f:
+        data = f.read().replace('"version": 2', '"version": 1')
+        f.seek(0)
+        f.write(data)
+        f.truncate()
+
+    report = sync_directory(str(data_dir), store)
+    assert report["unchanged"] == 1 and report["throughput"]["chunks"] == 0
+    metadata = [i["metadata"] for i in store.scan(fields=("metadata",))]
+    assert len(metadata) == len(items)
+    assert all(m["source_name"] == "a.txt" and m["file_type"] == "txt" and m["ingested_at"] for m in metadata)
+    assert IngestionManifest(manifest.path).version == IngestionManifest.VERSION
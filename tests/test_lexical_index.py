@@ -0,0 +1,69 @@
+from langchain_core.documents import Document
+from src.lexical_index import LexicalIndex, tokenize, is_keyword_query, reciprocal_rank_fusion
+from src.vector_store import VectorStoreManager, LEXICAL_INDEX_FILE
+
+
+class FailingEmbeddings:
+    """Çağrılırsa testi düşüren embedding: lexical hızlı yolun model çağırmadığını doğrular."""
+
+    def embed_query(self, text):
+        raise AssertionError("embedding çağrılmamalıydı")
+
+
+def test_tokenizer_handles_turkish_and_codes():
+    """Türkçe büyük/küçük harf, kesme işaretli ekler ve ürün/hata kodları doğru terimlere ayrılmalı."""
+    assert tokenize("İSTANBUL'daki toplantı") == tokenize("istanbul toplantısı")
+    assert tokenize("Istanbul") != tokenize("istanbul")  # I -> ı
+    assert "err-404" in tokenize("Hata kodu ERR-404'tür")
+    assert "sku_12" in tokenize("SKU_12 stokta") and "ve" not in tokenize("elma ve armut")
+
+
+def test_keyword_query_detection():
+    assert is_keyword_query("ERR-404")
+    assert is_keyword_query("fatura iade")
+    assert not is_keyword_query("Toplantı ne zaman yapılacak?")
+
+
+def test_bm25_ranking_updates_and_persistence(tmp_path):
+    """Silinen ve güncellenen chunk'lar sonuçlara yansımalı; indeks diskten aynı şekilde açılmalı."""
+    path = str(tmp_path / "lexical.pkl")
+    index = LexicalIndex(path)
+    index.add(["a", "b", "c"], ["Ankara ofisi", "İstanbul ofisi ve İstanbul deposu", "ERR-42 hatası"])
+    assert [doc_id for doc_id, _ in index.search("istanbul")] == ["b"]
+    assert index.search("ERR-42")[0][0] == "c"
+
+    index.remove(["b"])
+    index.add(["a"], ["İstanbul'daki yeni ofis"])
+    assert [doc_id for doc_id, _ in index.search("İstanbul")] == ["a"]
+    index.save()
+
+    reopened = LexicalIndex.load(path)
+    assert len(reopened) == 2
+    assert reopened.search("istanbul") == index.search("istanbul")
+
+
+def test_rrf_prefers_documents_found_by_both():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]])
+    assert fused[0][0] == "y"
+
+
+def test_store_hybrid_and_lexical_fast_path(tmp_path, store):
+    chunks = [Document(page_content=text) for text in
+              ("Sipariş numarası SKU-7781 iade edildi", "Kargo üç gün içinde teslim edilir", "Fatura bilgileri")]
+    store.add_documents(chunks, ids=["s1", "s2", "s3"])
+    store.save()
+
+    hybrid = store.search("kargo teslim süresi nedir", k=2, mode="hybrid")
+    assert "s2" in [d.id for d in hybrid]
+
+    # Anahtar kelime sorgusu embedding çağırmadan cevaplanmalı
+    store.embeddings = FailingEmbeddings()
+    assert not store.needs_embedding("SKU-7781")
+    assert [d.id for d in store.search("SKU-7781", k=1)] == ["s1"]
+
+    # İndeks dosyası silinse bile Chroma'daki metinlerden yeniden kurulmalı
+    (tmp_path / "chroma_db" / LEXICAL_INDEX_FILE).unlink()
+    store.close()
+    reopened = VectorStoreManager(persist_directory=str(tmp_path / "chroma_db"), embeddings=FailingEmbeddings())
+    assert len(reopened.lexical_index) == 3
+    assert [d.id for d in reopened.search_lexical("fatura", k=1)] == ["s3"]
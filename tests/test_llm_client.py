@@ -0,0 +1,102 @@
+import asyncio
+import json
+import httpx
+from fastapi.testclient import TestClient
+from src import main
+from src.llm_client import LLMClient
+
+
+async def collect(agen):
+    return [item async for item in agen]
+
+
+def test_ask_stream_yields_tokens_and_metrics(stub_server):
+    """ask_stream token'ları sırayla üretmeli, sonunda TTFT ve toplam süre metriklerini döndürmeli."""
+    client = LLMClient(host=stub_server.url)
+    items = asyncio.run(collect(client.ask_stream("Soru nedir?")))
+
+    assert [item["token"] for item in items[:-1]] == stub_server.tokens
+    metrics = items[-1]["metrics"]
+    assert items[-1]["done"] is True
+    assert 0 < metrics["ttft_ms"] <= metrics["total_ms"]
+    assert metrics["completion_tokens"] == len(stub_server.tokens)
+    assert client.stream_stats.to_dict()["streams"] == 1
+
+
+def test_ask_stream_endpoint_sends_sse_events(stub_server, monkeypatch):
+    """/ask/stream token olaylarını ve en sonda metrik içeren done olayını SSE olarak göndermeli."""
+    monkeypatch.setattr(main, "llm", LLMClient(host=stub_server.url))
+    monkeypatch.setattr(main, "vector_manager", None)
+
+    with TestClient(main.app).stream("POST", "/ask/stream", json={"question": "Merhaba?"}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = [block.split("\n") for block in body.strip().split("\n\n")]
+    names = [lines[0].removeprefix("event: ") for lines in events]
+    payloads = [json.loads(lines[1].removeprefix("data: ")) for lines in events]
+    assert names == ["token"] * len(stub_server.tokens) + ["done"]
+    assert "".join(p["token"] for p in payloads[:-1]) == "".join(stub_server.tokens)
+    assert payloads[-1]["metrics"]["ttft_ms"] > 0
+
+
+def test_concurrency_limit_queues_requests(stub_server):
+    """max_concurrency dolduğunda fazladan istekler Ollama'ya gitmeden sırada beklemeli."""
+    async def run():
+        client = LLMClient(host=stub_server.url, max_concurrency=2)
+        await client.start()
+        shared = client._client
+        try:
+            answers = await asyncio.gather(*(client.ask(f"soru {i}") for i in range(5)))
+        finally:
+            await client.close()
+        return answers, shared
+
+    answers, shared = asyncio.run(run())
+    assert shared is not None
+    assert answers == ["".join(stub_server.tokens)] * 5
+    assert stub_server.max_in_flight == 2
+
+
+def test_server_errors_are_retried_with_backoff(stub_server):
+    """5xx cevapları max_retries kadar yeniden denenmeli, sonra hata mesajı dönmeli."""
+    client = LLMClient(host=stub_server.url, max_retries=2, retry_backoff=0.01)
+    stub_server.fail_next = 2
+    assert asyncio.run(client.ask("soru")) == "".join(stub_server.tokens)
+
+    client = LLMClient(host=stub_server.url, max_retries=1, retry_backoff=0.01)
+    stub_server.fail_next = 2
+    assert asyncio.run(client.ask("soru")).startswith("Hata oluştu")
+
+
+def test_ask_reports_context_and_prefill_metrics(stub_server, store, monkeypatch):
+    """/ask bağlam istatistiklerini ve prefill süresini döndürmeli; prompt sabit sistem talimatıyla başlamalı."""
+    from langchain_core.documents import Document
+    from benchmarks.corpus import sample_text
+    store.add_documents([
+        Document(page_content=sample_text(300, seed=i), metadata={"source": f"d{i}.txt"}) for i in range(6)
+    ])
+    monkeypatch.setattr(main, "llm", LLMClient(host=stub_server.url))
+    monkeypatch.setattr(main, "vector_manager", store)
+    monkeypatch.setattr(main, "context_builder", main.ContextBuilder(token_budget=400))
+    monkeypatch.setattr(main, "retrieval_executor", None)
+    main.invalidate_caches()
+
+    async def run():
+        # İki istek aynı event loop'ta gitmeli: LLMClient'ın paylaşılan HTTP istemcisi loop'a bağlı
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            questions = ["rapor ne zaman hazır?", "bütçe toplantısı nerede?"]
+            return [(await client.post("/ask", json={"question": q})).json() for q in questions]
+
+    first, second = asyncio.run(run())
+    metrics = first["metrics"]
+    assert metrics["cached"] is False and metrics["prefill_ms"] > 0
+    assert metrics["prompt_tokens"] == len(stub_server.prompts[0].split())
+    assert metrics["context"]["context_tokens"] <= 400 < metrics["context"]["prompt_tokens"]
+    assert metrics["context"]["candidates"] == min(6, main.CONTEXT_CANDIDATES)
+    assert second["metrics"]["context"]["passages"] >= 1
+
+    prefix = main.PROMPT_TEMPLATE.split("{context}")[0]
+    assert all(prompt.startswith(prefix) for prompt in stub_server.prompts)
+    assert main.llm.stats()["prefill"]["requests"] == 2
@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+from src import main
+from src.ingestion import sync_directory
+from src.query_cache import TTLCache
+from src.metrics import Registry, Counter, Gauge, Histogram, CallbackMetric
+from tests.test_api import SlowSearchManager, CountingLLM
+
+
+def test_registry_renders_prometheus_text_format():
+    """Sayaç, gösterge, histogram ve fonksiyon metrikleri Prometheus metin formatında yazılmalı."""
+    registry = Registry()
+    requests = Counter("istek_total", "İstekler", ["yol"], registry=registry)
+    requests.labels("/ask").inc()
+    requests.labels("/ask").inc(2)
+    Gauge("kuyruk", "Kuyruk", registry=registry).set(4)
+    latency = Histogram("sure_seconds", "Süre", ["asama"], buckets=(0.1, 1), registry=registry)
+    for value in (0.05, 0.5, 3):
+        latency.labels("arama").observe(value)
+    CallbackMetric("boyut", "Boyut", lambda: {("chunks",): 7}, ["tur"], registry=registry)
+
+    text = registry.render()
+    assert "# TYPE istek_total counter" in text
+    assert 'istek_total{yol="/ask"} 3' in text
+    assert "kuyruk 4" in text
+    assert 'sure_seconds_bucket{asama="arama",le="0.1"} 1' in text
+    assert 'sure_seconds_bucket{asama="arama",le="1"} 2' in text
+    assert 'sure_seconds_bucket{asama="arama",le="+Inf"} 3' in text
+    assert 'sure_seconds_count{asama="arama"} 3' in text
+    assert 'sure_seconds_sum{asama="arama"} 3.55' in text
+    assert 'boyut{tur="chunks"} 7' in text
+
+
+def test_metrics_endpoint_reports_query_and_ingest_stages(tmp_path, store, monkeypatch):
+    """/ask ve senkronizasyondan sonra /metrics aşama sürelerini, HTTP isteklerini ve depo boyutunu göstermeli."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "not.txt").write_text("Toplantı salı günü saat onda yapılacak.", encoding="utf-8")
+    sync_directory(str(data_dir), store)
+
+    monkeypatch.setattr(main, "vector_manager", SlowSearchManager(delay=0))
+    monkeypatch.setattr(main, "llm", CountingLLM())
+    monkeypatch.setattr(main, "retrieval_executor", None)
+    monkeypatch.setattr(main, "answer_cache", TTLCache())
+    main.invalidate_caches()
+    client = TestClient(main.app)
+    client.post("/ask", json={"question": "Toplantı ne zaman?"})
+    client.post("/ask", json={"question": "Toplantı ne zaman?"})
+
+    monkeypatch.setattr(main, "vector_manager", store)
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    for stage in ("embed", "search", "prompt"):
+        assert f'rag_query_stage_seconds_count{{stage="{stage}"}}' in text
+    for stage in ("parse", "split", "embed", "write"):
+        assert f'rag_ingest_stage_seconds_count{{stage="{stage}",file_type="txt"}}' in text
+    assert 'rag_http_request_seconds_count{method="POST",route="/ask",status="200"}' in text
+    assert f'rag_store_size{{kind="chunks"}} {store.get_document_count()}' in text
+    assert 'rag_cache_hits_total{cache="answer"} 1' in text
+    assert "/metrics" not in text
@@ -0,0 +1,35 @@
+from src.query_cache import LRUCache, TTLCache, normalize_question
+
+
+def test_normalize_question_turkish_case_and_spacing():
+    """Türkçe büyük/küçük harf, boşluk ve sondaki noktalama farkları aynı anahtarı vermeli."""
+    assert normalize_question("  İSTANBUL'da   TOPLANTI ne zaman? ") == "istanbul'da toplantı ne zaman"
+    assert normalize_question("Işık") == normalize_question("IŞIK")
+
+
+def test_lru_cache_evicts_oldest_and_tracks_memory():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", [1.0, 2.0])
+    cache.put("b", [3.0])
+    cache.get("a")
+    cache.put("c", [4.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0, 2.0]
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["memory_bytes"] > 0
+    cache.clear()
+    assert cache.stats()["memory_bytes"] == 0
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.query_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.put("soru", "cevap")
+    assert cache.get("soru") == "cevap"
+
+    now[0] += 61
+    assert cache.get("soru") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
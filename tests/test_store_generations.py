@@ -0,0 +1,33 @@
+import os
+from src.store_generations import GenerationStore, CURRENT_FILE
+
+
+def test_legacy_layout_is_moved_into_first_generation(tmp_path):
+    """Sürümsüz eski chroma_db/ içeriği ilk sürüm dizinine taşınıp aktif yapılmalı."""
+    root = tmp_path / "chroma_db"
+    root.mkdir()
+    (root / "chroma.sqlite3").write_text("eski")
+    (root / "manifest.json").write_text("{}")
+
+    generations = GenerationStore(str(root))
+    current = generations.current()
+    assert os.path.basename(current) == "gen-000001"
+    assert sorted(os.listdir(current)) == ["chroma.sqlite3", "manifest.json"]
+    assert sorted(os.listdir(root)) == [CURRENT_FILE, "gen-000001"]
+
+
+def test_create_promote_and_gc(tmp_path):
+    """Kopyalanan sürüm aktif yapılınca eski sürümler gc ile silinmeli, aktif olan kalmalı."""
+    generations = GenerationStore(str(tmp_path / "chroma_db"))
+    first = generations.current()
+    with open(os.path.join(first, "manifest.json"), "w") as f:
+        f.write("{}")
+
+    second = generations.create(copy_from=first)
+    assert os.path.exists(os.path.join(second, "manifest.json"))
+    assert generations.current() == first
+
+    generations.promote(second)
+    assert generations.current() == second
+    assert generations.gc() == ["gen-000001"]
+    assert generations.generations() == [second]
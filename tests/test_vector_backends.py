@@ -0,0 +1,140 @@
+import threading
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.ingestion import sync_directory
+from src.vector_backends import NumpyBackend, matches_where, where_to_sql
+from src.vector_store import VectorStoreManager, metadata_filter
+
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def exact_top_k(vectors, queries, k):
+    distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+def fill(backend, vectors):
+    ids = [f"c{i}" for i in range(len(vectors))]
+    backend.upsert(ids, vectors.tolist(), [f"metin {i}" for i in ids],
+                   [{"source": f"s{i % 3}.txt", "page": i % 5} for i in range(len(vectors))])
+    return ids
+
+
+@pytest.mark.parametrize("quantization,min_recall", [("float32", 1.0), ("float16", 0.95), ("int8", 0.85)])
+def test_numpy_backend_matches_exact_search(tmp_path, quantization, min_recall):
+    """Brute-force arama tam sonuçla (nicemlenmiş modlarda yakın) aynı komşuları bulmalı."""
+    vectors, queries = random_vectors(500), random_vectors(20, seed=1)
+    backend = NumpyBackend(str(tmp_path), quantization=quantization, index="flat")
+    ids = fill(backend, vectors)
+
+    expected = exact_top_k(vectors, queries, 5)
+    found = backend.query(queries.tolist(), k=5)
+    hits = sum(len({ids[i] for i in row} & {d.id for d in docs}) for row, docs in zip(expected, found))
+    assert hits / expected.size >= min_recall
+    assert found[0][0].page_content == f"metin {found[0][0].id}"
+
+
+def test_numpy_backend_persists_updates_and_filters(tmp_path):
+    """Silme, güncelleme ve where filtreleri yeniden açılan depoda da geçerli olmalı."""
+    vectors = random_vectors(50)
+    backend = NumpyBackend(str(tmp_path))
+    ids = fill(backend, vectors)
+    backend.delete(ids[:10])
+    backend.upsert(["c20"], [vectors[0].tolist()], ["yeni metin"], [{"source": "yeni.txt"}])
+    backend.close()
+
+    reopened = NumpyBackend(str(tmp_path))
+    assert reopened.count() == 40
+    assert reopened.query([vectors[0].tolist()], k=1)[0][0].id == "c20"
+    nearest = reopened.query([vectors[0].tolist()], k=3, with_distances=True)[0]
+    assert nearest[0][0].id == "c20" and nearest[0][1] == pytest.approx(0, abs=1e-3)
+    assert [d for _, d in nearest] == sorted(d for _, d in nearest)
+    assert reopened.get(ids=["c20"])["documents"] == ["yeni metin"]
+
+    only_s1 = reopened.get(where=metadata_filter(source="s1.txt", page=1), include=["metadatas"])
+    assert only_s1["ids"] and all(m == {"source": "s1.txt", "page": 1} for m in only_s1["metadatas"])
+    filtered = reopened.query([vectors[13].tolist()], k=3, where={"page": {"$gte": 3}})[0]
+    assert filtered and all(d.metadata["page"] >= 3 for d in filtered)
+
+    page = reopened.get(limit=15, offset=30, include=[])
+    assert len(page["ids"]) == 10
+
+
+def test_numpy_backend_ivf_recall(tmp_path):
+    """IVF indeksi kümelenmiş verilerde tam aramaya yakın sonuç vermeli."""
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(20, 16)) * 10
+    vectors = (centers[rng.integers(0, 20, 4000)] + rng.normal(size=(4000, 16))).astype(np.float32)
+    queries = (centers[rng.integers(0, 20, 30)] + rng.normal(size=(30, 16))).astype(np.float32)
+    backend = NumpyBackend(str(tmp_path), index="ivf", nprobe=8)
+    ids = fill(backend, vectors)
+    assert backend.wait_for_index(timeout=30)
+
+    expected = exact_top_k(vectors, queries, 10)
+    found = backend.query(queries.tolist(), k=10)
+    hits = sum(len({ids[i] for i in row} & {d.id for d in docs}) for row, docs in zip(expected, found))
+    assert hits / expected.size >= 0.9
+    assert backend.stats()["ivf_lists"] > 1
+
+
+def test_numpy_backend_queries_do_not_wait_for_ivf_training(tmp_path, monkeypatch):
+    """IVF eğitimi arka planda sürerken aramalar beklemeden tam aramayla yanıtlanmalı."""
+    started, release = threading.Event(), threading.Event()
+    train = NumpyBackend.train_ivf
+
+    def slow_train(self, *args, **kwargs):
+        started.set()
+        release.wait(30)
+        return train(self, *args, **kwargs)
+
+    monkeypatch.setattr(NumpyBackend, "train_ivf", slow_train)
+    vectors, queries = random_vectors(300), random_vectors(5, seed=1)
+    backend = NumpyBackend(str(tmp_path), index="ivf")
+    ids = fill(backend, vectors)
+    assert started.wait(5)
+
+    found = backend.query(queries.tolist(), k=3)
+    expected = exact_top_k(vectors, queries, 3)
+    assert [[d.id for d in docs] for docs in found] == [[ids[i] for i in row] for row in expected]
+    assert not backend.wait_for_index(timeout=0.01)
+
+    release.set()
+    assert backend.wait_for_index(timeout=30)
+    assert backend.stats()["ivf_lists"] > 1
+    backend.close()
+
+
+def test_where_to_sql_rejects_unknown_operators():
+    assert where_to_sql(None) == ("1", [])
+    with pytest.raises(ValueError):
+        where_to_sql({"page": {"$regex": "x"}})
+
+
+def test_matches_where_evaluates_like_sql():
+    metadata = {"source_name": "a.pdf", "file_type": "pdf", "page": 2}
+    assert matches_where({"$and": [{"file_type": "pdf"}, {"page": {"$gte": 1, "$lte": 2}}]}, metadata)
+    assert matches_where({"$or": [{"source_name": "b.pdf"}, {"page": {"$in": [2, 3]}}]}, metadata)
+    assert not matches_where({"source_name": {"$ne": "a.pdf"}}, metadata)
+    # Alanı olmayan veya türü uymayan kayıt eşleşmez
+    assert not matches_where({"ingested_at": {"$gte": 0}}, metadata)
+    assert not matches_where({"page": {"$gte": "1"}}, metadata)
+    with pytest.raises(ValueError):
+        matches_where({"page": {"$regex": "x"}}, metadata)
+
+
+def test_manager_runs_on_numpy_backend(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "a.txt").write_text("Kargo üç gün içinde teslim edilir", encoding="utf-8")
+    (data_dir / "b.txt").write_text("Fatura bilgileri e-posta ile gönderilir", encoding="utf-8")
+    store = VectorStoreManager(persist_directory=str(tmp_path / "db"), embeddings=DeterministicFakeEmbedding(size=16),
+                               backend="numpy")
+    report = sync_directory(str(data_dir), store)
+    assert sorted(report["added"]) == ["a.txt", "b.txt"]
+    assert store.get_document_count() == 2
+    assert len(store.search("kargo süresi nedir", k=2, mode="dense")) == 2
+    assert [d["full_content"] for d in store.get_documents_with_metadata(
+        where=metadata_filter(source=str(data_dir / "b.txt")))] == ["Fatura bilgileri e-posta ile gönderilir"]
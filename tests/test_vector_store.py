@@ -0,0 +1,199 @@
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from src.ingestion import sync_directory
+from src.vector_store import VectorStoreManager, metadata_filter, search_filter
+from tests.conftest import write
+
+
+def test_document_page_projection_and_offsets(tmp_path, store):
+    """Sayfalama sadece istenen sayfayı ve alanları döndürmeli, son sayfada next_offset None olmalı."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(5):
+        write(data_dir / f"d{i}.txt", f"Doküman {i}")
+    sync_directory(str(data_dir), store)
+    assert store.get_document_count() == 5
+
+    first = store.get_documents_page(offset=0, limit=2, fields=("metadata",))
+    assert first["next_offset"] == 2
+    assert set(first["documents"][0]) == {"id", "metadata"}
+
+    seen = [d["id"] for d in first["documents"]]
+    offset = first["next_offset"]
+    while offset is not None:
+        page = store.get_documents_page(offset=offset, limit=2, fields=("content",))
+        seen.extend(d["id"] for d in page["documents"])
+        offset = page["next_offset"]
+    assert len(seen) == len(set(seen)) == 5
+
+
+class NoModelEmbeddings:
+    """Çağrıldığında hata veren embedding: listeleme yollarının model kullanmadığını doğrular."""
+
+    def embed_query(self, text):
+        raise AssertionError("listeleme embedding çağırmamalı")
+
+    embed_documents = embed_query
+
+
+def test_scan_is_embedding_free_stable_and_filterable(tmp_path, store):
+    """scan() model çağırmadan gerçek chunk ID'leriyle, her seferinde aynı sırada ve filtreyle dönmeli."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", "A içeriği " * 300)
+    write(data_dir / "b.txt", "B içeriği")
+    sync_directory(str(data_dir), store)
+    store.db._embedding_function = NoModelEmbeddings()
+    store.embeddings = NoModelEmbeddings()
+
+    first = [d["id"] for d in store.scan(batch_size=2)]
+    assert first == [d["id"] for d in store.scan(batch_size=3)]
+    assert len(first) == store.get_document_count()
+
+    only_b = store.get_documents_with_metadata(limit=10, where=metadata_filter(source=str(data_dir / "b.txt")))
+    assert [d["full_content"] for d in only_b] == ["B içeriği"]
+    assert only_b[0]["id"] in first
+
+
+def test_metadata_filter_builds_chroma_where():
+    assert metadata_filter(source=None, page=None) is None
+    assert metadata_filter(source="a.pdf") == {"source": "a.pdf"}
+    assert metadata_filter(source="a.pdf", page=2) == {"$and": [{"source": "a.pdf"}, {"page": 2}]}
+
+
+class CountingEmbeddings:
+    """Embedding çağrılarını sayan sarmalayıcı."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls.append(1)
+        return self.embeddings.embed_query(text)
+
+
+def test_search_batch_matches_search_with_one_embedding_call(tmp_path, store):
+    """search_batch her sorgu için search() ile aynı sonucu vermeli, sorguları tek çağrıda embed etmeli."""
+    from benchmarks.corpus import sample_text
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(6):
+        write(data_dir / f"d{i}.txt", sample_text(200, seed=i))
+    sync_directory(str(data_dir), store)
+    queries = ["rapor ne zaman teslim edilecek?", "ERR-404", "sunucu", "bütçe toplantısında ne konuşuldu?"]
+
+    for mode in ("hybrid", "dense", "lexical"):
+        expected = [[d.id for d in store.search(q, k=3, mode=mode)] for q in queries]
+        store.embeddings = CountingEmbeddings(store.embeddings)
+        results = store.search_batch(queries, k=3, mode=mode)
+        assert [[d.id for d in docs] for docs in results] == expected
+        assert store.embeddings.calls == {"hybrid": [3], "dense": [4], "lexical": []}[mode]
+        store.embeddings = store.embeddings.embeddings
+
+
+class OtherModelEmbeddings(DeterministicFakeEmbedding):
+    """Farklı isimli ve boyutlu bir embedding modeli."""
+
+    model: str = "baska-model"
+
+
+def test_embedding_model_change_triggers_reindex(tmp_path, store):
+    """Model değişince vektör araması yapılmamalı, senkronizasyon depoyu yeni boyutla baştan kurmalı."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", "Fatura iade süreci on dört gün içinde tamamlanır.")
+    sync_directory(str(data_dir), store)
+    assert store.store_info["dimension"] == 16
+    store.close()
+
+    reopened = VectorStoreManager(persist_directory=store.persist_directory, embeddings=OtherModelEmbeddings(size=8))
+    assert "baska-model" in reopened.embedding_mismatch()
+    assert not reopened.needs_embedding("iade süreci ne kadar sürer acaba", mode="dense")
+    assert reopened.search("iade süreci ne kadar sürer acaba", mode="dense")
+
+    report = sync_directory(str(data_dir), reopened)
+    assert report["added"] == ["a.txt"]
+    assert reopened.embedding_mismatch() is None
+    assert reopened.store_info == {"provider": "OtherModelEmbeddings", "model": "baska-model", "dimension": 8}
+    assert reopened.search("iade süreci ne kadar sürer acaba", mode="dense")
+
+
+def test_search_filters_are_pushed_into_every_search_mode(tmp_path):
+    """Filtreli aramada vektör, BM25 ve hibrit sonuçları sadece filtreye uyan chunk'lardan gelmeli."""
+    from benchmarks.corpus import sample_text, write_pdf
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(4):
+        write(data_dir / f"d{i}.txt", sample_text(400, seed=i))
+    write_pdf(str(data_dir / "kilavuz.pdf"), [sample_text(150, seed=10 + page) for page in range(4)])
+    queries = ["rapor ne zaman teslim edilecek?", "sunucu yedek", "bütçe toplantısında ne konuşuldu?"]
+
+    for backend in ("chroma", "numpy"):
+        store = VectorStoreManager(persist_directory=str(tmp_path / backend), backend=backend,
+                                   embeddings=DeterministicFakeEmbedding(size=16))
+        sync_directory(str(data_dir), store)
+        metadata = store.get_documents_with_metadata(limit=1, where=search_filter(source="d1.txt"))[0]["metadata"]
+        assert metadata["file_type"] == "txt" and metadata["ingested_at"] > 0
+
+        for where, allowed in (
+            (search_filter(source="d1.txt"), lambda m: m["source_name"] == "d1.txt"),
+            (search_filter(file_type=".PDF", page_from=1, page_to=2), lambda m: m["page"] in (1, 2)),
+        ):
+            for mode in ("dense", "lexical", "hybrid"):
+                for query in queries:
+                    docs = store.search(query, k=5, mode=mode, where=where)
+                    assert docs and all(allowed(d.metadata) for d in docs), (backend, mode, query)
+            batch = store.search_batch(queries, k=5, where=where)
+            assert all(allowed(d.metadata) for docs in batch for d in docs)
+        assert store.search(queries[0], k=5, where=search_filter(ingested_before=1)) == []
+        store.close()
+
+
+def test_filters_match_every_source_of_shared_chunks(tmp_path):
+    """Tekrarı ayıklanmış chunk, onu depoya yazan dosyanın değil başka bir kaynağının filtresiyle de bulunmalı."""
+    import os
+    from benchmarks.corpus import sample_text
+    from src.ingestion import IngestionManifest, MANIFEST_FILE
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    shared = sample_text(120, seed=7)
+    write(data_dir / "a.md", sample_text(150, seed=1) + "\n\n" + shared)
+    write(data_dir / "b.txt", sample_text(150, seed=2) + "\n\n" + shared)
+    query = " ".join(shared.split()[:12])
+    modes = ("dense", "lexical", "hybrid")
+
+    for backend in ("chroma", "numpy"):
+        store = VectorStoreManager(persist_directory=str(tmp_path / backend), backend=backend,
+                                   embeddings=DeterministicFakeEmbedding(size=16))
+        sync_directory(str(data_dir), store)
+        manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+        a_ids, b_ids = set(manifest.files["a.md"]["chunk_ids"]), set(manifest.files["b.txt"]["chunk_ids"])
+        assert a_ids & b_ids
+
+        for where in (search_filter(source="b.txt"), search_filter(file_type="txt")):
+            for mode in modes:
+                ids = {d.id for d in store.search(query, k=10, mode=mode, where=where)}
+                assert ids <= b_ids and ids & a_ids, (backend, mode, where)
+            for docs in store.search_batch([query, "rapor"], k=10, where=where):
+                assert {d.id for d in docs} <= b_ids
+
+        # Silinen dosyanın filtresi artık paylaşılan chunk'la eşleşmez
+        os.remove(data_dir / "a.md")
+        sync_directory(str(data_dir), store)
+        for where in (search_filter(source="a.md"), search_filter(file_type="md")):
+            for mode in modes:
+                assert store.search(query, k=10, mode=mode, where=where) == [], (backend, mode, where)
+        write(data_dir / "a.md", sample_text(150, seed=1) + "\n\n" + shared)
+        store.close()
+
+
+def test_search_filter_builds_chroma_where():
+    assert search_filter() is None
+    assert search_filter(file_type=".PDF") == {"file_type": "pdf"}
+    assert search_filter(source="a.pdf", page_from=2, ingested_after=100.7) == {"$and": [
+        {"source_name": "a.pdf"}, {"page": {"$gte": 2}}, {"ingested_at": {"$gte": 100}},
+    ]}
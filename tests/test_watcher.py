@@ -0,0 +1,55 @@
+import os
+from src.ingestion import IngestionManifest, sync_directory, MANIFEST_FILE
+from src.watcher import DataDirWatcher
+from benchmarks.corpus import sample_text
+from tests.conftest import write
+
+
+def test_watcher_debounces_and_retries_while_busy(tmp_path):
+    """Yazılmaya devam eden dosya beklemeli, meşgulken (None) kuyrukta kalmalı, sonra tek batch'te işlenmeli."""
+    write(tmp_path / "eski.txt", "eski")
+    calls, busy = [], [True]
+
+    def apply(paths):
+        if busy[0]:
+            return None
+        calls.append(paths)
+        return {"errors": []}
+
+    watcher = DataDirWatcher(str(tmp_path), apply, debounce_seconds=1.0)
+    watcher.start()
+    watcher.stop()
+    write(tmp_path / "yeni.txt", "ilk parça")
+    assert watcher.poll(now=0.0) == 0
+    write(tmp_path / "yeni.txt", "ilk parça, ikinci parça")
+    os.remove(tmp_path / "eski.txt")
+    assert watcher.poll(now=0.5) == 0 and watcher.queue_depth() == 2
+
+    assert watcher.poll(now=2.0) == 0 and watcher.queue_depth() == 2
+    busy[0] = False
+    assert watcher.poll(now=3.0) == 2
+    assert calls == [["eski.txt", "yeni.txt"]]
+    stats = watcher.stats()
+    assert stats["queue_depth"] == 0 and stats["batches"] == 1 and stats["files"] == 2
+    assert 3.0 <= stats["last_lag_seconds"] < 3.5
+    assert watcher.poll(now=10.0) == 0 and len(calls) == 1
+
+
+def test_sync_with_paths_only_touches_given_files(tmp_path, store):
+    """paths verilince listede olmayan yeni dosya işlenmemeli, silinen dosyanın chunk'ları kaldırılmalı."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "a.txt", sample_text(100, seed=1))
+    write(data_dir / "b.txt", sample_text(100, seed=2))
+    sync_directory(str(data_dir), store)
+
+    write(data_dir / "c.txt", sample_text(100, seed=3))
+    write(data_dir / "d.txt", sample_text(100, seed=4))
+    os.remove(data_dir / "a.txt")
+    report = sync_directory(str(data_dir), store, paths=["a.txt", "c.txt"])
+
+    assert report["added"] == ["c.txt"] and report["removed"] == ["a.txt"]
+    manifest = IngestionManifest(os.path.join(store.persist_directory, MANIFEST_FILE))
+    assert sorted(manifest.files) == ["b.txt", "c.txt"]
+    assert report["chunks_removed"] > 0
+    assert store.get_document_count() == manifest.chunk_count()